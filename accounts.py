@@ -0,0 +1,259 @@
+"""
+Jalankan bot untuk banyak akun MT5 sekaligus.
+
+Modul MetaTrader5 hanya bisa terhubung ke satu terminal per process, jadi
+setiap akun dijalankan di process worker sendiri (terminal sendiri). Data bar,
+indikator dan sinyal dihitung sekali di process supervisor (terminal "data"),
+lalu setiap sinyal dikirim ke semua worker. Worker hanya mengerjakan sizing,
+risk check (spread, batas rugi harian), order_send dan monitor posisi akunnya,
+jadi menambah akun hanya menambah satu jalur order.
+
+Setiap akun butuh instalasi terminal MT5 sendiri (`path`). Contoh accounts.json:
+{
+    "data": {"login": 1001, "password": "...", "server": "Broker-Demo",
+             "path": "C:/MT5/data/terminal64.exe"},
+    "accounts": [
+        {"name": "utama", "login": 1001, "password": "...", "server": "Broker-Demo",
+         "path": "C:/MT5/utama/terminal64.exe"},
+        {"name": "kecil", "login": 2002, "password": "...", "server": "Broker-Live",
+         "path": "C:/MT5/kecil/terminal64.exe",
+         "risk_params": {"max_daily_loss": 3.0},
+         "risk_settings": {"forex": {"risk_percent": 0.5}, "metals": {"risk_percent": 0.5}}}
+    ]
+}
+
+`risk_params` dan `risk_settings` (per tipe instrument) menimpa config.json
+hanya untuk akun tersebut.
+
+    python accounts.py --config accounts.json
+"""
+import argparse
+import json
+import multiprocessing
+import queue
+import threading
+import time
+
+CREDENTIAL_KEYS = ('login', 'password', 'server', 'path')
+# Pengaturan config.json yang bisa ditimpa per akun
+OVERRIDE_KEYS = ('risk_params', 'risk_settings')
+
+
+def account_name(account):
+    return account.get('name') or str(account['login'])
+
+
+def run_worker(account, commands, events, max_signal_age=30.0):
+    """
+    Loop process worker satu akun: eksekusi sinyal & monitor posisi setiap pass
+    """
+    # Diimport di process worker supaya modul MT5 terikat ke terminal akun ini
+    import app
+
+    name = account_name(account)
+    analyzer = app.ForexGoldAnalyzer(
+        headless=True,
+        mt5_config={key: account[key] for key in CREDENTIAL_KEYS if key in account},
+        account_worker=True,
+        notify=lambda message: events.put((name, message)) or True,
+        # Tetap berlaku setelah config.json dimuat ulang
+        config_overrides={key: account[key] for key in OVERRIDE_KEYS if key in account}
+    )
+    events.put((name, f"✅ Worker akun {name} siap"))
+
+    try:
+        while True:
+            kind, payload = commands.get()
+            if kind == 'stop':
+                break
+
+            analyzer.apply_pending_settings()
+            analyzer.market.new_pass()
+            if not analyzer.check_mt5_connection() and not analyzer.initialize_mt5():
+                continue
+            analyzer.deal_tracker.poll()
+
+            if kind == 'signal':
+                age = time.time() - payload['time']
+                if age > max_signal_age:
+                    events.put((name, f"⚠️ Sinyal {payload['symbol']} dilewati, terlambat {age:.0f}s"))
+                    continue
+                analyzer.execute_trade(payload)
+            elif kind == 'pass':
+                analyzer.monitor_positions()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        analyzer.notifier.stop()
+        analyzer.journal.close()
+        app.mt5.shutdown()
+
+
+class AccountSupervisor:
+    """
+    Process worker per akun + fan-out sinyal dari loop analisa.
+    Dipakai sebagai `dispatcher` ForexGoldAnalyzer.
+    """
+
+    def __init__(self, accounts, notify=print, max_signal_age=30.0, queue_size=1000,
+                 restart_delay=5.0, max_restarts=5, stable_after=300.0):
+        self.accounts = accounts
+        self.notify = notify
+        self.max_signal_age = max_signal_age
+        self.queue_size = queue_size
+        # Jeda restart worker berlipat dua setiap gagal lagi; setelah max_restarts
+        # kegagalan berturut-turut akun dilepas. Worker yang sempat hidup
+        # stable_after detik dianggap sehat dan hitungannya mulai dari awal.
+        self.restart_delay = restart_delay
+        self.max_restarts = max_restarts
+        self.stable_after = stable_after
+        self.restarts = {}
+        # spawn: process baru tanpa state MT5 warisan (default di Windows)
+        self.context = multiprocessing.get_context('spawn')
+        self.events = self.context.Queue()
+        self.workers = {}
+        self.running = False
+        self.stats = {
+            'signals': 0,
+            'dropped': 0,
+            'restarts': 0,
+            'failed': 0
+        }
+
+    def start(self):
+        self.running = True
+        for account in self.accounts:
+            self._start_worker(account)
+        threading.Thread(target=self._drain_events, name='account-events', daemon=True).start()
+        return self
+
+    def _start_worker(self, account):
+        commands = self.context.Queue(self.queue_size)
+        process = self.context.Process(
+            target=run_worker,
+            args=(account, commands, self.events, self.max_signal_age),
+            name=f"account-{account_name(account)}",
+            daemon=True
+        )
+        process.start()
+        name = account_name(account)
+        self.workers[name] = (account, process, commands)
+        state = self.restarts.setdefault(name, {'failures': 0})
+        state.update(started=time.monotonic(), retry_at=None)
+
+    def _revive(self, name, account, process):
+        """
+        Worker mati (crash terminal dll): jalankan ulang dengan queue baru setelah
+        jeda backoff. Return True jika worker baru sudah dijalankan.
+        """
+        now = time.monotonic()
+        state = self.restarts[name]
+        if state['retry_at'] is None:
+            if now - state['started'] >= self.stable_after:
+                state['failures'] = 0
+            state['failures'] += 1
+            if state['failures'] > self.max_restarts:
+                self.notify(f"❌ Worker akun {name} berhenti {state['failures']} kali berturut-turut "
+                            f"(exit {process.exitcode}), akun tidak dijalankan lagi")
+                self.stats['failed'] += 1
+                del self.workers[name]
+                return False
+            delay = self.restart_delay * 2 ** (state['failures'] - 1)
+            state['retry_at'] = now + delay
+            self.notify(f"⚠️ Worker akun {name} berhenti (exit {process.exitcode}), dijalankan ulang dalam {delay:.0f}s")
+        if now < state['retry_at']:
+            return False
+        self.stats['restarts'] += 1
+        self._start_worker(account)
+        return True
+
+    def _broadcast(self, message):
+        for name, (account, process, commands) in list(self.workers.items()):
+            if not process.is_alive():
+                if not self._revive(name, account, process):
+                    # Akun tanpa worker hidup melewatkan pesan ini
+                    self.stats['dropped'] += 1
+                    continue
+                commands = self.workers[name][2]
+            try:
+                commands.put_nowait(message)
+            except queue.Full:
+                self.stats['dropped'] += 1
+
+    def signal(self, signal):
+        """
+        Kirim sinyal ke semua akun, diberi waktu supaya worker bisa membuang sinyal basi
+        """
+        self.stats['signals'] += 1
+        self._broadcast(('signal', dict(signal, time=time.time())))
+
+    def end_pass(self):
+        """
+        Akhir pass analisa: setiap worker memonitor posisi akunnya
+        """
+        self._broadcast(('pass', time.time()))
+
+    def stop(self, timeout=10.0):
+        self.running = False
+        for _, process, commands in self.workers.values():
+            try:
+                commands.put(('stop', None), timeout=1.0)
+            except queue.Full:
+                pass
+        for _, process, _ in self.workers.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+    def _drain_events(self):
+        while self.running:
+            try:
+                name, message = self.events.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            self.notify(f"[{name}] {message.strip()}")
+
+
+def load_accounts(path):
+    with open(path) as f:
+        config = json.load(f)
+    accounts = config.get('accounts', [])
+    if not accounts:
+        raise ValueError(f"Tidak ada akun di {path}")
+    names = [account_name(account) for account in accounts]
+    if len(set(names)) != len(names):
+        raise ValueError("Nama akun harus unik")
+    # Terminal data default: akun pertama
+    data = config.get('data') or {key: accounts[0][key] for key in CREDENTIAL_KEYS if key in accounts[0]}
+    return data, accounts
+
+
+def main():
+    import app
+
+    parser = argparse.ArgumentParser(description="Jalankan bot untuk banyak akun MT5")
+    parser.add_argument('--config', default='accounts.json', help="File konfigurasi akun")
+    parser.add_argument('--max-signal-age', type=float, default=30.0,
+                        help="Sinyal lebih tua dari ini (detik) tidak dieksekusi worker")
+    args = parser.parse_args()
+
+    data, accounts = load_accounts(args.config)
+    supervisor = AccountSupervisor(accounts, max_signal_age=args.max_signal_age).start()
+    analyzer = None
+    try:
+        analyzer = app.ForexGoldAnalyzer(headless=True, mt5_config=data, dispatcher=supervisor)
+        analyzer.run_auto_trading()
+    except KeyboardInterrupt:
+        print("\n⚠️ Program dihentikan oleh user")
+    finally:
+        supervisor.stop()
+        if analyzer is not None:
+            analyzer.notifier.stop()
+            analyzer.journal.close()
+            if analyzer.shared_bars is not None:
+                analyzer.shared_bars.close()
+        app.mt5.shutdown()
+
+
+if __name__ == '__main__':
+    main()
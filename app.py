@@ -1,29 +1,73 @@
-import MetaTrader5 as mt5
-import pandas as pd
-from datetime import datetime, timedelta
 import time
+# Awal import modul, untuk laporan waktu startup
+IMPORT_STARTED = time.perf_counter()
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import numpy as np
 import os
+import sys
 import json
-import telebot
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from telebot.handler_backends import State, StatesGroup
-from telebot.storage import StateMemoryStorage
-from pywinauto.application import Application
-import pywinauto.keyboard as keyboard
 import threading
 
+# ROBOT_FAKE_MT5=1 memakai terminal palsu (Linux / benchmark tanpa MT5)
+if os.environ.get('ROBOT_FAKE_MT5'):
+    import fake_mt5 as mt5
+else:
+    import MetaTrader5 as mt5
+
+import indicators
+from metrics import METRICS, InstrumentedTerminal
+from bar_cache import BarCache
+from bar_store import BarStore
+from config_watcher import ConfigWatcher
+from deal_tracker import DealTracker, net_profit
+from execution import OrderExecutor
+from indicator_engine import IndicatorEngine, indicator_params
+from journal import TradeJournal
+from market_snapshot import MarketSnapshot
+from notifier import Notifier
+import position_monitor
+from profiler import SamplingProfiler
+import resampler
+from scheduler import BarCloseScheduler, ServerClock, timeframe_seconds
+import settings
+from shared_bars import SharedBars
+import strategy
+
+# Latency setiap panggilan terminal tercatat di metrics
+mt5 = InstrumentedTerminal(mt5, METRICS)
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
 class ForexGoldAnalyzer:
-    def __init__(self):
+    def __init__(self, headless=False, mt5_config=None, dispatcher=None, account_worker=False, notify=None,
+                 config_overrides=None):
+        """
+        Pengaturan trading dibaca dari config.json (lihat settings.py) dan dimuat ulang
+        di antara pass saat file berubah. config_overrides: pengaturan yang selalu
+        menimpa isi file (misalnya risk per akun).
+        
+        Mode multi-akun (lihat accounts.py):
+        - dispatcher: proses analisa; sinyal diteruskan ke dispatcher.signal() dan
+          dispatcher.end_pass() menggantikan monitor posisi, tanpa order di proses ini
+        - account_worker: proses satu akun; hanya sizing, risk check, order & monitor
+          posisi (tanpa bar store / endpoint metrics, jurnal trades_<login>.db)
+        - notify: pengganti Telegram/email untuk pesan bot
+        """
+        startup_started = time.perf_counter()
+        
         # Konfigurasi MT5
         self.mt5_config = {
-            'login': ,  
+            'login': 0,  
             'password': '',  
             'server': '',  
             'path': r'C:\Program Files\MetaTrader 5\terminal64.exe'
         }
+        if mt5_config:
+            self.mt5_config.update(mt5_config)
+        self.dispatcher = dispatcher
+        self.account_worker = account_worker
+        self.notify = notify
         
         # Status login
         self.login_status = {
@@ -46,127 +90,377 @@ class ForexGoldAnalyzer:
         # Setup notifikasi Telegram
         self.notifications = {
             'telegram': {
-                'enabled': True,
+                # Mode headless berjalan tanpa Telegram
+                'enabled': not headless,
                 'token': 'YOUR_BOT_TOKEN',
                 'chat_id': 'YOUR_CHAT_ID',
                 'bot': None
+            },
+            # Ringkasan semua notifikasi lewat email setiap `interval` detik
+            'email': {
+                'enabled': False,
+                'smtp_server': 'smtp.gmail.com',
+                'smtp_port': 587,
+                'username': '',
+                'password': '',
+                'sender': '',
+                'recipients': [],
+                'interval': 3600
             }
         }
         
         # Trading pairs
         self.forex_pairs = ['EURUSD', 'GBPUSD', 'USDJPY', 'XAUUSD']
         
-        # Risk parameters
-        self.risk_params = {
-            'risk_percent': 1.0,
-            'max_daily_loss': 5.0,
-            'max_trades': 5,
-            'max_drawdown': 2.0  # dalam persen
+        # Pengaturan trading: default settings.py ditimpa config.json, dipantau perubahannya
+        self.config_settings = {
+            'path': 'config.json',
+            'watch': True,
+            # Jeda cek perubahan file (detik)
+            'interval': 1.0
         }
+        self.config_overrides = config_overrides
+        # Dipegang saat pengaturan diganti dan selama analisa, supaya thread lain
+        # tidak pernah melihat pengaturan setengah terpasang
+        self.settings_lock = threading.RLock()
+        self.config = settings.load_settings(self.config_settings['path'], config_overrides)
         
-        # Trading pairs dengan spread maksimum yang disesuaikan
-        self.trading_pairs = {
-            'forex': {
-                'EURUSD': {'max_spread': 20},
-                'GBPUSD': {'max_spread': 20},
-                'USDJPY': {'max_spread': 20},
-                'AUDUSD': {'max_spread': 25},
-                'USDCAD': {'max_spread': 25}
-            },
-            'metals': {
-                'GOLD': {'max_spread': 100},
-                'GOLD.a': {'max_spread': 100},
-                'GLD': {'max_spread': 100},
-                'XAUUSD': {'max_spread': 100}
-            },
-            'crypto': {
-                'BTCUSD': {'max_spread': 8200},
-                'ETHUSD': {'max_spread': 5000},
-                'LTCUSD': {'max_spread': 5000},
-                'XRPUSD': {'max_spread': 5000}
-            }
-        }
+        # Risk parameters
+        self.risk_params = self.config['risk_params']
+        
+        # Spread maksimum per symbol
+        self.max_spreads = self.config['max_spreads']
         
         # Risk settings per instrument type
-        self.risk_settings = {
-            'forex': {
-                'sl_pips': 30,
-                'tp_pips': 60,
-                'risk_percent': 1.0
-            },
-            'metals': {
-                'sl_pips': 100,
-                'tp_pips': 200,
-                'risk_percent': 1.0
-            },
-            'crypto': {
-                'sl_percent': 2.0,
-                'tp_percent': 4.0,
-                'risk_percent': 1.0
-            }
-        }
+        self.risk_settings = self.config['risk_settings']
         
         # Konfigurasi pairs yang akan dianalisa
-        self.trading_pairs = {
-            'forex': ['EURUSD', 'GBPUSD', 'USDJPY'],
-            'metals': ['GOLD', 'GOLD.a', 'GLD','XAUUSD'],  # Variasi simbol Gold untuk berbagai broker
-            'crypto': ['BTCUSD', 'ETHUSD', 'LTCUSD', 'XRPUSD']
-        }
+        self.trading_pairs = self.config['trading_pairs']
         
         # Pengaturan analisa per instrument
-        self.analysis_settings = {
-            'forex': {
-                'timeframes': [mt5.TIMEFRAME_M5, mt5.TIMEFRAME_M15, mt5.TIMEFRAME_H1],
-                'ma_periods': {'fast': 20, 'slow': 50},
-                'rsi_period': 14,
-                'bb_period': 20,
-                'macd_settings': {'fast': 12, 'slow': 26, 'signal': 9}
-            },
-            'metals': {
-                'timeframes': [mt5.TIMEFRAME_M15, mt5.TIMEFRAME_H1, mt5.TIMEFRAME_H4],
-                'ma_periods': {'fast': 20, 'slow': 50},
-                'rsi_period': 14,
-                'bb_period': 20,
-                'macd_settings': {'fast': 12, 'slow': 26, 'signal': 9}
-            },
-            'crypto': {
-                'timeframes': [mt5.TIMEFRAME_H1, mt5.TIMEFRAME_H4, mt5.TIMEFRAME_D1],
-                'ma_periods': {'fast': 10, 'slow': 30},
-                'rsi_period': 14,
-                'bb_period': 20,
-                'macd_settings': {'fast': 12, 'slow': 26, 'signal': 9}
-            }
+        self.analysis_settings = self.resolve_analysis_settings(self.config)
+        
+        # Trailing parameters
+        self.trailing_params = self.config['trailing_params']
+        
+        # Market filters
+        self.market_filters = settings.resolve_market_filters(self.config['market_filters'])
+        
+        # Parameter indikator untuk calculate_indicators / analyze_signals
+        self.indicators = {
+            'ema_fast': 20,
+            'ema_medium': 50,
+            'ema_slow': 100,
+            'rsi_period': 14,
+            'macd_fast': 12,
+            'macd_slow': 26,
+            'macd_signal': 9,
+            'atr_period': 14
+        }
+        
+        # State indikator inkremental per (symbol, timeframe)
+        self.indicator_engine = IndicatorEngine()
+        
+        # Pengaturan performa loop trading
+        self.performance_settings = {
+            # Jumlah symbol minimal per instrument untuk memakai analisa batch
+            'batch_min_symbols': 10,
+            # Jumlah bar yang disimpan per (symbol, timeframe) di bar cache
+            'bar_cache_depth': 100,
+            # Umur maksimal symbol_info / tick / account_info di market snapshot (detik)
+            'snapshot_ttl': 1.0,
+            # Bangun timeframe besar dari timeframe terkecil (satu request bar per symbol)
+            'resample_timeframes': True,
+            # Folder bar store di disk (None = bar tidak disimpan)
+            'bar_store_path': None if account_worker else 'bars',
+            # Prefix buffer bar di shared memory untuk process lain (None = tidak dibagi)
+            'shared_bars_prefix': None
+        }
+        
+        # Cache bar per (symbol, timeframe), hanya bar baru yang diambil dari terminal
+        cache_depth = self.required_cache_depth()
+        store_path = self.performance_settings['bar_store_path']
+        self.bar_store = BarStore(store_path) if store_path else None
+        shared_prefix = self.performance_settings['shared_bars_prefix']
+        self.shared_bars = SharedBars(shared_prefix) if shared_prefix and not account_worker else None
+        self.bar_cache = BarCache(mt5, depth=cache_depth, store=self.bar_store, shared=self.shared_bars)
+        
+        # symbol_info, tick & account_info diambil sekali per pass loop
+        self.market = MarketSnapshot(mt5, ttl=self.performance_settings['snapshot_ttl'])
+        
+        # Skor momentum bar close terakhir per (symbol, timeframe)
+        self.timeframe_scores = {}
+        
+        # Scheduler yang bangun tepat saat bar close (jam server broker)
+        all_symbols = [symbol for symbols in self.trading_pairs.values() for symbol in symbols]
+        self.scheduler = BarCloseScheduler(ServerClock(mt5, all_symbols))
+        
+        # Deal baru diambil inkremental tiap pass: statistik & batas rugi harian
+        self.deal_tracker = DealTracker(mt5, self.scheduler.clock)
+        self.daily_loss_notified = None
+        
+        # Pengaturan startup
+        self.startup_settings = {
+            # Ambil history, symbol_info & filling mode semua symbol sebelum pass pertama
+            'prefetch': True,
+            'prefetch_workers': 8,
+            # Batas tunggu bot Telegram siap di akhir startup (detik)
+            'telegram_timeout': 30
         }
+        # Waktu setiap tahap startup (detik), lihat report_startup()
+        self.startup_timings = {'import': IMPORT_SECONDS}
         
-        # Initialize Telegram bot
+        # Bot Telegram (import telebot + handler) disiapkan di background
+        # selama koneksi ke terminal MT5
+        self.telegram_ready = threading.Event()
         if self.notifications['telegram']['enabled']:
-            self.initialize_telegram_bot()
-
-        # Market filters
-        self.market_filters = {
-            'trading_hours': {
-                'start': datetime.strptime('09:00', '%H:%M').time(),
-                'end': datetime.strptime('17:00', '%H:%M').time()
-            },
-            'max_spread': 3.0
+            threading.Thread(target=self.startup_telegram, name='telegram-startup', daemon=True).start()
+        else:
+            self.telegram_ready.set()
+        
+        # Notifikasi dikirim di background, loop trading tidak menunggu Telegram/SMTP
+        self.notifier = Notifier(
+            telegram_send=self.deliver_telegram if self.notifications['telegram']['enabled'] else None,
+            chat_id=self.notifications['telegram']['chat_id'],
+            email=self.notifications['email']
+        ).start()
+
+        # Jurnal trading (SQLite), ditulis batch di background
+        self.journal_settings = {
+            'path': f"trades_{self.mt5_config['login']}.db" if account_worker else 'trades.db',
+            'batch_size': 200,
+            'flush_interval': 1.0
         }
+        self.journal = TradeJournal(**self.journal_settings)
 
-        # Trailing parameters
-        self.trailing_params = {
+        # Endpoint Prometheus lokal untuk latency & counter loop trading
+        self.metrics_settings = {
             'enabled': True,
-            'start_pips': 20,
-            'step_pips': 10,
-            'min_step': 5
+            'host': '127.0.0.1',
+            'port': 9108
         }
-
+        METRICS.enabled = self.metrics_settings['enabled']
+        self.metrics_server = None
+        if self.metrics_settings['enabled'] and self.metrics_settings['port'] and not account_worker:
+            try:
+                self.metrics_server = METRICS.serve(self.metrics_settings['host'], self.metrics_settings['port'])
+            except OSError as e:
+                print(f"❌ Error menjalankan endpoint metrics: {e}")
+
+        # Eksekusi order: tick segar, filling mode per symbol, retry requote dalam budget
+        self.execution_settings = {
+            'budget': 0.5,
+            'max_attempts': 5,
+            # Deviation maksimal (points) per instrument
+            'deviation': {'forex': 20, 'metals': 50, 'crypto': 2000}
+        }
+        self.executor = OrderExecutor(
+            mt5,
+            budget=self.execution_settings['budget'],
+            max_attempts=self.execution_settings['max_attempts'],
+            on_attempt=self.record_execution
+        )
+
+        # Profile CPU loop trading on-demand (/profile N)
+        self.profile_settings = {
+            'interval': 0.005,
+            'path': 'profiles',
+            'max_passes': 50
+        }
+        self.profile_request = None
+        self.profiler = None
+
+        # config.json baru dipasang di antara pass (apply_pending_settings)
+        self.config_watcher = None
+        if self.config_settings['watch']:
+            self.config_watcher = ConfigWatcher(
+                self.config_settings['path'],
+                overrides=config_overrides,
+                interval=self.config_settings['interval'],
+                on_change=self.on_config_change,
+                on_error=self.on_config_error
+            ).start()
+
+        self.startup_timings['setup'] = time.perf_counter() - startup_started
+        
         # Inisialisasi MT5 saat startup
-        self.initialize_mt5()
+        started = time.perf_counter()
+        connected = self.initialize_mt5()
+        self.startup_timings['mt5_connect'] = time.perf_counter() - started
+        
+        if connected and self.startup_settings['prefetch']:
+            started = time.perf_counter()
+            self.prefetch_market_data()
+            self.startup_timings['prefetch'] = time.perf_counter() - started
+        
+        self.telegram_ready.wait(self.startup_settings['telegram_timeout'])
+        self.startup_timings['total'] = IMPORT_SECONDS + time.perf_counter() - startup_started
+        print(self.report_startup())
+
+    def resolve_analysis_settings(self, config):
+        """
+        analysis_settings dengan timeframe sebagai konstanta MT5
+        """
+        return settings.resolve_timeframes(
+            config['analysis_settings'],
+            lambda name: getattr(mt5, f"TIMEFRAME_{name}")
+        )
+
+    def required_cache_depth(self):
+        """
+        Kedalaman bar cache. Jika resample aktif, buffer timeframe terkecil harus
+        cukup dalam untuk membangun 100 bar timeframe terbesar.
+        """
+        depth = self.performance_settings['bar_cache_depth']
+        if self.performance_settings['resample_timeframes']:
+            for analysis in self.analysis_settings.values():
+                base_tf = min(analysis['timeframes'], key=timeframe_seconds)
+                depth = max(depth, resampler.source_bars(base_tf, analysis['timeframes'], 100))
+        return depth
+
+    def on_config_change(self, config):
+        """
+        Dipanggil thread watcher. Saat loop trading berjalan (atau di worker akun)
+        pengaturan dipasang di awal pass/perintah berikutnya; jika tidak, langsung dipasang
+        di bawah settings_lock (analisa dari thread lain menunggu sampai selesai).
+        """
+        with self.settings_lock:
+            if not self.bot_status['is_running'] and not self.account_worker:
+                self.apply_pending_settings()
+
+    def on_config_error(self, message):
+        print(message)
+        self.send_telegram(message)
+
+    def apply_pending_settings(self):
+        """
+        Pasang pengaturan baru dari config watcher (jika ada). Return True jika dipasang.
+        """
+        if self.config_watcher is None:
+            return False
+        with self.settings_lock:
+            config = self.config_watcher.take()
+            if config is None:
+                return False
+            sections, reset = self.apply_settings(config)
+        if sections:
+            message = f"⚙️ {self.config_settings['path']} dimuat ulang: {', '.join(sections)}"
+            if reset:
+                message += f"\nCache & indikator direset: {', '.join(reset)}"
+            print(message)
+            self.send_telegram(message)
+        return True
+
+    def apply_settings(self, config):
+        """
+        Ganti semua pengaturan trading sekaligus. Bar cache, state indikator & skor
+        timeframe hanya dibuang untuk symbol yang pengaturan analisanya berubah
+        (bar hanya jika timeframe-nya berubah). Return (bagian yang berubah, symbol direset).
+        """
+        previous = self.config
+        sections = [name for name in config if config[name] != previous.get(name)]
+        if not sections:
+            return [], []
+        
+        def analysis_by_symbol(source):
+            return {
+                symbol: (instrument_type, source['analysis_settings'][instrument_type])
+                for instrument_type, symbols in source['trading_pairs'].items()
+                for symbol in symbols
+            }
+        
+        before = analysis_by_symbol(previous)
+        after = analysis_by_symbol(config)
+        reset = [symbol for symbol in before if before[symbol] != after.get(symbol)]
+        reload_bars = [
+            symbol for symbol in reset
+            if symbol not in after or before[symbol][1]['timeframes'] != after[symbol][1]['timeframes']
+        ]
+        
+        # Semua objek baru disiapkan dulu, lalu dipasang berurutan tanpa pass di antaranya
+        analysis_settings = self.resolve_analysis_settings(config)
+        market_filters = settings.resolve_market_filters(config['market_filters'])
+        
+        self.config = config
+        self.risk_params = config['risk_params']
+        self.max_spreads = config['max_spreads']
+        self.risk_settings = config['risk_settings']
+        self.trading_pairs = config['trading_pairs']
+        self.analysis_settings = analysis_settings
+        self.trailing_params = config['trailing_params']
+        self.market_filters = market_filters
+        
+        for symbol in reset:
+            self.indicator_engine.reset(symbol)
+            for key in [key for key in self.timeframe_scores if key[0] == symbol]:
+                del self.timeframe_scores[key]
+        for symbol in reload_bars:
+            self.bar_cache.invalidate(symbol)
+            if symbol not in after:
+                self.executor.invalidate(symbol)
+        # Buffer lama tetap dipakai; kedalaman baru berlaku untuk buffer yang dimuat ulang
+        self.bar_cache.depth = max(self.bar_cache.depth, self.required_cache_depth())
+        self.scheduler.clock.symbols = list(after)
+        return sections, reset
+
+    def startup_telegram(self):
+        """
+        Siapkan bot Telegram (dijalankan thread startup)
+        """
+        started = time.perf_counter()
+        try:
+            self.initialize_telegram_bot()
+        finally:
+            self.startup_timings['telegram'] = time.perf_counter() - started
+            self.telegram_ready.set()
+
+    def prefetch_market_data(self):
+        """
+        Isi cache sebelum pass pertama secara paralel: symbol_info & filling mode
+        (OrderExecutor) dan history bar (BarCache) setiap symbol yang dianalisa.
+        """
+        workers = self.startup_settings['prefetch_workers']
+        symbols = [symbol for symbols in self.trading_pairs.values() for symbol in symbols]
+        keys = []
+        for instrument_type, pairs in self.trading_pairs.items():
+            timeframes = self.analysis_settings[instrument_type]['timeframes']
+            if self.performance_settings['resample_timeframes']:
+                # Timeframe lain dibangun dari timeframe terkecil
+                timeframes = [min(timeframes, key=timeframe_seconds)]
+            keys.extend((symbol, tf) for symbol in pairs for tf in timeframes)
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(self.executor.symbol_modes, symbols))
+        # Worker akun tidak menganalisa, history bar tidak diperlukan
+        loaded = 0 if self.account_worker else self.bar_cache.prefetch(keys, workers)
+        print(f"✅ Prefetch {len(symbols)} symbol, {loaded}/{len(keys)} seri bar")
+        return loaded
+
+    def report_startup(self):
+        """
+        Ringkasan waktu startup per tahap
+        """
+        labels = (
+            ('import', 'Import modul'),
+            ('setup', 'Setup'),
+            ('telegram', 'Telegram (paralel)'),
+            ('mt5_connect', 'Koneksi MT5'),
+            ('prefetch', 'Prefetch data'),
+            ('total', 'Total')
+        )
+        lines = ["⏱️ Startup:"]
+        for key, label in labels:
+            if key in self.startup_timings:
+                lines.append(f"  {label:<20}{self.startup_timings[key] * 1000:>9.0f} ms")
+        return "\n".join(lines)
 
     def initialize_telegram_bot(self):
         """
         Inisialisasi bot Telegram
         """
         try:
+            # Import di sini: mode headless tidak perlu memuat telebot
+            import telebot
             bot = telebot.TeleBot(self.notifications['telegram']['token'])
             self.notifications['telegram']['bot'] = bot
             self.setup_telegram_commands()
@@ -190,97 +484,140 @@ class ForexGoldAnalyzer:
 
     def send_telegram(self, message):
         """
-        Kirim pesan ke Telegram
+        Kirim pesan ke Telegram (dan email digest) lewat notifier background.
+        Tidak pernah menunggu; return False jika notifikasi nonaktif atau queue penuh.
         """
-        try:
-            if self.notifications['telegram']['enabled']:
-                bot = self.notifications['telegram']['bot']
-                bot.send_message(
-                    self.notifications['telegram']['chat_id'],
-                    message
-                )
-                return True
-            return False
-        except Exception as e:
-            print(f"❌ Error sending Telegram message: {e}")
+        if self.notify is not None:
+            return self.notify(message)
+        if not (self.notifications['telegram']['enabled'] or self.notifications['email']['enabled']):
             return False
+        return self.notifier.notify(message)
 
-    def display_trade_history(self):
-        try:
-            if not self.trade_history:
-                print("\nBelum ada history trading")
-                return
+    def deliver_telegram(self, chat_id, message):
+        """
+        Kirim pesan ke Telegram secara langsung (dipanggil thread notifier)
+        """
+        # Pesan startup bisa masuk sebelum thread startup selesai menyiapkan bot
+        self.telegram_ready.wait(self.startup_settings['telegram_timeout'])
+        with METRICS.timer('telegram_send'):
+            self.notifications['telegram']['bot'].send_message(chat_id, message)
 
-            print("\n=== TRADING HISTORY ===")
-            for trade in self.trade_history:
-                print(f"\nTrade pada {trade['datetime']}")
-                print(f"Symbol: {trade['symbol']}")
-                print(f"Type: {trade['type']}")
-                print(f"Lot: {trade['lot_size']}")
-                print(f"Entry: {trade['entry']}")
-                print(f"SL: {trade['sl']}")
-                print(f"TP1: {trade['tp1']}")
-                print(f"TP2: {trade['tp2']}")
+    def display_trade_history(self, limit=10):
+        """
+        History trade terbaru dari jurnal
+        """
+        try:
+            trades = self.journal.recent_trades(limit)
+            if not trades:
+                return "Belum ada history trading"
+
+            lines = ["📜 TRADING HISTORY"]
+            for trade in trades:
+                opened = datetime.fromtimestamp(trade['open_time']).strftime('%Y-%m-%d %H:%M')
+                lines.append(f"\n#{trade['ticket']} {trade['symbol']} {trade['side']} {trade['volume'] or 0:.2f} lot")
+                lines.append(f"Open: {opened} @ {trade['open_price'] or 0:.5f}")
+                lines.append(f"SL: {trade['sl'] or 0:.5f}  TP: {trade['tp'] or 0:.5f}")
+                if trade['close_time'] is None:
+                    lines.append("Status: 🟡 Terbuka")
+                else:
+                    closed = datetime.fromtimestamp(trade['close_time']).strftime('%Y-%m-%d %H:%M')
+                    lines.append(f"Close: {closed} @ {trade['close_price'] or 0:.5f} ({trade['close_reason'] or '-'})")
+                    lines.append(f"Profit: ${trade['profit'] or 0:.2f}")
+            history = "\n".join(lines)
+            print(history)
+            return history
                 
         except Exception as e:
             print(f"❌ Error menampilkan trade history: {e}")
+            return f"❌ Error menampilkan trade history: {e}"
 
     def get_price_data(self, symbol, timeframe, bars=100):
         """
-        Mengambil data harga dari MT5
+        Mengambil data harga dari MT5: structured array rates (view bar cache,
+        time dalam epoch detik). Kolom dibaca sebagai view, misalnya rates['close'].
         """
         try:
-            rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, bars)
-            df = pd.DataFrame(rates)
-            df['time'] = pd.to_datetime(df['time'], unit='s')
-            return df
+            return self.get_rates(symbol, timeframe, bars)
         except Exception as e:
             print(f"❌ Error mengambil data harga: {e}")
             return None
 
-    def calculate_indicators(self, df):
+    def get_rates(self, symbol, timeframe, bars=100):
+        """
+        Mengambil bar dari bar cache (structured array MT5, bar terakhir masih berjalan)
+        """
+        return self.bar_cache.get(symbol, timeframe, bars)
+
+    def get_analysis_rates(self, symbol, timeframes, bars=100, base_timeframe=None):
         """
-        Menghitung indikator teknikal
+        Rates untuk beberapa timeframe sekaligus: {timeframe: rates}.
+        Hanya timeframe terkecil (base_timeframe) yang diambil dari terminal,
+        timeframe lain dibangun lokal dengan resampler.
+        """
+        if not self.performance_settings['resample_timeframes']:
+            return {tf: self.get_rates(symbol, tf, bars) for tf in timeframes}
+        
+        if base_timeframe is None:
+            base_timeframe = min(timeframes, key=timeframe_seconds)
+        base = self.get_rates(symbol, base_timeframe, resampler.source_bars(base_timeframe, timeframes, bars))
+        if base is None:
+            return {tf: None for tf in timeframes}
+        
+        return {
+            tf: base[-bars:] if tf == base_timeframe else resampler.resample(base, tf)[-bars:]
+            for tf in timeframes
+        }
+
+    def calculate_indicators(self, rates):
+        """
+        Menghitung indikator teknikal. Return dict kolom (view field rates + array indikator).
         """
         try:
+            close = rates['close']
+            high = rates['high']
+            low = rates['low']
+            
+            frame = {
+                'time': rates['time'],
+                'open': rates['open'],
+                'high': high,
+                'low': low,
+                'close': close,
+                'tick_volume': rates['tick_volume']
+            }
+            
             # EMA
-            df['EMA_fast'] = df['close'].ewm(span=self.indicators['ema_fast']).mean()
-            df['EMA_medium'] = df['close'].ewm(span=self.indicators['ema_medium']).mean()
-            df['EMA_slow'] = df['close'].ewm(span=self.indicators['ema_slow']).mean()
+            frame['EMA_fast'] = indicators.ema(close, self.indicators['ema_fast'])
+            frame['EMA_medium'] = indicators.ema(close, self.indicators['ema_medium'])
+            frame['EMA_slow'] = indicators.ema(close, self.indicators['ema_slow'])
             
             # RSI
-            delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=self.indicators['rsi_period']).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=self.indicators['rsi_period']).mean()
-            rs = gain / loss
-            df['RSI'] = 100 - (100 / (1 + rs))
+            frame['RSI'] = indicators.rsi(close, self.indicators['rsi_period'])
             
             # MACD
-            exp1 = df['close'].ewm(span=self.indicators['macd_fast']).mean()
-            exp2 = df['close'].ewm(span=self.indicators['macd_slow']).mean()
-            df['MACD'] = exp1 - exp2
-            df['Signal'] = df['MACD'].ewm(span=self.indicators['macd_signal']).mean()
+            frame['MACD'], frame['Signal'] = indicators.macd(
+                close,
+                self.indicators['macd_fast'],
+                self.indicators['macd_slow'],
+                self.indicators['macd_signal']
+            )
             
             # ATR
-            high_low = df['high'] - df['low']
-            high_close = abs(df['high'] - df['close'].shift())
-            low_close = abs(df['low'] - df['close'].shift())
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = ranges.max(axis=1)
-            df['ATR'] = true_range.rolling(window=self.indicators['atr_period']).mean()
-            
-            return df
+            frame['ATR'] = indicators.atr(high, low, close, self.indicators['atr_period'])
+            
+            return frame
         except Exception as e:
             print(f"❌ Error menghitung indikator: {e}")
             return None
 
-    def analyze_signals(self, df):
+    def analyze_signals(self, frame):
         """
-        Menganalisis sinyal trading
+        Menganalisis sinyal trading dari dua bar terakhir hasil calculate_indicators
         """
         try:
-            current = df.iloc[-1]
-            prev = df.iloc[-2]
+            ema_fast, ema_slow = frame['EMA_fast'], frame['EMA_slow']
+            macd, macd_signal = frame['MACD'], frame['Signal']
+            rsi = frame['RSI'][-1]
             
             signals = {
                 'ema': 'NEUTRAL',
@@ -290,26 +627,26 @@ class ForexGoldAnalyzer:
             }
             
             # EMA Signal
-            if current['EMA_fast'] > current['EMA_slow'] and prev['EMA_fast'] <= prev['EMA_slow']:
+            if ema_fast[-1] > ema_slow[-1] and ema_fast[-2] <= ema_slow[-2]:
                 signals['ema'] = 'BUY'
                 signals['strength'] += 1
-            elif current['EMA_fast'] < current['EMA_slow'] and prev['EMA_fast'] >= prev['EMA_slow']:
+            elif ema_fast[-1] < ema_slow[-1] and ema_fast[-2] >= ema_slow[-2]:
                 signals['ema'] = 'SELL'
                 signals['strength'] -= 1
                 
             # RSI Signal
-            if current['RSI'] < 30:
+            if rsi < 30:
                 signals['rsi'] = 'BUY'
                 signals['strength'] += 1
-            elif current['RSI'] > 70:
+            elif rsi > 70:
                 signals['rsi'] = 'SELL'
                 signals['strength'] -= 1
                 
             # MACD Signal
-            if current['MACD'] > current['Signal'] and prev['MACD'] <= prev['Signal']:
+            if macd[-1] > macd_signal[-1] and macd[-2] <= macd_signal[-2]:
                 signals['macd'] = 'BUY'
                 signals['strength'] += 2
-            elif current['MACD'] < current['Signal'] and prev['MACD'] >= prev['Signal']:
+            elif macd[-1] < macd_signal[-1] and macd[-2] >= macd_signal[-2]:
                 signals['macd'] = 'SELL'
                 signals['strength'] -= 2
                 
@@ -319,30 +656,26 @@ class ForexGoldAnalyzer:
             print(f"❌ Error menganalisis sinyal: {e}")
             return None
 
-    def calculate_position_size(self, symbol, stop_loss_pips):
+    def calculate_position_size(self, symbol, stop_loss_pips, risk_percent=1.0):
         """
         Hitung ukuran posisi dengan risk 1% dari modal
         """
         try:
-            account_info = mt5.account_info()
+            account_info = self.market.account_info()
             if account_info is None:
                 return 0.01  # Default minimal lot
             
-            # Risk 1% dari balance
-            risk_amount = account_info.balance * 0.01  # 1% risk per trade
-            
-            # Hitung nilai per pip
-            symbol_info = mt5.symbol_info(symbol)
-            pip_value = symbol_info.trade_tick_value * (10 if symbol_info.digits == 3 else 1)
-            
-            # Hitung lot size berdasarkan risk
-            lot_size = risk_amount / (stop_loss_pips * pip_value)
+            symbol_info = self.market.symbol_info(symbol)
             
-            # Round dan batasi lot size
-            lot_size = round(lot_size, 2)
-            lot_size = max(0.01, min(lot_size, symbol_info.volume_max))
-            
-            return lot_size
+            # Lot size supaya kerugian saat SL kena = risk_percent dari balance
+            return strategy.position_size(
+                account_info.balance,
+                risk_percent,
+                stop_loss_pips,
+                symbol_info.trade_tick_value,
+                symbol_info.digits,
+                symbol_info.volume_max
+            )
             
         except Exception as e:
             print(f"❌ Error calculating position size: {e}")
@@ -369,7 +702,7 @@ class ForexGoldAnalyzer:
                     total_loss += abs(pos.profit)
             
             # Cek jika total kerugian sudah mencapai 1% dari modal
-            account_info = mt5.account_info()
+            account_info = self.market.account_info()
             max_loss = account_info.balance * 0.01  # 1% dari modal
             
             if total_loss >= max_loss:
@@ -383,17 +716,18 @@ Max Loss: ${max_loss:.2f}
                 return False
             
             # Setup order dengan SL yang ketat
-            symbol_info = mt5.symbol_info(symbol)
+            symbol_info = self.market.symbol_info(symbol)
+            tick = self.market.symbol_info_tick(symbol)
             point = symbol_info.point
             
             if action == 'BUY':
                 order_type = mt5.ORDER_TYPE_BUY
-                price = mt5.symbol_info_tick(symbol).ask
+                price = tick.ask
                 sl = price - (30 * point)  # 30 pips SL
                 tp = price + (60 * point)  # 60 pips TP (1:2 risk:reward)
             else:
                 order_type = mt5.ORDER_TYPE_SELL
-                price = mt5.symbol_info_tick(symbol).bid
+                price = tick.bid
                 sl = price + (30 * point)
                 tp = price - (60 * point)
             
@@ -423,17 +757,17 @@ Risk: 1% (${max_loss:.2f})
                 "price": price,
                 "sl": sl,
                 "tp": tp,
-                "deviation": 10,
+                "deviation": self.order_deviation(symbol),
                 "magic": 234000,
                 "comment": "risk_1_percent",
                 "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
             }
             
-            # Kirim order
-            result = mt5.order_send(request)
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                self.send_telegram(f"❌ Order gagal: {result.comment}")
+            # Kirim order (harga & filling mode diisi executor)
+            result = self.executor.send(request)
+            self.market.invalidate(symbol)
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                self.send_telegram(f"❌ Order gagal: {result.comment if result else mt5.last_error()}")
                 return False
             
             # Kirim konfirmasi order berhasil
@@ -473,13 +807,14 @@ TP: {tp:.5f}
                 return False, "Di luar jam trading"
                 
             # Cek spread
-            symbol_info = mt5.symbol_info(symbol)
+            symbol_info = self.market.symbol_info(symbol)
             if symbol_info.spread > self.market_filters['max_spread']:
                 return False, f"Spread terlalu tinggi ({symbol_info.spread} pips)"
                 
             # Cek volatilitas
-            df = self.get_price_data(symbol, mt5.TIMEFRAME_H1, 24)
-            volatility = (df['high'].max() - df['low'].min()) / df['low'].min() * 100
+            rates = self.get_price_data(symbol, mt5.TIMEFRAME_H1, 24)
+            low = rates['low'].min()
+            volatility = (rates['high'].max() - low) / low * 100
             if volatility < self.market_filters['min_volatility']:
                 return False, "Volatilitas terlalu rendah"
                 
@@ -496,24 +831,25 @@ TP: {tp:.5f}
             if not self.trailing_params['enabled']:
                 return
                 
-            symbol_info = mt5.symbol_info(position.symbol)
+            symbol_info = self.market.symbol_info(position.symbol)
+            tick = self.market.symbol_info_tick(position.symbol)
             point = symbol_info.point
             
             # Hitung profit dalam pips
             if position.type == mt5.ORDER_TYPE_BUY:
-                profit_pips = (mt5.symbol_info_tick(position.symbol).bid - position.price_open) / point
+                profit_pips = (tick.bid - position.price_open) / point
             else:
-                profit_pips = (position.price_open - mt5.symbol_info_tick(position.symbol).ask) / point
+                profit_pips = (position.price_open - tick.ask) / point
                 
             # Update trailing stop jika profit melebihi activation_pips
             if profit_pips > self.trailing_params['activation_pips']:
                 new_sl = None
                 if position.type == mt5.ORDER_TYPE_BUY:
-                    new_sl = mt5.symbol_info_tick(position.symbol).bid - (self.trailing_params['trailing_distance'] * point)
+                    new_sl = tick.bid - (self.trailing_params['trailing_distance'] * point)
                     if new_sl > position.sl and new_sl > position.price_open:
                         self.modify_position(position.ticket, new_sl)
                 else:
-                    new_sl = mt5.symbol_info_tick(position.symbol).ask + (self.trailing_params['trailing_distance'] * point)
+                    new_sl = tick.ask + (self.trailing_params['trailing_distance'] * point)
                     if new_sl < position.sl and new_sl < position.price_open:
                         self.modify_position(position.ticket, new_sl)
                         
@@ -522,36 +858,74 @@ TP: {tp:.5f}
 
     def generate_report(self):
         """
-        Generate laporan performa trading
+        Generate laporan performa trading dari jurnal
         """
         try:
-            if self.performance['total_trades'] > 0:
-                self.performance['win_rate'] = (self.performance['winning_trades'] / 
-                                              self.performance['total_trades'] * 100)
+            overall = self.journal.summary()
+            self.deal_tracker.poll()
+            today_start = datetime.combine(datetime.now().date(), datetime.min.time()).timestamp()
+            today = self.journal.summary(since=today_start)
+            execution = self.journal.execution_summary(since=time.time() - 86400)
+            profit_factor = f"{overall['profit_factor']:.2f}" if overall['profit_factor'] is not None else 'N/A'
                 
             report = f"""
 📊 TRADING PERFORMANCE REPORT
 📅 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
-Total Trades: {self.performance['total_trades']}
-Win Rate: {self.performance['win_rate']:.2f}%
-Profit Factor: {abs(self.performance['total_profit']/self.performance['total_loss']) if self.performance['total_loss'] != 0 else 'N/A'}
+Total Trades: {overall['total_trades']}
+Win Rate: {overall['win_rate']:.2f}%
+Profit Factor: {profit_factor}
+
+🟢 Winning Trades: {overall['winning_trades']}
+🔴 Losing Trades: {overall['losing_trades']}
 
-🟢 Winning Trades: {self.performance['winning_trades']}
-🔴 Losing Trades: {self.performance['losing_trades']}
+💰 Total Profit: ${overall['total_profit']:.2f}
+📉 Total Loss: ${abs(overall['total_loss']):.2f}
+📈 Net P/L: ${overall['net_profit']:.2f}
 
-💰 Total Profit: ${self.performance['total_profit']:.2f}
-📉 Total Loss: ${abs(self.performance['total_loss']):.2f}
-📈 Net P/L: ${(self.performance['total_profit'] + self.performance['total_loss']):.2f}
+Today's P/L: ${today['net_profit']:.2f} ({today['total_trades']} trades)
 
-Today's P/L: ${self.performance['daily_profit_loss']:.2f}
+📒 Akun ({self.deal_tracker.history_days} hari terakhir)
+Realized Hari Ini: ${self.deal_tracker.daily_pnl():.2f} (limit {self.risk_params['max_daily_loss']}%)
+Win Rate: {self.deal_tracker.win_rate:.2f}% dari {self.deal_tracker.stats['trades']} trades
+Max Drawdown: ${self.deal_tracker.stats['max_drawdown']:.2f}
+
+⚡ Eksekusi 24 Jam
+Percobaan: {execution['attempts']} (fill {execution['fills']}, requote {execution['requotes']})
+RTT: avg {execution['rtt_mean'] or 0:.1f} ms, max {execution['rtt_max'] or 0:.1f} ms
+Slippage: avg {execution['slippage_mean'] or 0:.1f}, max {execution['slippage_max'] or 0:.1f} points
             """
             
-            self.send_telegram(report)
             return report
             
         except Exception as e:
             print(f"❌ Error generating report: {e}")
+            return f"❌ Error generating report: {e}"
+
+    def display_latency(self, terminal_calls=8):
+        """
+        Ringkasan latency per tahap loop & panggilan terminal (ms) dari metrics
+        """
+        stages = METRICS.latency_summary('robot_stage_seconds')
+        execution = self.executor.summary()
+        if not stages and not execution:
+            return "Belum ada data latency"
+
+        lines = ["⏱ LATENCY (ms)", "tahap: n | p50 | p99 | max"]
+        for name, count, p50, _, p99, max_ in stages:
+            lines.append(f"{name}: {count} | {p50:.2f} | {p99:.2f} | {max_:.2f}")
+
+        calls = METRICS.latency_summary('robot_terminal_call_seconds')[:terminal_calls]
+        if calls:
+            lines.append("\n🔌 Terminal MT5")
+            for name, count, p50, _, p99, max_ in calls:
+                lines.append(f"{name}: {count} | {p50:.2f} | {p99:.2f} | {max_:.2f}")
+
+        if execution:
+            lines.append(f"\n⚡ Eksekusi ({execution['attempts']} percobaan terakhir)")
+            lines.append(f"RTT: avg {execution['rtt_mean']:.1f} | p95 {execution['rtt_p95']:.1f} | max {execution['rtt_max']:.1f}")
+            lines.append(f"Slippage avg: {execution['slippage_mean']:.1f} points, requote: {execution['requotes']}")
+        return "\n".join(lines)
 
     def setup_telegram_commands(self):
         """
@@ -578,6 +952,8 @@ Perintah yang tersedia:
 /positions - Cek posisi terbuka
 /history - Lihat history trading
 /report - Lihat laporan performa
+/latency - Lihat latency loop trading
+/profile N - Profile CPU N pass berikutnya
 /settings - Lihat pengaturan bot
 /help - Bantuan
                 """
@@ -599,9 +975,8 @@ Perintah yang tersedia:
                 
                 try:
                     # Start trading dalam thread baru
+                    # (is_running di-set oleh run_auto_trading sendiri)
                     import threading
-                    self.bot_status['is_running'] = True
-                    self.bot_status['start_time'] = datetime.now()
                     
                     trading_thread = threading.Thread(target=self.run_auto_trading)
                     trading_thread.daemon = True
@@ -781,6 +1156,9 @@ Bot Status: {status}
 MT5 Connection: {login_status}
 Running Time: {runtime}
 Total Signals: {self.bot_status['total_signals']}
+Wake-up Lateness: {self.format_lateness()}
+Snapshot: {self.market.saved} panggilan terminal dihemat
+Notifikasi: {self.notifier.stats['sent']} terkirim, {self.notifier.stats['coalesced']} digabung, {self.notifier.stats['dropped']} dibuang
 Last Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     """
                     bot.send_message(message.chat.id, status_text)
@@ -821,6 +1199,30 @@ Profit: ${pos.profit:.2f}
                         """
                     bot.send_message(message.chat.id, positions_text)
 
+            @bot.message_handler(commands=['history', 'report'])
+            def show_journal(message):
+                if str(message.chat.id) != self.notifications['telegram']['chat_id']:
+                    return
+                
+                if message.text[1:].startswith('history'):
+                    bot.send_message(message.chat.id, self.display_trade_history())
+                else:
+                    bot.send_message(message.chat.id, self.generate_report())
+
+            @bot.message_handler(commands=['latency'])
+            def show_latency(message):
+                if str(message.chat.id) != self.notifications['telegram']['chat_id']:
+                    return
+                bot.send_message(message.chat.id, self.display_latency())
+
+            @bot.message_handler(commands=['profile'])
+            def start_profile(message):
+                if str(message.chat.id) != self.notifications['telegram']['chat_id']:
+                    return
+                args = message.text.split()[1:]
+                passes = int(args[0]) if args and args[0].isdigit() else 1
+                bot.reply_to(message, self.request_profile(passes, message.chat.id))
+
             @bot.message_handler(commands=['settings'])
             def show_settings(message):
                 if str(message.chat.id) != self.notifications['telegram']['chat_id']:
@@ -884,27 +1286,35 @@ Status: Stopped
         try:
             print("\n=== MULAI PROSES LOGIN MT5 ===")
             
-            # Shutdown MT5 jika sudah berjalan
-            if mt5.initialize():
-                print("Menutup koneksi MT5 yang ada...")
-                mt5.shutdown()
-                time.sleep(2)
-            
-            # Inisialisasi MT5
-            print("\nMencoba inisialisasi MT5...")
-            init_result = mt5.initialize(
-                path=self.mt5_config['path'],
-                login=self.mt5_config['login'],
-                password=self.mt5_config['password'],
-                server=self.mt5_config['server'],
-                timeout=60000
-            )
-            
-            if not init_result:
-                error_code = mt5.last_error()
-                raise Exception(f"MT5 initialize failed. Error code: {error_code}")
-            
-            print("✅ MT5 initialized successfully")
+            # Koneksi process ini masih hidup ke akun yang sama: tidak perlu inisialisasi ulang
+            current = mt5.account_info() if mt5.terminal_info() else None
+            if current is not None and current.login == self.mt5_config['login']:
+                print("✅ MT5 sudah terhubung")
+            else:
+                if current is not None:
+                    # Terhubung ke akun lain (/login)
+                    print("Menutup koneksi MT5 yang ada...")
+                    mt5.shutdown()
+                
+                # Inisialisasi MT5
+                print("\nMencoba inisialisasi MT5...")
+                init_result = mt5.initialize(
+                    path=self.mt5_config['path'],
+                    login=self.mt5_config['login'],
+                    password=self.mt5_config['password'],
+                    server=self.mt5_config['server'],
+                    timeout=60000
+                )
+                
+                if not init_result:
+                    error_code = mt5.last_error()
+                    raise Exception(f"MT5 initialize failed. Error code: {error_code}")
+                
+                print("✅ MT5 initialized successfully")
+                
+                # Data bar lama bisa berasal dari akun/server lain
+                if hasattr(self, 'bar_cache'):
+                    self.bar_cache.clear()
             
             # Verifikasi login
             account_info = mt5.account_info()
@@ -1016,6 +1426,15 @@ Gunakan /login untuk mencoba lagi.
             print(f"❌ Error starting Telegram polling: {e}")
             return False
 
+    def format_lateness(self):
+        """
+        Ringkasan keterlambatan scheduler setelah bar close
+        """
+        summary = self.scheduler.lateness_summary()
+        if summary is None:
+            return "N/A"
+        return f"avg {summary['mean']:.2f}s, p95 {summary['p95']:.2f}s, max {summary['max']:.2f}s"
+
     def run_auto_trading(self):
         """
         Jalankan auto trading dengan pengecekan status yang lebih baik
@@ -1026,67 +1445,124 @@ Gunakan /login untuk mencoba lagi.
                 return
             
             print("\n=== AUTO TRADING STARTED ===")
-            self.bot_status.update({
-                'is_running': True,
-                'start_time': datetime.now(),
-                'total_signals': 0
-            })
+            # Setelah ini watcher tidak lagi memasang config sendiri (on_config_change)
+            with self.settings_lock:
+                self.bot_status.update({
+                    'is_running': True,
+                    'start_time': datetime.now(),
+                    'total_signals': 0
+                })
             
             self.send_telegram("🚀 Auto trading dimulai!")
             
+            all_timeframes = sorted({
+                tf for settings in self.analysis_settings.values() for tf in settings['timeframes']
+            })
+            keep_running = lambda: self.bot_status['is_running']
+            
+            # Pass pertama menganalisa semua timeframe
+            due_timeframes = None
+            
             while self.bot_status['is_running']:
                 try:
+                    # Pengaturan baru dari config.json dipasang di antara pass
+                    if self.apply_pending_settings():
+                        all_timeframes = sorted({
+                            tf for settings in self.analysis_settings.values() for tf in settings['timeframes']
+                        })
+                    
+                    # Data symbol & akun diambil ulang di setiap pass
+                    self.market.new_pass()
+                    pass_started = time.perf_counter_ns()
+                    if self.profile_request is not None:
+                        self.start_profile_pass()
+                    
                     # Cek koneksi MT5
-                    if not self.check_mt5_connection():
+                    with METRICS.timer('connection_check'):
+                        connected = self.check_mt5_connection()
+                    if not connected:
                         self.send_telegram("⚠️ MT5 connection lost! Mencoba reconnect...")
                         if not self.initialize_mt5():
+                            if self.profiler is not None:
+                                self.end_profile_pass()
                             time.sleep(60)
                             continue
                     
+                    # Deal baru sejak pass sebelumnya (P/L harian, statistik)
+                    with METRICS.timer('deal_poll'):
+                        self.deal_tracker.poll()
+                    
                     # Cek kondisi market
-                    market_ok, market_message = self.check_market_conditions()
+                    with METRICS.timer('market_check'):
+                        market_ok, market_message = self.check_market_conditions()
                     if not market_ok:
                         print(f"⚠️ {market_message}")
-                        time.sleep(300)  # tunggu 5 menit
+                        if self.profiler is not None:
+                            self.end_profile_pass()
+                        # Tunggu bar close berikutnya, lalu analisa ulang semua timeframe
+                        self.scheduler.wait(all_timeframes, keep_running)
+                        due_timeframes = None
                         continue
                     
-                    # Analisa setiap pair
+                    # Analisa setiap pair yang timeframe-nya baru close
                     for instrument_type, symbols in self.trading_pairs.items():
-                        for symbol in symbols:
-                            print(f"\nAnalyzing {symbol}...")
+                        timeframes = self.analysis_settings[instrument_type]['timeframes']
+                        if due_timeframes is not None and not set(due_timeframes) & set(timeframes):
+                            continue
+                        
+                        if len(symbols) >= self.performance_settings['batch_min_symbols']:
+                            print(f"\nAnalyzing {len(symbols)} {instrument_type} symbols (batch)...")
+                            signals = self.analyze_market_batch(symbols, due_timeframes)
+                        else:
+                            signals = []
+                            for symbol in symbols:
+                                print(f"\nAnalyzing {symbol}...")
+                                signal = self.analyze_market(symbol, due_timeframes)
+                                if signal:
+                                    signals.append(signal)
+                        
+                        for signal in signals:
+                            self.bot_status['total_signals'] += 1
+                            METRICS.inc('robot_signals_total', {'symbol': signal['symbol'], 'action': signal['action']})
+                            self.journal.record(
+                                'signal', signal['symbol'], side=signal['action'],
+                                comment=f"confidence={signal['confidence']:.2f} score={signal['total_score']}"
+                            )
                             
-                            signal = self.analyze_market(symbol)
-                            if signal:
-                                self.bot_status['total_signals'] += 1
-                                
-                                # Notifikasi sinyal
-                                signal_msg = f"""
+                            # Notifikasi sinyal
+                            signal_msg = f"""
 🎯 SINYAL TRADING
 
 Symbol: {signal['symbol']}
 Type: {instrument_type}
 Action: {signal['action']}
 Confidence: {signal['confidence']*100:.1f}%
-Trend: {signal['trend']}
-Momentum: {signal['momentum']}
-Volume: {signal['volume']}
-                                """
-                                self.send_telegram(signal_msg)
-                                
-                                # Eksekusi trade
-                                if self.execute_trade(signal):
-                                    self.send_telegram("✅ Order berhasil dieksekusi!")
-                                else:
-                                    self.send_telegram("❌ Order gagal dieksekusi!")
+Score: {signal['total_score']}
+                            """
+                            self.send_telegram(signal_msg)
                             
-                            # Jeda antar analisa
-                            time.sleep(2)
+                            # Eksekusi trade (multi-akun: dikerjakan worker setiap akun)
+                            if self.dispatcher is not None:
+                                self.dispatcher.signal(signal)
+                            elif self.execute_trade(signal):
+                                self.send_telegram("✅ Order berhasil dieksekusi!")
+                            else:
+                                self.send_telegram("❌ Order gagal dieksekusi!")
                     
                     # Monitor posisi terbuka
-                    self.monitor_positions()
+                    with METRICS.timer('monitor_positions'):
+                        if self.dispatcher is not None:
+                            self.dispatcher.end_pass()
+                        else:
+                            self.monitor_positions()
+                    
+                    METRICS.record('pass', time.perf_counter_ns() - pass_started)
+                    METRICS.inc('robot_passes_total')
+                    if self.profiler is not None:
+                        self.end_profile_pass()
                     
-                    print("\nWaiting for next analysis...")
-                    time.sleep(300)  # Analisa setiap 5 menit
+                    print("\nWaiting for next bar close...")
+                    due_timeframes = self.scheduler.wait(all_timeframes, keep_running)
                     
                     # Cek status setiap iterasi
                     if not self.bot_status['is_running']:
@@ -1097,9 +1573,14 @@ Volume: {signal['volume']}
                     error_msg = f"❌ Error dalam trading loop: {e}"
                     print(error_msg)
                     self.send_telegram(error_msg)
+                    if self.profiler is not None:
+                        self.end_profile_pass()
                     time.sleep(60)
             
             print("Trading loop ended")
+            if self.profiler is not None:
+                self.profiler.stop()
+            self.profiler = self.profile_request = None
             self.send_telegram("🛑 Auto trading telah dihentikan!")
             
         except Exception as e:
@@ -1108,103 +1589,215 @@ Volume: {signal['volume']}
             self.send_telegram(error_msg)
             self.bot_status['is_running'] = False
 
-    def analyze_market(self, symbol):
+    def request_profile(self, passes, chat_id):
         """
-        Analisa pasar dengan parameter yang disesuaikan per instrument
+        Minta profile untuk `passes` pass loop berikutnya, hasil dikirim ke chat_id
         """
+        if not self.bot_status['is_running']:
+            return "❌ Auto trading belum berjalan, gunakan /run dulu"
+        if self.profile_request is not None:
+            return f"⚠️ Profile masih berjalan ({self.profile_request['remaining']} pass tersisa)"
+        passes = max(1, min(passes, self.profile_settings['max_passes']))
+        self.profile_request = {'remaining': passes, 'passes': passes, 'chat_id': chat_id}
+        return f"🔬 Profile {passes} pass berikutnya dimulai..."
+
+    def start_profile_pass(self):
+        """
+        Dipanggil loop trading di awal pass selama ada profile request
+        """
+        if self.profiler is None:
+            self.profiler = SamplingProfiler(threading.get_ident(), self.profile_settings['interval']).start()
+        else:
+            self.profiler.resume()
+
+    def end_profile_pass(self):
+        """
+        Dipanggil di akhir pass: pause sampler, atau selesai dan kirim hasil jika pass sudah cukup
+        """
+        request = self.profile_request
+        request['remaining'] -= 1
+        if request['remaining'] > 0:
+            self.profiler.pause()
+            return
+        
+        profiler, self.profiler, self.profile_request = self.profiler, None, None
+        profiler.stop()
+        path = os.path.join(self.profile_settings['path'], f"loop_{datetime.now():%Y%m%d_%H%M%S}.folded")
         try:
-            # Tentukan tipe instrument
-            instrument_type = self.get_instrument_type(symbol)
-            if not instrument_type:
-                raise Exception(f"Unknown instrument type for {symbol}")
-            
-            settings = self.analysis_settings[instrument_type]
-            timeframes = settings['timeframes']
-            
-            signals = {tf: None for tf in timeframes}
-            total_score = 0
-            
-            for tf in timeframes:
-                rates = mt5.copy_rates_from_pos(symbol, tf, 0, 100)
-                if rates is None:
-                    continue
-                
-                df = pd.DataFrame(rates)
-                df['time'] = pd.to_datetime(df['time'], unit='s')
-                
-                # Hitung indikator
-                df['EMA20'] = df['close'].ewm(span=20).mean()
-                df['EMA50'] = df['close'].ewm(span=50).mean()
-                df['RSI'] = self.calculate_rsi(df['close'])
-                bb_upper, bb_middle, bb_lower = self.calculate_bollinger_bands(df['close'])
-                macd, signal = self.calculate_macd(df['close'])
+            profiler.write_collapsed(path)
+        except OSError as e:
+            print(f"❌ Error menyimpan profile: {e}")
+            path = None
+        report = f"🔬 PROFILE {request['passes']} PASS\n{profiler.report()}"
+        print(report)
+        # Kirim di thread lain supaya pass berikutnya tidak menunggu Telegram
+        threading.Thread(target=self.send_profile, args=(request['chat_id'], report, path), daemon=True).start()
+
+    def send_profile(self, chat_id, report, path):
+        """
+        Kirim ringkasan profile dan file collapsed stack ke Telegram
+        """
+        bot = self.notifications['telegram'].get('bot')
+        if bot is None or chat_id is None:
+            return
+        try:
+            bot.send_message(chat_id, report[:4096])
+            if path:
+                with open(path, 'rb') as f:
+                    bot.send_document(chat_id, f, caption="Collapsed stack (flamegraph.pl / speedscope)")
+        except Exception as e:
+            print(f"❌ Error mengirim profile: {e}")
+
+    def analyze_market(self, symbol, due_timeframes=None):
+        """
+        Analisa pasar dengan parameter yang disesuaikan per instrument.
+        Jika due_timeframes diisi, hanya timeframe tersebut yang dihitung ulang,
+        timeframe lain memakai skor dari bar close terakhirnya.
+        """
+        with self.settings_lock:
+            try:
+                # Tentukan tipe instrument
+                instrument_type = self.get_instrument_type(symbol)
+                if not instrument_type:
+                    raise Exception(f"Unknown instrument type for {symbol}")
+            
+                settings = self.analysis_settings[instrument_type]
+                timeframes = settings['timeframes']
+            
+                signals = {tf: None for tf in timeframes}
+                total_score = 0
+                params = indicator_params(settings)
+            
+                stale = [
+                    tf for tf in timeframes
+                    if self.timeframe_scores.get((symbol, tf)) is None or due_timeframes is None or tf in due_timeframes
+                ]
+                base_tf = min(timeframes, key=timeframe_seconds)
+                with METRICS.timer('bar_fetch'):
+                    fresh_rates = self.get_analysis_rates(symbol, stale, 100, base_tf) if stale else {}
+            
+                indicators_started = time.perf_counter_ns()
+                for tf in timeframes:
+                    momentum_score = self.timeframe_scores.get((symbol, tf))
                 
-                # Analisa momentum
-                momentum_score = 0
+                    if tf in fresh_rates:
+                        rates = fresh_rates[tf]
+                        if rates is None or len(rates) < 3:
+                            continue
+                    
+                        # Update indikator secara inkremental, yang dinilai bar close terakhir
+                        current, previous = self.indicator_engine.update(symbol, tf, rates, params)
+                    
+                        # Analisa momentum (EMA, RSI, Bollinger Bands, MACD, Volume)
+                        momentum_score = int(strategy.momentum_score(current, previous))
+                        self.timeframe_scores[(symbol, tf)] = momentum_score
                 
-                # 1. Trend Direction (EMA)
-                if df['EMA20'].iloc[-1] > df['EMA50'].iloc[-1]:
-                    momentum_score += 1
-                elif df['EMA20'].iloc[-1] < df['EMA50'].iloc[-1]:
-                    momentum_score -= 1
+                    total_score += momentum_score
                 
-                # 2. RSI
-                rsi = df['RSI'].iloc[-1]
-                if 30 <= rsi <= 70:  # Range normal
-                    if rsi > 50:
-                        momentum_score += 1
-                    else:
-                        momentum_score -= 1
+                    # Determine signal for this timeframe
+                    signals[tf] = strategy.LABELS.get(int(strategy.signal_direction(momentum_score)))
+                METRICS.record('indicators', time.perf_counter_ns() - indicators_started)
+            
+                # Final decision based on all timeframes
+                with METRICS.timer('decision'):
+                    buy_signals = sum(1 for s in signals.values() if s == 'BUY')
+                    sell_signals = sum(1 for s in signals.values() if s == 'SELL')
                 
-                # 3. Bollinger Bands
-                current_price = df['close'].iloc[-1]
-                if current_price > bb_upper[-1]:
-                    momentum_score -= 1
-                elif current_price < bb_lower[-1]:
-                    momentum_score += 1
+                    # Calculate confidence level
+                    confidence = max(buy_signals, sell_signals) / len(timeframes)
+            
+                if confidence >= strategy.MIN_CONFIDENCE:  # Minimal 50% timeframes setuju
+                    action = 'BUY' if buy_signals > sell_signals else 'SELL'
                 
-                # 4. MACD
-                if macd[-1] > signal[-1] and macd[-2] <= signal[-2]:
-                    momentum_score += 2
-                elif macd[-1] < signal[-1] and macd[-2] >= signal[-2]:
-                    momentum_score -= 2
+                    return {
+                        'symbol': symbol,
+                        'action': action,
+                        'confidence': confidence,
+                        'total_score': total_score,
+                        'type': instrument_type,
+                        'signals': signals
+                    }
+            
+                return None
+            
+            except Exception as e:
+                print(f"❌ Error analyzing {symbol}: {e}")
+                return None
+
+    def analyze_market_batch(self, symbols, due_timeframes=None):
+        """
+        Analisa banyak symbol sekaligus. Rates semua (symbol, timeframe) dengan
+        setting yang sama ditumpuk jadi matrix 2-D, lalu indikator dan skor
+        momentum dihitung dalam satu pass vectorized.
+        """
+        with self.settings_lock:
+            results = []
+            try:
+                groups = {}
+                for symbol in symbols:
+                    instrument_type = self.get_instrument_type(symbol)
+                    if instrument_type:
+                        groups.setdefault(instrument_type, []).append(symbol)
+            
+                for instrument_type, group in groups.items():
+                    settings = self.analysis_settings[instrument_type]
+                    timeframes = settings['timeframes']
+                    params = indicator_params(settings)
                 
-                # 5. Volume Analysis
-                if df['tick_volume'].iloc[-1] > df['tick_volume'].iloc[-2]:
-                    momentum_score += 1
+                    # Skor per (symbol, timeframe); timeframe tanpa data tetap 0 (NEUTRAL)
+                    scores = np.zeros((len(group), len(timeframes)), dtype=int)
+                    rows = []
+                    rates_list = []
+                    base_tf = min(timeframes, key=timeframe_seconds)
+                    for i, symbol in enumerate(group):
+                        stale = []
+                        for j, tf in enumerate(timeframes):
+                            cached = self.timeframe_scores.get((symbol, tf))
+                            if cached is not None and due_timeframes is not None and tf not in due_timeframes:
+                                scores[i, j] = cached
+                            else:
+                                stale.append(tf)
+                    
+                        with METRICS.timer('bar_fetch'):
+                            fresh_rates = self.get_analysis_rates(symbol, stale, 100, base_tf) if stale else {}
+                        for j, tf in enumerate(timeframes):
+                            if tf not in fresh_rates:
+                                continue
+                            rates = fresh_rates[tf]
+                            if rates is None or len(rates) < 3:
+                                continue
+                            rows.append((i, j))
+                            rates_list.append(rates)
                 
-                total_score += momentum_score
+                    if rates_list:
+                        with METRICS.timer('indicators'):
+                            fresh = strategy.batch_scores(rates_list, params)
+                        scores[tuple(np.array(rows).T)] = fresh
+                        for (i, j), score in zip(rows, fresh):
+                            self.timeframe_scores[(group[i], timeframes[j])] = int(score)
                 
-                # Determine signal for this timeframe
-                if momentum_score >= 2:
-                    signals[tf] = 'BUY'
-                elif momentum_score <= -2:
-                    signals[tf] = 'SELL'
-            
-            # Final decision based on all timeframes
-            buy_signals = sum(1 for s in signals.values() if s == 'BUY')
-            sell_signals = sum(1 for s in signals.values() if s == 'SELL')
-            
-            # Calculate confidence level
-            confidence = max(buy_signals, sell_signals) / len(timeframes)
-            
-            if confidence >= 0.5:  # Minimal 50% timeframes setuju
-                action = 'BUY' if buy_signals > sell_signals else 'SELL'
+                    with METRICS.timer('decision'):
+                        directions = strategy.signal_direction(scores)
+                        actions, confidence = strategy.combine_directions(directions)
+                        total_scores = scores.sum(axis=1)
                 
-                return {
-                    'symbol': symbol,
-                    'action': action,
-                    'confidence': confidence,
-                    'total_score': total_score,
-                    'type': instrument_type,
-                    'signals': signals
-                }
-            
-            return None
-            
-        except Exception as e:
-            print(f"❌ Error analyzing {symbol}: {e}")
-            return None
+                    for i in np.flatnonzero(actions != strategy.NEUTRAL):
+                        results.append({
+                            'symbol': group[i],
+                            'action': strategy.LABELS[int(actions[i])],
+                            'confidence': float(confidence[i]),
+                            'total_score': int(total_scores[i]),
+                            'type': instrument_type,
+                            'signals': {
+                                tf: strategy.LABELS.get(int(direction))
+                                for tf, direction in zip(timeframes, directions[i])
+                            }
+                        })
+            
+            except Exception as e:
+                print(f"❌ Error batch analysis: {e}")
+        
+            return results
 
     def get_instrument_type(self, symbol):
         """
@@ -1224,14 +1817,29 @@ Volume: {signal['volume']}
             action = signal['action']
             instrument_type = signal['type']
             
+            # Batas rugi harian dari P/L realized hari ini (hari server broker)
+            account = self.market.account_info()
+            if account is not None and self.deal_tracker.daily_loss_breached(
+                    account.balance, self.risk_params['max_daily_loss']):
+                if self.daily_loss_notified != self.deal_tracker.today():
+                    self.daily_loss_notified = self.deal_tracker.today()
+                    self.send_telegram(f"""
+⛔ BATAS RUGI HARIAN TERCAPAI
+P/L hari ini: ${self.deal_tracker.daily_pnl():.2f}
+Max Daily Loss: {self.risk_params['max_daily_loss']}%
+Order baru ditahan sampai hari berikutnya
+                    """)
+                METRICS.inc('robot_order_rejects_total', {'reason': 'daily_loss'})
+                return False
+            
             # Get symbol info
-            symbol_info = mt5.symbol_info(symbol)
+            symbol_info = self.market.symbol_info(symbol)
             if symbol_info is None:
                 raise Exception(f"Failed to get symbol info for {symbol}")
             
             # Cek spread
             current_spread = (symbol_info.ask - symbol_info.bid) / symbol_info.point
-            max_allowed_spread = self.trading_pairs[instrument_type][symbol]['max_spread']
+            max_allowed_spread = self.max_spreads[instrument_type][symbol]['max_spread']
             
             if current_spread > max_allowed_spread:
                 self.send_telegram(f"""
@@ -1239,22 +1847,20 @@ Volume: {signal['volume']}
 Current: {current_spread:.1f} pips
 Max allowed: {max_allowed_spread} pips
                 """)
+                METRICS.inc('robot_order_rejects_total', {'reason': 'spread'})
                 return False
             
             # Setup order parameters
-            volume = self.calculate_position_size(symbol, instrument_type)
+            risk = self.risk_settings[instrument_type]
             price = symbol_info.ask if action == 'BUY' else symbol_info.bid
             
             # Calculate SL/TP
-            if instrument_type == 'crypto':
-                sl_distance = price * (self.risk_settings[instrument_type]['sl_percent'] / 100)
-                tp_distance = price * (self.risk_settings[instrument_type]['tp_percent'] / 100)
-            else:
-                sl_distance = self.risk_settings[instrument_type]['sl_pips'] * symbol_info.point
-                tp_distance = self.risk_settings[instrument_type]['tp_pips'] * symbol_info.point
-            
-            sl = price - sl_distance if action == 'BUY' else price + sl_distance
-            tp = price + tp_distance if action == 'BUY' else price - tp_distance
+            sl, tp, sl_distance = strategy.order_levels(
+                action, price, symbol_info.point, instrument_type, risk
+            )
+            volume = self.calculate_position_size(
+                symbol, sl_distance / symbol_info.point, risk['risk_percent']
+            )
             
             # Prepare order request
             request = {
@@ -1265,17 +1871,31 @@ Max allowed: {max_allowed_spread} pips
                 "price": price,
                 "sl": sl,
                 "tp": tp,
-                "deviation": 20,
+                "deviation": self.order_deviation(symbol),
                 "magic": 234000,
                 "comment": f"signal_{signal['confidence']:.2f}",
                 "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
             }
             
-            # Execute order
-            result = mt5.order_send(request)
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                raise Exception(f"Order failed: {result.comment}")
+            # Execute order (tick segar, filling mode symbol, retry requote)
+            result = self.executor.send(request)
+            self.market.invalidate(symbol)
+            self.count_order(symbol, 'open', result)
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                self.journal.record(
+                    'order', symbol, side=action, volume=volume, price=price, sl=sl, tp=tp,
+                    retcode=result.retcode if result else None, comment=result.comment if result else str(mt5.last_error())
+                )
+                raise Exception(f"Order failed: {result.comment if result else mt5.last_error()}")
+            
+            # Harga & SL/TP yang benar-benar dikirim (executor mengisi ulang dari tick terbaru)
+            price, sl, tp = request['price'], request['sl'], request['tp']
+            
+            # Tiket posisi = tiket order yang membukanya
+            self.journal.record(
+                'fill', symbol, ticket=result.order, side=action, volume=result.volume or volume,
+                price=result.price or price, sl=sl, tp=tp, retcode=result.retcode, comment=request['comment']
+            )
             
             # Send notification
             self.send_telegram(f"""
@@ -1283,7 +1903,7 @@ Max allowed: {max_allowed_spread} pips
 
 Symbol: {symbol}
 Type: {action}
-Price: {price:.5f}
+Price: {result.price or price:.5f}
 Volume: {volume:.2f}
 SL: {sl:.5f}
 TP: {tp:.5f}
@@ -1303,79 +1923,31 @@ Confidence: {signal['confidence']*100:.1f}%
         """
         Menghitung Moving Average
         """
-        import numpy as np
-        return np.convolve(close, np.ones(period), 'valid') / period
+        return indicators.sma(close, period)
 
     def calculate_rsi(self, close, period=14):
         """
         Menghitung RSI (Relative Strength Index)
         """
-        import numpy as np
-        
-        # Hitung perubahan harga
-        delta = np.diff(close)
-        
-        # Pisahkan gain dan loss
-        gain = np.where(delta > 0, delta, 0)
-        loss = np.where(delta < 0, -delta, 0)
-        
-        # Hitung average gain dan loss
-        avg_gain = np.convolve(gain, np.ones(period), 'valid') / period
-        avg_loss = np.convolve(loss, np.ones(period), 'valid') / period
-        
-        # Hitung RS dan RSI
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        return indicators.rsi(close, period)
 
     def calculate_bollinger_bands(self, close, period=20, std_dev=2):
         """
         Menghitung Bollinger Bands
         """
-        import numpy as np
-        
-        # Hitung MA dan Standard Deviation
-        ma = self.calculate_ma(close, period)
-        std = np.std(close[-period:])
-        
-        # Hitung bands
-        upper_band = ma + (std_dev * std)
-        lower_band = ma - (std_dev * std)
-        
-        return upper_band, ma, lower_band
+        return indicators.bollinger_bands(close, period, std_dev)
 
     def calculate_macd(self, close, fast=12, slow=26, signal=9):
         """
         Menghitung MACD (Moving Average Convergence Divergence)
         """
-        import numpy as np
-        
-        # Hitung EMA
-        ema_fast = self.calculate_ema(close, fast)
-        ema_slow = self.calculate_ema(close, slow)
-        
-        # Hitung MACD line
-        macd_line = ema_fast - ema_slow
-        
-        # Hitung signal line
-        signal_line = self.calculate_ema(macd_line, signal)
-        
-        return macd_line, signal_line
+        return indicators.macd(close, fast, slow, signal)
 
     def calculate_ema(self, data, period):
         """
         Menghitung Exponential Moving Average
         """
-        import numpy as np
-        
-        multiplier = 2 / (period + 1)
-        ema = [data[0]]
-        
-        for price in data[1:]:
-            ema.append((price * multiplier) + (ema[-1] * (1 - multiplier)))
-            
-        return np.array(ema)
+        return indicators.ema(data, period)
 
     def check_market_conditions(self):
         """
@@ -1396,7 +1968,7 @@ Confidence: {signal['confidence']*100:.1f}%
             
             # Cek spread
             for symbol in self.forex_pairs:
-                tick = mt5.symbol_info_tick(symbol)
+                tick = self.market.symbol_info_tick(symbol)
                 spread = (tick.ask - tick.bid) / tick.bid * 10000
                 
                 if spread > self.market_filters['max_spread']:
@@ -1423,72 +1995,156 @@ Confidence: {signal['confidence']*100:.1f}%
             if not self.trailing_params['enabled']:
                 return
             
-            symbol_info = mt5.symbol_info(position.symbol)
+            symbol_info = self.market.symbol_info(position.symbol)
             point = symbol_info.point
             
             # Hitung profit dalam pips
             profit_pips = position.profit / (symbol_info.trade_tick_value * position.volume)
             
-            if profit_pips >= self.trailing_params['start_pips']:
-                new_sl = None
-                
-                if position.type == mt5.ORDER_TYPE_BUY:
-                    potential_sl = position.price_current - (self.trailing_params['step_pips'] * point)
-                    if potential_sl > position.sl + (self.trailing_params['min_step'] * point):
-                        new_sl = potential_sl
-                else:
-                    potential_sl = position.price_current + (self.trailing_params['step_pips'] * point)
-                    if potential_sl < position.sl - (self.trailing_params['min_step'] * point):
-                        new_sl = potential_sl
-                
-                if new_sl:
-                    request = {
-                        "action": mt5.TRADE_ACTION_SLTP,
-                        "symbol": position.symbol,
-                        "position": position.ticket,
-                        "sl": new_sl,
-                        "tp": position.tp
-                    }
+            new_sl = float(strategy.trailing_stop_levels(
+                position.type == mt5.ORDER_TYPE_BUY,
+                position.price_current,
+                position.sl,
+                profit_pips,
+                point,
+                self.trailing_params
+            ))
+            
+            if not np.isnan(new_sl):
+                self.update_stop_loss(position, new_sl)
                     
-                    result = mt5.order_send(request)
-                    if result.retcode == mt5.TRADE_RETCODE_DONE:
-                        self.send_telegram(f"""
+        except Exception as e:
+            print(f"❌ Error updating trailing stop: {e}")
+
+    def count_order(self, symbol, kind, result):
+        """
+        Counter hasil akhir order per symbol/jenis order (retcode per percobaan dicatat record_execution)
+        """
+        status = 'done' if result is not None and result.retcode == mt5.TRADE_RETCODE_DONE else 'failed'
+        METRICS.inc('robot_orders_total', {'symbol': symbol, 'kind': kind, 'result': status})
+
+    def order_deviation(self, symbol):
+        """
+        Deviation harga maksimal (points) untuk order market symbol
+        """
+        deviations = self.execution_settings['deviation']
+        return deviations.get(self.get_instrument_type(symbol), deviations['forex'])
+
+    def record_execution(self, attempt):
+        """
+        Catat satu percobaan order_send dari executor ke jurnal & metrics
+        """
+        side = None
+        if attempt['type'] is not None:
+            side = 'BUY' if attempt['type'] == mt5.ORDER_TYPE_BUY else 'SELL'
+        self.journal.record_execution(
+            attempt['symbol'], ticket=attempt['position'] or None, side=side, attempt=attempt['attempt'],
+            requested=attempt['requested'], filled=attempt['filled'], slippage=attempt['slippage'],
+            rtt_ms=attempt['rtt_ms'], retcode=attempt['retcode'], filling=attempt['filling'], time_=attempt['time']
+        )
+        METRICS.inc('robot_order_retcodes_total', {'retcode': attempt['retcode'] or 'none'})
+
+    def update_stop_loss(self, position, new_sl):
+        """
+        Geser SL posisi (TP tetap) dan kirim notifikasi trailing stop
+        """
+        request = {
+            "action": mt5.TRADE_ACTION_SLTP,
+            "symbol": position.symbol,
+            "position": position.ticket,
+            "sl": new_sl,
+            "tp": position.tp
+        }
+        
+        result = self.executor.send(request)
+        self.count_order(position.symbol, 'modify', result)
+        if result is not None and result.retcode == mt5.TRADE_RETCODE_DONE:
+            self.journal.record('modify', position.symbol, ticket=position.ticket, sl=new_sl, tp=position.tp,
+                                retcode=result.retcode, comment='trailing_stop')
+            self.send_telegram(f"""
 🔄 TRAILING STOP UPDATE
 Ticket: {position.ticket}
 Symbol: {position.symbol}
 New SL: {new_sl:.5f}
-                        """)
-                        
-        except Exception as e:
-            print(f"❌ Error updating trailing stop: {e}")
+            """)
+            return True
+        return False
 
     def monitor_positions(self):
         """
-        Monitor posisi terbuka dan update trailing stop
+        Monitor posisi terbuka: trailing stop dan close saat max drawdown.
+        Semua posisi dievaluasi sekaligus (vectorized), hanya aksinya yang dikirim ke terminal.
         """
         try:
             positions = mt5.positions_get()
-            if positions:
-                for position in positions:
-                    # Update trailing stop
-                    self.trailing_stop(position)
-                    
-                    # Cek drawdown
-                    if position.profit < 0:
-                        drawdown = abs(position.profit) / mt5.account_info().balance * 100
-                        if drawdown >= self.risk_params['max_drawdown']:
-                            self.close_position(position)
-                            self.send_telegram(f"""
+            if positions is None:
+                return
+            self.reconcile_journal(positions)
+            if not positions:
+                return
+            
+            columns, symbols = position_monitor.load_positions(positions)
+            symbol_infos = [self.market.symbol_info(symbol) for symbol in symbols]
+            point = [info.point if info else np.nan for info in symbol_infos]
+            tick_value = [info.trade_tick_value if info else np.nan for info in symbol_infos]
+            
+            plan = position_monitor.plan_actions(
+                columns,
+                point,
+                tick_value,
+                self.market.account_info().balance,
+                self.trailing_params,
+                self.risk_params['max_drawdown']
+            )
+            
+            # Update trailing stop
+            for i in np.flatnonzero(~np.isnan(plan['new_sl'])):
+                self.update_stop_loss(positions[i], float(plan['new_sl'][i]))
+            
+            # Tutup posisi yang melewati max drawdown
+            for i in np.flatnonzero(plan['close']):
+                position = positions[i]
+                if self.close_position(position):
+                    self.send_telegram(f"""
 ⚠️ POSISI DITUTUP - MAX DRAWDOWN
 Ticket: {position.ticket}
 Symbol: {position.symbol}
 Loss: ${position.profit:.2f}
-Drawdown: {drawdown:.2f}%
-                            """)
+Drawdown: {plan['drawdown'][i]:.2f}%
+                    """)
                             
         except Exception as e:
             print(f"❌ Error monitoring positions: {e}")
 
+    def reconcile_journal(self, positions):
+        """
+        Catat close posisi yang ditutup broker (SL/TP, stop out, manual) dari exit deal
+        yang sudah diambil deal tracker
+        """
+        open_tickets = {position.ticket for position in positions}
+        for trade in self.journal.open_trades():
+            if trade['ticket'] in open_tickets:
+                continue
+            closed = self.deal_tracker.pop_closed(trade['ticket'])
+            if closed is None:
+                continue
+            self.journal.record(
+                'close', trade['symbol'], ticket=trade['ticket'], side=trade['side'], volume=trade['volume'],
+                price=closed['price'], profit=closed['profit'], comment=closed['comment'] or 'broker',
+                time_=closed['time'] - self.scheduler.clock.offset
+            )
+
+    def closing_deal_profit(self, result):
+        """
+        P/L bersih deal hasil order_send (profit + komisi + swap), None jika belum ada di history
+        """
+        if not getattr(result, 'deal', 0):
+            return None
+        deals = mt5.history_deals_get(ticket=result.deal)
+        if not deals:
+            return None
+        return net_profit(deals[0])
+
     def close_position(self, position):
         """
         Tutup posisi trading spesifik
@@ -1496,6 +2152,7 @@ Drawdown: {drawdown:.2f}%
         try:
             # Tentukan tipe order (kebalikan dari posisi)
             close_type = mt5.ORDER_TYPE_SELL if position.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY
+            tick = self.market.symbol_info_tick(position.symbol)
             
             # Siapkan request
             request = {
@@ -1504,20 +2161,31 @@ Drawdown: {drawdown:.2f}%
                 "volume": position.volume,
                 "type": close_type,
                 "position": position.ticket,
-                "price": mt5.symbol_info_tick(position.symbol).bid if position.type == mt5.ORDER_TYPE_BUY else mt5.symbol_info_tick(position.symbol).ask,
-                "deviation": 20,
+                "price": tick.bid if position.type == mt5.ORDER_TYPE_BUY else tick.ask,
+                "deviation": self.order_deviation(position.symbol),
                 "magic": 234000,
                 "comment": "close_by_bot",
                 "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
             }
             
             # Kirim request
-            result = mt5.order_send(request)
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                print(f"❌ Error closing position {position.ticket}: {result.comment}")
+            result = self.executor.send(request)
+            self.market.invalidate(position.symbol)
+            self.count_order(position.symbol, 'close', result)
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                print(f"❌ Error closing position {position.ticket}: {result.comment if result else mt5.last_error()}")
                 return False
             
+            # P/L realized dari deal penutup, bukan profit floating sebelum close
+            profit = self.closing_deal_profit(result)
+            if profit is not None:
+                self.journal.record(
+                    'close', position.symbol, ticket=position.ticket, side='BUY' if position.type == mt5.ORDER_TYPE_BUY else 'SELL',
+                    volume=position.volume, price=result.price or request['price'], profit=profit,
+                    retcode=result.retcode, comment='close_by_bot'
+                )
+            # Jika deal belum ada di history, close dicatat reconcile_journal dari deal tracker
+            
             # Kirim notifikasi
             close_msg = f"""
 📤 POSISI DITUTUP
@@ -1525,7 +2193,7 @@ Drawdown: {drawdown:.2f}%
 Ticket: {position.ticket}
 Symbol: {position.symbol}
 Volume: {position.volume}
-Profit: ${position.profit:.2f}
+Profit: ${position.profit if profit is None else profit:.2f}
             """
             self.send_telegram(close_msg)
             
@@ -1546,7 +2214,7 @@ Profit: ${position.profit:.2f}
                 return False
                 
             # Cek apakah sudah login
-            account_info = mt5.account_info()
+            account_info = self.market.account_info()
             if account_info is None:
                 print("❌ Belum login ke MT5")
                 return False
@@ -1604,31 +2272,43 @@ def main():
         print("❌ Telegram connection failed!")
 
 if __name__ == "__main__":
+    analyzer = None
     try:
-        # Initialize analyzer
-        analyzer = ForexGoldAnalyzer()
+        if '--headless' in sys.argv:
+            # Loop trading tanpa Telegram, contoh: ROBOT_FAKE_MT5=1 python app.py --headless
+            analyzer = ForexGoldAnalyzer(headless=True)
+            analyzer.run_auto_trading()
+        else:
+            # Initialize analyzer
+            analyzer = ForexGoldAnalyzer()
         
-        # Test Telegram connection only
-        if analyzer.test_telegram_connection():
-            print("✅ Telegram connection successful!")
-            
-            # Start Telegram polling
-            if analyzer.start_telegram_polling():
-                print("\n🤖 Bot siap menerima perintah!")
-                print("Kirim /start atau /help untuk melihat menu")
-                print("Gunakan /login untuk login ke MT5")
+            # Test Telegram connection only
+            if analyzer.test_telegram_connection():
+                print("✅ Telegram connection successful!")
+            
+                # Start Telegram polling
+                if analyzer.start_telegram_polling():
+                    print("\n🤖 Bot siap menerima perintah!")
+                    print("Kirim /start atau /help untuk melihat menu")
+                    print("Gunakan /login untuk login ke MT5")
                 
-                # Keep main thread running
-                while True:
-                    time.sleep(1)
+                    # Keep main thread running
+                    while True:
+                        time.sleep(1)
                     
-        else:
-            print("❌ Telegram connection failed!")
+            else:
+                print("❌ Telegram connection failed!")
 
     except KeyboardInterrupt:
         print("\n⚠️ Program dihentikan oleh user")
     except Exception as e:
         print(f"\n❌ Fatal error: {e}")
     finally:
+        if analyzer is not None:
+            # Kirim sisa notifikasi & tulis sisa jurnal sebelum keluar
+            analyzer.notifier.stop()
+            analyzer.journal.close()
+            if analyzer.shared_bars is not None:
+                analyzer.shared_bars.close()
         if mt5.initialize():
             mt5.shutdown()
\ No newline at end of file
@@ -0,0 +1,625 @@
+"""
+Backtest event-driven dengan broker simulasi.
+
+Bar history per (symbol, timeframe) di-replay melalui aturan yang sama dengan
+bot live (strategy.py): skor momentum & voting multi-timeframe, SL/TP dan
+ukuran posisi per instrument, trailing stop, dan close saat max drawdown.
+
+Sinyal dihitung vectorized untuk seluruh history (indikator bersifat kausal),
+lalu event loop hanya mengurus order, SL/TP, trailing dan equity.
+
+Data dibaca dari <data_dir>/<SYMBOL>_<TIMEFRAME>.npy atau .csv, contoh
+EURUSD_M5.csv. CSV boleh hasil export MT5 (<DATE> <TIME> <OPEN> ...) atau
+berkolom time,open,high,low,close,tick_volume,spread.
+
+Jalankan dengan:
+    python backtest.py --data data/ --balance 10000 --slippage 2
+"""
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+import settings
+import strategy
+from bar_cache import RATES_DTYPE
+from indicator_engine import indicator_params
+from scheduler import timeframe_from_name, timeframe_name, timeframe_seconds
+
+MAGIC = 234000
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+
+# Spesifikasi kontrak default per instrument (bisa ditimpa lewat specs.json)
+DEFAULT_SPECS = {
+    'forex': {'point': 0.00001, 'digits': 5, 'trade_tick_value': 1.0, 'volume_max': 100.0},
+    'metals': {'point': 0.01, 'digits': 2, 'trade_tick_value': 1.0, 'volume_max': 100.0},
+    'crypto': {'point': 0.01, 'digits': 2, 'trade_tick_value': 0.01, 'volume_max': 100.0}
+}
+JPY_SPEC = {'point': 0.001, 'digits': 3, 'trade_tick_value': 0.67, 'volume_max': 100.0}
+
+
+def symbol_spec(symbol, instrument_type, overrides=None):
+    """
+    Spesifikasi kontrak symbol (point, digits, tick value, volume max)
+    """
+    if instrument_type == 'forex' and 'JPY' in symbol:
+        spec = dict(JPY_SPEC)
+    else:
+        spec = dict(DEFAULT_SPECS[instrument_type])
+    if overrides and symbol in overrides:
+        spec.update(overrides[symbol])
+    return spec
+
+
+def load_bars(path):
+    """
+    Baca bar dari file .npy (structured array MT5) atau .csv
+    """
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+
+    import pandas as pd
+
+    with open(path) as f:
+        header = f.readline()
+    df = pd.read_csv(path, sep='\t' if '\t' in header else ',')
+    df.columns = [c.strip().strip('<>').lower() for c in df.columns]
+    df = df.rename(columns={'tickvol': 'tick_volume', 'vol': 'real_volume', 'volume': 'tick_volume'})
+
+    if 'date' in df.columns:
+        # Format export MT5: tanggal 2024.01.02 dan jam terpisah
+        text = df['date'].astype(str).str.replace('.', '-', regex=False)
+        if 'time' in df.columns:
+            text = text + ' ' + df['time'].astype(str)
+        times = pd.to_datetime(text).values.astype('datetime64[s]').astype(np.int64)
+    elif np.issubdtype(df['time'].dtype, np.number):
+        times = df['time'].to_numpy(dtype=np.int64)
+    else:
+        times = pd.to_datetime(df['time']).values.astype('datetime64[s]').astype(np.int64)
+
+    bars = np.zeros(len(df), dtype=RATES_DTYPE)
+    bars['time'] = times
+    for field in ('open', 'high', 'low', 'close', 'tick_volume', 'spread', 'real_volume'):
+        if field in df.columns:
+            bars[field] = df[field].to_numpy()
+    return bars
+
+
+def find_bars(data_dir, symbol, timeframe):
+    """
+    Path file bar untuk (symbol, timeframe), .npy didahulukan. None jika tidak ada.
+    """
+    for ext in ('.npy', '.csv'):
+        path = os.path.join(data_dir, f"{symbol}_{timeframe_name(timeframe)}{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def scan_bars(data_dir):
+    """
+    Semua file bar di data_dir: {(symbol, timeframe): path}, .npy didahulukan
+    """
+    found = {}
+    for name in sorted(os.listdir(data_dir)):
+        stem, ext = os.path.splitext(name)
+        if ext not in ('.npy', '.csv') or '_' not in stem:
+            continue
+        symbol, tf_name = stem.rsplit('_', 1)
+        try:
+            timeframe = timeframe_from_name(tf_name)
+        except (ValueError, IndexError):
+            continue
+        if ext == '.npy' or (symbol, timeframe) not in found:
+            found[(symbol, timeframe)] = os.path.join(data_dir, name)
+    return found
+
+
+class Position:
+    """
+    Posisi simulasi dengan atribut yang sama seperti TradePosition MT5
+    """
+    __slots__ = ('ticket', 'symbol', 'type', 'volume', 'price_open', 'sl', 'tp',
+                 'price_current', 'profit', 'magic', 'time', 'comment', 'spec', 'margin')
+
+    def __init__(self, ticket, symbol, type_, volume, price_open, sl, tp, magic, time_, comment, spec,
+                 margin=0.0):
+        self.ticket = ticket
+        self.symbol = symbol
+        self.type = type_
+        self.volume = volume
+        self.price_open = price_open
+        self.sl = sl
+        self.tp = tp
+        self.price_current = price_open
+        self.profit = 0.0
+        self.magic = magic
+        self.time = time_
+        self.comment = comment
+        self.spec = spec
+        self.margin = margin
+
+
+class SimulatedBroker:
+    """
+    Broker simulasi: spread, slippage, SL/TP intrabar dan posisi per magic number.
+    Harga bar dianggap harga bid, ask = bid + spread. Margin posisi = nilai
+    kontrak dalam mata uang akun / leverage; stop out jika margin level
+    (equity / margin) turun ke stop_out_level persen.
+    """
+
+    def __init__(self, balance=10000.0, slippage_points=0, leverage=100, stop_out_level=50.0):
+        self.balance = balance
+        self.slippage_points = slippage_points
+        self.leverage = leverage
+        self.stop_out_level = stop_out_level
+        self.margin = 0.0
+        self.positions = {}
+        self.by_symbol = {}
+        self.deals = []
+        self.floating = 0.0
+        self.next_ticket = 1
+
+    @property
+    def equity(self):
+        return self.balance + self.floating
+
+    @property
+    def margin_free(self):
+        return self.equity - self.margin
+
+    @property
+    def margin_level(self):
+        """
+        Equity / margin dalam persen, None jika tidak ada posisi terbuka
+        """
+        return self.equity / self.margin * 100 if self.positions and self.margin > 0 else None
+
+    def stopped_out(self):
+        """
+        True jika akun habis: equity <= 0 atau margin level di bawah batas stop out
+        """
+        level = self.margin_level
+        return self.equity <= 0 or (level is not None and level <= self.stop_out_level)
+
+    def required_margin(self, spec, volume, price):
+        """
+        Margin untuk membuka `volume` lot di `price` (tick value per point = nilai kontrak / harga)
+        """
+        return volume * price * spec['trade_tick_value'] / spec['point'] / self.leverage
+
+    def positions_get(self, symbol=None, magic=None):
+        positions = self.by_symbol.get(symbol, []) if symbol else list(self.positions.values())
+        if magic is not None:
+            positions = [p for p in positions if p.magic == magic]
+        return tuple(positions)
+
+    def open_position(self, symbol, spec, order_type, volume, bid, ask, sl, tp, time_,
+                      magic=MAGIC, comment=''):
+        """
+        Buka posisi market, harga fill kena slippage yang merugikan
+        """
+        slippage = self.slippage_points * spec['point']
+        price = ask + slippage if order_type == ORDER_TYPE_BUY else bid - slippage
+        margin = self.required_margin(spec, volume, price)
+        position = Position(self.next_ticket, symbol, order_type, volume, price, sl, tp,
+                            magic, time_, comment, spec, margin)
+        self.margin += margin
+        self.next_ticket += 1
+        self.positions[position.ticket] = position
+        self.by_symbol.setdefault(symbol, []).append(position)
+        return position
+
+    def modify_position(self, ticket, sl, tp=None):
+        position = self.positions[ticket]
+        position.sl = sl
+        if tp is not None:
+            position.tp = tp
+
+    def close_position(self, position, price, time_, reason):
+        """
+        Tutup posisi di harga tertentu dan catat deal-nya
+        """
+        profit = self._profit(position, price)
+        self.floating -= position.profit
+        self.balance += profit
+        self.margin -= position.margin
+        del self.positions[position.ticket]
+        self.by_symbol[position.symbol].remove(position)
+        self.deals.append({
+            'ticket': position.ticket,
+            'symbol': position.symbol,
+            'type': position.type,
+            'volume': position.volume,
+            'price_open': position.price_open,
+            'price_close': price,
+            'time_open': position.time,
+            'time_close': time_,
+            'profit': profit,
+            'magic': position.magic,
+            'reason': reason
+        })
+        return profit
+
+    def process_bar(self, symbol, time_, open_, high, low, close, spread):
+        """
+        Cek SL/TP intrabar lalu mark-to-market di harga close.
+        Jika SL dan TP tersentuh di bar yang sama, SL dianggap kena duluan.
+        """
+        for position in list(self.by_symbol.get(symbol, ())):
+            spread_price = spread * position.spec['point']
+            exit_price = None
+            reason = None
+            sl, tp = position.sl, position.tp
+
+            if position.type == ORDER_TYPE_BUY:
+                if sl and low <= sl:
+                    exit_price, reason = min(open_, sl), 'sl'
+                elif tp and high >= tp:
+                    exit_price, reason = max(open_, tp), 'tp'
+                current = close
+            else:
+                ask_open, ask_high, ask_low = open_ + spread_price, high + spread_price, low + spread_price
+                if sl and ask_high >= sl:
+                    exit_price, reason = max(ask_open, sl), 'sl'
+                elif tp and ask_low <= tp:
+                    exit_price, reason = min(ask_open, tp), 'tp'
+                current = close + spread_price
+
+            if exit_price is not None:
+                self.close_position(position, exit_price, time_, reason)
+                continue
+
+            profit = self._profit(position, current)
+            self.floating += profit - position.profit
+            position.profit = profit
+            position.price_current = current
+
+    def _profit(self, position, price):
+        direction = 1 if position.type == ORDER_TYPE_BUY else -1
+        spec = position.spec
+        return (price - position.price_open) * direction / spec['point'] * spec['trade_tick_value'] * position.volume
+
+
+class BacktestEngine:
+    """
+    Replay bar history semua symbol melalui strategi bot terhadap SimulatedBroker
+    """
+
+    def __init__(self, config=None, balance=10000.0, slippage_points=0, spread_points=None,
+                 specs=None, leverage=100, stop_out_level=50.0):
+        self.config = config or settings.default_settings()
+        self.analysis_settings = settings.resolve_timeframes(
+            self.config['analysis_settings'], timeframe_from_name
+        )
+        self.initial_balance = balance
+        self.slippage_points = slippage_points
+        # Spread tetap (points); None = pakai kolom spread dari data bar
+        self.spread_points = spread_points
+        self.leverage = leverage
+        self.stop_out_level = stop_out_level
+        self.specs = specs or {}
+        self.bars = {}
+
+    def instrument_type(self, symbol):
+        for type_, symbols in self.config['trading_pairs'].items():
+            if symbol in symbols:
+                return type_
+        return None
+
+    def add_symbol(self, symbol, bars_by_timeframe):
+        """
+        Tambahkan data bar symbol: {timeframe: structured array}
+        """
+        self.bars[symbol] = bars_by_timeframe
+
+    def load(self, data_dir, symbols=None):
+        """
+        Muat file bar semua symbol & timeframe yang dikonfigurasi dari data_dir
+        """
+        specs_path = os.path.join(data_dir, 'specs.json')
+        if os.path.exists(specs_path):
+            with open(specs_path) as f:
+                self.specs.update(json.load(f))
+
+        for type_, pairs in self.config['trading_pairs'].items():
+            for symbol in pairs:
+                if symbols and symbol not in symbols:
+                    continue
+                bars = {}
+                for tf in self.analysis_settings[type_]['timeframes']:
+                    path = find_bars(data_dir, symbol, tf)
+                    if path:
+                        bars[tf] = load_bars(path)
+                if bars:
+                    self.add_symbol(symbol, bars)
+        return self
+
+    def symbol_signals(self, symbol):
+        """
+        Aksi (BUY/SELL/NEUTRAL) dan confidence di setiap close bar timeframe terkecil.
+        None jika tidak ada data untuk timeframe yang dikonfigurasi.
+        """
+        type_ = self.instrument_type(symbol)
+        analysis = self.analysis_settings[type_]
+        params = indicator_params(analysis)
+        bars = self.bars[symbol]
+        timeframes = [tf for tf in analysis['timeframes'] if tf in bars and len(bars[tf]) > 2]
+        if not timeframes:
+            return None
+        base_tf = min(timeframes, key=timeframe_seconds)
+        base = bars[base_tf]
+
+        warmup = max(params['ema_slow'], params['macd_slow'] + params['macd_signal'],
+                     params['bb_period'], params['rsi_period'] + 1, params['atr_period'])
+        decision_time = base['time'] + timeframe_seconds(base_tf)
+
+        directions = []
+        for tf in timeframes:
+            tf_bars = bars[tf]
+            frame = strategy.compute_indicators(
+                tf_bars['close'], tf_bars['high'], tf_bars['low'], tf_bars['tick_volume'], params
+            )
+            tf_directions = strategy.signal_direction(strategy.series_scores(frame))
+            tf_directions[:warmup] = strategy.NEUTRAL
+
+            # Bar terakhir timeframe ini yang sudah close saat bar dasar close
+            close_time = tf_bars['time'] + timeframe_seconds(tf)
+            index = np.searchsorted(close_time, decision_time, side='right') - 1
+            directions.append(np.where(index >= 0, tf_directions[np.maximum(index, 0)], strategy.NEUTRAL))
+
+        actions, confidence = strategy.combine_directions(
+            np.stack(directions, axis=-1), len(analysis['timeframes'])
+        )
+        return base, actions, confidence
+
+    def run(self):
+        """
+        Jalankan backtest, return laporan performa
+        """
+        started = time.perf_counter()
+        broker = SimulatedBroker(self.initial_balance, self.slippage_points, self.leverage,
+                                 self.stop_out_level)
+        risk_params = self.config['risk_params']
+        trailing = self.config['trailing_params']
+        max_spreads = self.config['max_spreads']
+
+        symbols = list(self.bars)
+        feeds = []
+        for symbol in symbols:
+            type_ = self.instrument_type(symbol)
+            signals = self.symbol_signals(symbol)
+            if signals is None:
+                continue
+            base, actions, confidence = signals
+            spread = base['spread'] if self.spread_points is None else np.full(len(base), self.spread_points)
+            feeds.append({
+                'symbol': symbol,
+                'type': type_,
+                'spec': symbol_spec(symbol, type_, self.specs),
+                'risk': self.config['risk_settings'][type_],
+                'max_spread': max_spreads.get(type_, {}).get(symbol, {}).get('max_spread', float('inf')),
+                'time': base['time'].tolist(),
+                'open': base['open'].tolist(),
+                'high': base['high'].tolist(),
+                'low': base['low'].tolist(),
+                'close': base['close'].tolist(),
+                'spread': spread.tolist(),
+                'actions': actions.tolist(),
+                'confidence': confidence.tolist()
+            })
+        signal_time = time.perf_counter() - started
+
+        # Urutan event global: (waktu bar, index symbol)
+        event_time = np.concatenate([np.asarray(f['time'], dtype=np.int64) for f in feeds]) if feeds else np.array([], dtype=np.int64)
+        event_symbol = np.concatenate([np.full(len(f['time']), i) for i, f in enumerate(feeds)]) if feeds else np.array([], dtype=int)
+        event_bar = np.concatenate([np.arange(len(f['time'])) for f in feeds]) if feeds else np.array([], dtype=int)
+        order = np.lexsort((event_symbol, event_time))
+
+        stats = {'signals': 0, 'orders': 0, 'rejected_spread': 0, 'rejected_margin': 0,
+                 'trailing_updates': 0, 'drawdown_closes': 0, 'stopped_out': None}
+        pending = {}
+        # Waktu bar terakhir yang diproses per symbol, untuk close di akhir backtest
+        last_time = {}
+        peak_equity = broker.equity
+        max_drawdown = 0.0
+        max_drawdown_pct = 0.0
+
+        for s, i in zip(event_symbol[order].tolist(), event_bar[order].tolist()):
+            feed = feeds[s]
+            symbol = feed['symbol']
+            spec = feed['spec']
+            t = feed['time'][i]
+            spread = feed['spread'][i]
+            last_time[symbol] = t
+
+            # Order dari sinyal bar sebelumnya dieksekusi di open bar ini
+            action = pending.pop(s, None)
+            if action is not None:
+                if spread > feed['max_spread']:
+                    stats['rejected_spread'] += 1
+                elif self._open(broker, feed, action, i, spread):
+                    stats['orders'] += 1
+                else:
+                    stats['rejected_margin'] += 1
+
+            if broker.by_symbol.get(symbol):
+                broker.process_bar(symbol, t, feed['open'][i], feed['high'][i], feed['low'][i],
+                                   feed['close'][i], spread)
+                self._manage(broker, symbol, t, spread, risk_params, trailing, stats)
+
+            action = feed['actions'][i]
+            if action != strategy.NEUTRAL:
+                stats['signals'] += 1
+                pending[s] = action
+
+            equity = broker.equity
+            if equity > peak_equity:
+                peak_equity = equity
+            elif peak_equity - equity > max_drawdown:
+                max_drawdown = peak_equity - equity
+                max_drawdown_pct = max_drawdown / peak_equity * 100
+
+            # Akun habis (equity <= 0 / margin level stop out): semua posisi ditutup dan backtest berhenti
+            if broker.stopped_out():
+                stats['stopped_out'] = t
+                break
+
+        # Tutup semua posisi yang masih terbuka di harga close terakhir
+        for position in broker.positions_get():
+            if stats['stopped_out'] is None:
+                broker.close_position(position, position.price_current, last_time[position.symbol], 'end')
+            else:
+                broker.close_position(position, position.price_current, stats['stopped_out'], 'stop_out')
+
+        elapsed = time.perf_counter() - started
+        total_bars = sum(
+            len(per_symbol[tf])
+            for symbol, per_symbol in self.bars.items()
+            for tf in self.analysis_settings[self.instrument_type(symbol)]['timeframes'] if tf in per_symbol
+        )
+        report = self._report(broker, stats, max_drawdown, max_drawdown_pct)
+        report.update({
+            'bars': total_bars,
+            'events': len(order),
+            'signal_seconds': signal_time,
+            'elapsed_seconds': elapsed,
+            'bars_per_sec': total_bars / elapsed if elapsed > 0 else 0.0
+        })
+        return report
+
+    def _open(self, broker, feed, action, i, spread):
+        spec = feed['spec']
+        bid = feed['open'][i]
+        ask = bid + spread * spec['point']
+        label = strategy.LABELS[action]
+        price = ask if action == strategy.BUY else bid
+        sl, tp, sl_distance = strategy.order_levels(label, price, spec['point'], feed['type'], feed['risk'])
+        volume = strategy.position_size(
+            broker.balance, feed['risk']['risk_percent'], sl_distance / spec['point'],
+            spec['trade_tick_value'], spec['digits'], spec['volume_max']
+        )
+        # Order ditolak jika margin bebas tidak cukup (sama seperti "No money" di MT5)
+        if broker.required_margin(spec, volume, price) > broker.margin_free:
+            return False
+        order_type = ORDER_TYPE_BUY if action == strategy.BUY else ORDER_TYPE_SELL
+        broker.open_position(feed['symbol'], spec, order_type, volume, bid, ask, sl, tp,
+                             feed['time'][i], comment=f"signal_{feed['confidence'][i]:.2f}")
+        return True
+
+    def _manage(self, broker, symbol, time_, spread, risk_params, trailing, stats):
+        """
+        Trailing stop & close max drawdown, sama seperti monitor_positions
+        """
+        for position in list(broker.positions_get(symbol, magic=MAGIC)):
+            spec = position.spec
+            profit_pips = position.profit / (spec['trade_tick_value'] * position.volume)
+
+            if trailing['enabled'] and profit_pips >= trailing['start_pips']:
+                new_sl = float(strategy.trailing_stop_levels(
+                    position.type == ORDER_TYPE_BUY, position.price_current, position.sl,
+                    profit_pips, spec['point'], trailing
+                ))
+                if not np.isnan(new_sl):
+                    broker.modify_position(position.ticket, new_sl)
+                    stats['trailing_updates'] += 1
+
+            if position.profit < 0:
+                _, breach = strategy.drawdown_breach(position.profit, broker.balance,
+                                                     risk_params['max_drawdown'])
+                if breach:
+                    broker.close_position(position, position.price_current, time_, 'drawdown')
+                    stats['drawdown_closes'] += 1
+
+    def _report(self, broker, stats, max_drawdown, max_drawdown_pct):
+        profits = np.array([deal['profit'] for deal in broker.deals], dtype=float)
+        gross_profit = float(profits[profits > 0].sum())
+        gross_loss = float(profits[profits < 0].sum())
+        wins = int((profits > 0).sum())
+        report = dict(stats)
+        report.update({
+            'trades': len(profits),
+            'wins': wins,
+            'losses': int((profits < 0).sum()),
+            'win_rate': wins / len(profits) * 100 if len(profits) else 0.0,
+            'gross_profit': gross_profit,
+            'gross_loss': gross_loss,
+            'net_profit': gross_profit + gross_loss,
+            'profit_factor': gross_profit / abs(gross_loss) if gross_loss else float('inf'),
+            'max_drawdown': max_drawdown,
+            'max_drawdown_pct': max_drawdown_pct,
+            'final_balance': broker.balance,
+            'deals': broker.deals
+        })
+        return report
+
+
+def format_report(report):
+    """
+    Laporan backtest dalam format teks
+    """
+    stopped_out = ''
+    if report['stopped_out'] is not None:
+        stopped_out = (f"🛑 Stop out {time.strftime('%Y-%m-%d %H:%M', time.gmtime(report['stopped_out']))}: "
+                       f"equity/margin habis, backtest dihentikan\n")
+    # Tanpa trade rugi profit factor tidak terdefinisi (seperti journal.summary)
+    profit_factor = 'N/A' if math.isinf(report['profit_factor']) else f"{report['profit_factor']:.2f}"
+    return f"""
+📊 BACKTEST REPORT
+
+Total Trades: {report['trades']}
+Win Rate: {report['win_rate']:.2f}%
+Profit Factor: {profit_factor}
+
+🟢 Winning Trades: {report['wins']}
+🔴 Losing Trades: {report['losses']}
+
+💰 Gross Profit: ${report['gross_profit']:.2f}
+📉 Gross Loss: ${abs(report['gross_loss']):.2f}
+📈 Net P/L: ${report['net_profit']:.2f}
+📉 Max Drawdown: ${report['max_drawdown']:.2f} ({report['max_drawdown_pct']:.2f}%)
+💵 Final Balance: ${report['final_balance']:.2f}
+
+Signals: {report['signals']} | Orders: {report['orders']} | Spread Rejects: {report['rejected_spread']} | Margin Rejects: {report['rejected_margin']}
+Trailing Updates: {report['trailing_updates']} | Drawdown Closes: {report['drawdown_closes']}
+{stopped_out}
+⚡ {report['bars']} bars dalam {report['elapsed_seconds']:.2f}s ({report['bars_per_sec']:,.0f} bars/sec)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest strategi bot terhadap data history")
+    parser.add_argument('--data', required=True, help="Folder file <SYMBOL>_<TF>.csv/.npy")
+    parser.add_argument('--symbols', default='', help="Daftar symbol dipisah koma (default semua)")
+    parser.add_argument('--balance', type=float, default=10000.0)
+    parser.add_argument('--slippage', type=float, default=0, help="Slippage dalam points")
+    parser.add_argument('--spread', type=float, default=None, help="Spread tetap (points)")
+    parser.add_argument('--leverage', type=float, default=100, help="Leverage akun untuk margin")
+    parser.add_argument('--stop-out', type=float, default=50.0, help="Margin level stop out (persen)")
+    parser.add_argument('--config', default='config.json',
+                        help="File pengaturan bot, sama dengan bot live (default jika tidak ada)")
+    args = parser.parse_args()
+
+    try:
+        config = settings.load_settings(args.config)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    symbols = [s for s in args.symbols.split(',') if s]
+    engine = BacktestEngine(config=config, balance=args.balance, slippage_points=args.slippage,
+                            spread_points=args.spread, leverage=args.leverage,
+                            stop_out_level=args.stop_out)
+    engine.load(args.data, symbols)
+    if not engine.bars:
+        print(f"❌ Tidak ada data bar di {args.data}")
+        return
+    print(format_report(engine.run()))
+
+
+if __name__ == '__main__':
+    main()
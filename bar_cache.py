@@ -0,0 +1,270 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from scheduler import timeframe_seconds
+
+# Layout bar dari copy_rates_* MT5
+RATES_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<u8'),
+    ('spread', '<i4'),
+    ('real_volume', '<u8')
+])
+
+
+class BarBuffer:
+    """
+    Ring buffer bar untuk satu (symbol, timeframe).
+
+    Setiap bar ditulis dua kali (slot dan slot + depth) sehingga `depth` bar
+    terakhir selalu tersedia sebagai satu view numpy yang contiguous tanpa copy.
+    """
+
+    def __init__(self, dtype, depth):
+        self.depth = depth
+        self.data = np.zeros(2 * depth, dtype=dtype)
+        self.slot = -1
+        self.size = 0
+
+    @property
+    def last_time(self):
+        if self.size == 0:
+            return None
+        return int(self.data['time'][self.slot])
+
+    def append(self, bars):
+        """
+        Tambahkan bar baru di akhir buffer
+        """
+        # Hanya `depth` bar terakhir yang perlu ditulis
+        bars = bars[-self.depth:]
+        if len(bars) == 0:
+            return
+        slots = (self.slot + 1 + np.arange(len(bars))) % self.depth
+        self.data[slots] = bars
+        self.data[slots + self.depth] = bars
+        self.slot = int(slots[-1])
+        self.size = min(self.size + len(bars), self.depth)
+
+    def replace_last(self, bar):
+        """
+        Ganti bar terakhir (bar yang masih berjalan) di tempat
+        """
+        self.data[self.slot] = bar
+        self.data[self.slot + self.depth] = bar
+
+    def view(self, count):
+        """
+        View `count` bar terakhir, urut dari yang paling lama
+        """
+        count = min(count, self.size)
+        end = self.slot + self.depth + 1
+        return self.data[end - count:end]
+
+
+class BarCache:
+    """
+    Cache bar per (symbol, timeframe) yang hanya mengambil bar baru dari terminal.
+
+    Fetch pertama (miss) mengambil `depth` bar via copy_rates_from_pos. Fetch
+    berikutnya (hit) memakai copy_rates_range mulai dari waktu bar terakhir,
+    sehingga hanya bar berjalan + bar baru yang ditransfer.
+
+    Jika `store` (bar_store.BarStore) diisi, bar yang sudah close ikut disimpan
+    ke disk dan buffer diisi dari disk saat start sehingga hanya bar sejak
+    bar tersimpan terakhir yang diambil dari terminal.
+
+    Jika `shared` (shared_bars.SharedBars) diisi, buffer dibuat di shared memory
+    sehingga process lain bisa membaca bar yang sama tanpa copy.
+    """
+
+    def __init__(self, terminal, depth=100, store=None, shared=None):
+        self.terminal = terminal
+        self.depth = depth
+        self.store = store
+        self.shared = shared
+        self.buffers = {}
+        self.lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'seeded': 0,
+            'bars_fetched': 0,
+            'bars_served': 0
+        }
+
+    def get(self, symbol, timeframe, count=100):
+        """
+        Ambil `count` bar terakhir (structured array MT5, bar terakhir masih berjalan).
+        Hasilnya view ke buffer, jangan disimpan melewati update berikutnya.
+        """
+        with self.lock:
+            if count > self.depth:
+                # Lebih dalam dari buffer, ambil langsung dari terminal
+                self.stats['misses'] += 1
+                rates = self.terminal.copy_rates_from_pos(symbol, timeframe, 0, count)
+                if rates is not None:
+                    self.stats['bars_fetched'] += len(rates)
+                    self.stats['bars_served'] += len(rates)
+                return rates
+
+            key = (symbol, timeframe)
+            buffer = self.buffers.get(key)
+            if buffer is None or not self._refresh(symbol, timeframe, buffer, self.stats):
+                buffer = self._load(symbol, timeframe)
+                if buffer is None:
+                    return None
+
+            rates = buffer.view(count)
+            self.stats['bars_served'] += len(rates)
+            return rates
+
+    def invalidate(self, symbol=None, timeframe=None):
+        """
+        Hapus buffer (semua, per symbol, atau per symbol & timeframe)
+        """
+        with self.lock:
+            for key in list(self.buffers):
+                if symbol is not None and key[0] != symbol:
+                    continue
+                if timeframe is not None and key[1] != timeframe:
+                    continue
+                del self.buffers[key]
+
+    def clear(self):
+        self.invalidate()
+
+    def hit_ratio(self):
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+
+    def prefetch(self, keys, workers=8):
+        """
+        Isi buffer banyak (symbol, timeframe) sekaligus dari beberapa thread (warm-up
+        sebelum pass pertama). Return jumlah seri yang berhasil dimuat.
+        """
+        with self.lock:
+            keys = [key for key in dict.fromkeys(keys) if key not in self.buffers]
+        if not keys:
+            return 0
+
+        def build(key):
+            # Statistik dihitung per thread lalu dijumlahkan di bawah lock
+            counts = dict.fromkeys(self.stats, 0)
+            try:
+                return key, self._build(*key, counts), counts
+            except Exception as e:
+                print(f"❌ Error prefetch bar {key[0]}: {e}")
+                return key, None, counts
+
+        # Request terminal berjalan paralel di luar lock, buffer dipasang sekaligus
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(build, keys))
+        loaded = 0
+        with self.lock:
+            for key, buffer, counts in results:
+                for name, value in counts.items():
+                    self.stats[name] += value
+                if buffer is not None:
+                    self.buffers.setdefault(key, buffer)
+                    loaded += 1
+        return loaded
+
+    def _load(self, symbol, timeframe):
+        buffer = self._build(symbol, timeframe, self.stats)
+        if buffer is None:
+            self.buffers.pop((symbol, timeframe), None)
+        else:
+            self.buffers[(symbol, timeframe)] = buffer
+        return buffer
+
+    def _build(self, symbol, timeframe, stats):
+        """
+        Buffer baru dari bar store + terminal (atau terminal saja), None jika tidak ada data.
+        Hitungan masuk ke `stats` (self.stats di bawah lock, dict lokal saat prefetch).
+        """
+        stats['misses'] += 1
+        buffer = self._seed(symbol, timeframe, stats)
+        if buffer is not None:
+            return buffer
+
+        rates = self.terminal.copy_rates_from_pos(symbol, timeframe, 0, self.depth)
+        if rates is None or len(rates) == 0:
+            return None
+
+        stats['bars_fetched'] += len(rates)
+        buffer = self._new_buffer(symbol, timeframe, rates.dtype)
+        buffer.append(rates)
+        self._persist(symbol, timeframe, rates)
+        return buffer
+
+    def _seed(self, symbol, timeframe, stats):
+        """
+        Buffer dari bar store + bar baru dari terminal. None jika store kosong,
+        terlalu lama tertinggal, atau tidak nyambung dengan data terminal.
+        """
+        if self.store is None:
+            return None
+        stored = self.store.tail(symbol, timeframe, self.depth)
+        if stored is None or len(stored['time']) == 0:
+            return None
+        # Lebih dari `depth` bar (+ libur akhir pekan) tertinggal, lebih murah ambil ulang
+        behind = time.time() - int(stored['time'][-1])
+        if behind > self.depth * timeframe_seconds(timeframe) + 3 * 86400:
+            return None
+
+        rates = np.zeros(len(stored['time']), dtype=RATES_DTYPE)
+        for name, column in stored.items():
+            rates[name] = column
+        buffer = self._new_buffer(symbol, timeframe, RATES_DTYPE)
+        buffer.append(rates)
+        if not self._refresh(symbol, timeframe, buffer, stats):
+            return None
+        stats['seeded'] += 1
+        return buffer
+
+    def _new_buffer(self, symbol, timeframe, dtype):
+        if self.shared is not None:
+            return self.shared.buffer(symbol, timeframe, self.depth)
+        return BarBuffer(dtype, self.depth)
+
+    def _persist(self, symbol, timeframe, rates):
+        """
+        Simpan bar yang sudah close (semua kecuali bar terakhir) ke bar store
+        """
+        if self.store is None:
+            return
+        try:
+            self.store.append(symbol, timeframe, rates[:-1])
+        except Exception as e:
+            # Gagal simpan ke disk tidak boleh menghentikan trading
+            print(f"❌ Error menyimpan bar {symbol}: {e}")
+
+    def _refresh(self, symbol, timeframe, buffer, stats):
+        """
+        Ambil bar mulai dari bar terakhir di buffer. False jika harus load ulang.
+        """
+        date_from = datetime.fromtimestamp(buffer.last_time, tz=timezone.utc)
+        date_to = datetime.now(timezone.utc) + timedelta(days=1)
+        rates = self.terminal.copy_rates_range(symbol, timeframe, date_from, date_to)
+        if rates is None or len(rates) == 0:
+            return False
+
+        # Bar pertama harus bar berjalan yang sudah ada di buffer, selain itu gap
+        if int(rates['time'][0]) != buffer.last_time:
+            return False
+
+        stats['hits'] += 1
+        stats['bars_fetched'] += len(rates)
+        buffer.replace_last(rates[0])
+        buffer.append(rates[1:])
+        self._persist(symbol, timeframe, rates)
+        return True
@@ -0,0 +1,323 @@
+"""
+Penyimpanan bar di disk per (symbol, timeframe), append-only dan kolumnar.
+
+Setiap seri adalah satu folder <root>/<SYMBOL>_<TIMEFRAME>/ berisi:
+- header.bin: magic, versi dan jumlah bar yang sudah di-commit
+- <kolom>.bin: array fixed-width per kolom (time, open, high, low, close,
+  tick_volume, spread) yang dibaca sebagai numpy memmap
+
+Writer menulis data kolom di akhir file lalu menaikkan `count` di header,
+jadi reader (thread atau process lain) hanya pernah melihat bar yang sudah
+lengkap. Reader men-slice range waktu langsung dari memmap tanpa copy.
+Satu seri hanya boleh punya satu writer.
+
+Contoh:
+    python bar_store.py info --store bars/
+    python bar_store.py import --store bars/ --data data/
+    python bar_store.py export --store bars/ --symbol EURUSD --timeframe M5 --output EURUSD_M5.npy
+"""
+import argparse
+import os
+import threading
+
+import numpy as np
+
+from bar_cache import RATES_DTYPE
+from scheduler import timeframe_from_name, timeframe_name
+
+MAGIC = b'RBAR'
+VERSION = 1
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'),
+    ('version', '<u4'),
+    ('count', '<i8')
+])
+
+COLUMNS = (
+    ('time', np.dtype('<i8')),
+    ('open', np.dtype('<f8')),
+    ('high', np.dtype('<f8')),
+    ('low', np.dtype('<f8')),
+    ('close', np.dtype('<f8')),
+    ('tick_volume', np.dtype('<u8')),
+    ('spread', np.dtype('<i4'))
+)
+
+
+def series_name(symbol, timeframe):
+    return f"{symbol}_{timeframe_name(timeframe)}"
+
+
+def to_rates(columns):
+    """
+    Kolom bar -> structured array MT5 (copy), untuk backtest / indikator
+    """
+    rates = np.zeros(len(columns['time']), dtype=RATES_DTYPE)
+    for name, _ in COLUMNS:
+        rates[name] = columns[name]
+    return rates
+
+
+class BarSeries:
+    """
+    Satu seri bar (symbol, timeframe) di disk
+    """
+
+    def __init__(self, path, writable=False):
+        self.path = path
+        self.writable = writable
+        self.lock = threading.Lock()
+        self.maps = {}
+        self.mapped = 0
+
+        header_path = os.path.join(path, 'header.bin')
+        if not os.path.exists(header_path):
+            if not writable:
+                raise FileNotFoundError(f"Seri bar tidak ada: {path}")
+            self._create(header_path)
+
+        self.header = np.memmap(header_path, dtype=HEADER_DTYPE, mode='r+' if writable else 'r', shape=(1,))
+        if self.header['magic'][0] != MAGIC or self.header['version'][0] != VERSION:
+            raise ValueError(f"Format seri bar tidak dikenal: {path}")
+
+        self.files = {}
+        self.last_written = None
+        if writable:
+            count = self.count
+            for name, dtype in COLUMNS:
+                f = open(self._column_path(name), 'r+b')
+                # Buang sisa append yang belum di-commit (misalnya process mati di tengah append)
+                f.truncate(count * dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                self.files[name] = f
+            self.last_written = self.last_time
+
+    @property
+    def count(self):
+        """
+        Jumlah bar yang sudah di-commit
+        """
+        return int(self.header['count'][0])
+
+    @property
+    def last_time(self):
+        count = self.count
+        if count == 0:
+            return None
+        return int(self.columns(count)['time'][-1])
+
+    def columns(self, count=None):
+        """
+        Dict {kolom: memmap} berisi `count` bar pertama (default semua yang sudah di-commit)
+        """
+        count = self.count if count is None else count
+        if count == 0:
+            return {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS}
+
+        with self.lock:
+            if count > self.mapped:
+                # Map ulang sepanjang data yang sudah di-commit; view lama tetap valid
+                self.maps = {
+                    name: np.memmap(self._column_path(name), dtype=dtype, mode='r', shape=(count,))
+                    for name, dtype in COLUMNS
+                }
+                self.mapped = count
+            maps = self.maps
+        return {name: column[:count] for name, column in maps.items()}
+
+    def read(self, start=None, end=None):
+        """
+        Bar dengan start <= time <= end (epoch detik) sebagai view memmap per kolom
+        """
+        columns = self.columns()
+        times = columns['time']
+        lo = 0 if start is None else int(np.searchsorted(times, start, 'left'))
+        hi = len(times) if end is None else int(np.searchsorted(times, end, 'right'))
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    def tail(self, count):
+        """
+        `count` bar terakhir sebagai view memmap per kolom
+        """
+        columns = self.columns()
+        return {name: column[-count:] if count else column[:0] for name, column in columns.items()}
+
+    def append(self, rates, sync=False):
+        """
+        Tambahkan bar (structured array MT5 atau dict kolom) yang lebih baru dari bar terakhir.
+        Return jumlah bar yang ditulis.
+        """
+        if not self.writable:
+            raise PermissionError(f"Seri bar dibuka read-only: {self.path}")
+
+        times = np.asarray(rates['time'], dtype=np.int64)
+        last_time = self.last_written
+        keep = slice(None) if last_time is None else slice(int(np.searchsorted(times, last_time, 'right')), None)
+        times = times[keep]
+        if len(times) == 0:
+            return 0
+        if np.any(np.diff(times) <= 0):
+            raise ValueError("Waktu bar harus naik dan unik")
+
+        for name, dtype in COLUMNS:
+            f = self.files[name]
+            f.write(np.ascontiguousarray(np.asarray(rates[name])[keep], dtype=dtype).tobytes())
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+
+        # Commit: reader baru melihat bar baru setelah count dinaikkan
+        self.header['count'][0] = self.count + len(times)
+        self.last_written = int(times[-1])
+        if sync:
+            self.header.flush()
+        return len(times)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+        self.maps = {}
+        self.mapped = 0
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _create(self, header_path):
+        os.makedirs(self.path, exist_ok=True)
+        for name, _ in COLUMNS:
+            open(self._column_path(name), 'ab').close()
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['magic'] = MAGIC
+        header['version'] = VERSION
+        # Tulis ke file sementara lalu rename supaya reader tidak melihat header setengah jadi
+        tmp_path = header_path + '.tmp'
+        header.tofile(tmp_path)
+        os.replace(tmp_path, header_path)
+
+
+class BarStore:
+    """
+    Kumpulan seri bar di satu folder
+    """
+
+    def __init__(self, root, writable=True):
+        self.root = root
+        self.writable = writable
+        self.series_map = {}
+        self.lock = threading.Lock()
+        if writable:
+            os.makedirs(root, exist_ok=True)
+        self.stats = {
+            'bars_written': 0
+        }
+
+    def series(self, symbol, timeframe, create=False):
+        """
+        BarSeries untuk (symbol, timeframe); None jika belum ada dan create=False
+        """
+        key = (symbol, timeframe)
+        with self.lock:
+            series = self.series_map.get(key)
+            if series is None:
+                path = os.path.join(self.root, series_name(symbol, timeframe))
+                if not os.path.exists(os.path.join(path, 'header.bin')) and not (create and self.writable):
+                    return None
+                series = BarSeries(path, writable=self.writable)
+                self.series_map[key] = series
+            return series
+
+    def keys(self):
+        """
+        Semua (symbol, timeframe) yang ada di store
+        """
+        found = []
+        if not os.path.isdir(self.root):
+            return found
+        for name in sorted(os.listdir(self.root)):
+            if '_' not in name or not os.path.exists(os.path.join(self.root, name, 'header.bin')):
+                continue
+            symbol, tf_name = name.rsplit('_', 1)
+            try:
+                found.append((symbol, timeframe_from_name(tf_name)))
+            except (ValueError, IndexError):
+                continue
+        return found
+
+    def append(self, symbol, timeframe, rates, sync=False):
+        if rates is None or len(rates) == 0:
+            return 0
+        written = self.series(symbol, timeframe, create=True).append(rates, sync)
+        # append dipanggil paralel saat prefetch BarCache
+        with self.lock:
+            self.stats['bars_written'] += written
+        return written
+
+    def read(self, symbol, timeframe, start=None, end=None):
+        """
+        View kolom bar dalam range waktu, None jika seri tidak ada
+        """
+        series = self.series(symbol, timeframe)
+        return None if series is None else series.read(start, end)
+
+    def tail(self, symbol, timeframe, count):
+        series = self.series(symbol, timeframe)
+        return None if series is None else series.tail(count)
+
+    def last_time(self, symbol, timeframe):
+        series = self.series(symbol, timeframe)
+        return None if series is None else series.last_time
+
+    def close(self):
+        with self.lock:
+            for series in self.series_map.values():
+                series.close()
+            self.series_map = {}
+
+
+def main():
+    import backtest
+
+    parser = argparse.ArgumentParser(description="Kelola bar store di disk")
+    parser.add_argument('command', choices=('info', 'import', 'export'))
+    parser.add_argument('--store', default='bars', help="Folder bar store")
+    parser.add_argument('--data', help="import: folder file <SYMBOL>_<TF>.csv/.npy")
+    parser.add_argument('--symbol', help="export: symbol")
+    parser.add_argument('--timeframe', help="export: timeframe, misalnya M5")
+    parser.add_argument('--output', help="export: file .npy tujuan")
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        store = BarStore(args.store, writable=False)
+        print(f"{'seri':<16}{'bar':>10}  {'dari':<20}{'sampai':<20}")
+        for symbol, timeframe in store.keys():
+            times = store.read(symbol, timeframe)['time']
+            if len(times) == 0:
+                print(f"{series_name(symbol, timeframe):<16}{0:>10}")
+                continue
+            first, last = (np.datetime64(int(t), 's') for t in (times[0], times[-1]))
+            print(f"{series_name(symbol, timeframe):<16}{len(times):>10}  {str(first):<20}{str(last):<20}")
+
+    elif args.command == 'import':
+        if not args.data:
+            parser.error("import butuh --data")
+        store = BarStore(args.store)
+        for (symbol, timeframe), path in backtest.scan_bars(args.data).items():
+            written = store.append(symbol, timeframe, backtest.load_bars(path), sync=True)
+            print(f"✅ {series_name(symbol, timeframe)}: {written} bar baru")
+        store.close()
+
+    else:
+        if not (args.symbol and args.timeframe and args.output):
+            parser.error("export butuh --symbol, --timeframe dan --output")
+        store = BarStore(args.store, writable=False)
+        columns = store.read(args.symbol, timeframe_from_name(args.timeframe))
+        if columns is None:
+            parser.error(f"Seri {args.symbol}_{args.timeframe} tidak ada di {args.store}")
+        np.save(args.output, to_rates(columns))
+        print(f"✅ {len(columns['time'])} bar disimpan ke {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+"""
+Micro-benchmark hot path indikator & sinyal ForexGoldAnalyzer.
+
+Fungsi indikator & sinyal dijalankan pada series bar sintetis (default 100,
+10k dan 1M bar). analyze_market hanya diukur sekali pada window analisa (100 bar
+per timeframe, seperti loop live), karena ukuran --bars tidak mengubah jumlah
+bar yang dianalisa. Dilaporkan waktu per panggilan, waktu per bar dan alokasi memori per panggilan
+(puncak tracemalloc). Hasil bisa disimpan sebagai baseline; run berikutnya
+gagal (exit code 1) jika ada fungsi yang lebih lambat dari baseline melebihi
+threshold.
+
+Bot dijalankan dengan terminal palsu (fake_mt5.py), jadi bisa di Linux. Bot
+dibuat di folder sementara (config.json, trades.db dan bars/ tidak menyentuh
+folder kerja) dan endpoint metrics langsung dimatikan.
+
+Jalankan dengan:
+    python benchmarks/bench_hotpaths.py --save-baseline
+    python benchmarks/bench_hotpaths.py --threshold 0.25
+    python benchmarks/bench_hotpaths.py --bars 100,10000 --only calculate_rsi,analyze_market
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('ROBOT_FAKE_MT5', '1')
+
+from bar_cache import RATES_DTYPE  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline_hotpaths.json')
+
+# Bar tambahan setelah window supaya analyze_market selalu mendapat bar baru
+EXTRA_BARS = 10000
+
+# Jumlah bar per timeframe yang dianalisa analyze_market (sama dengan loop live)
+ANALYSIS_BARS = 100
+
+
+def synthetic_rates(n, seconds, seed=0):
+    """
+    Random walk dalam format rates MT5
+    """
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.0005, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    wick = np.abs(rng.normal(0, 0.0003, n))
+    rates = np.zeros(n, dtype=RATES_DTYPE)
+    rates['time'] = 1_600_000_000 // seconds * seconds + np.arange(n) * seconds
+    rates['open'] = open_
+    rates['close'] = close
+    rates['high'] = np.maximum(open_, close) + wick
+    rates['low'] = np.minimum(open_, close) - wick
+    rates['tick_volume'] = rng.integers(50, 500, n)
+    rates['spread'] = 10
+    return rates
+
+
+def create_analyzer():
+    """
+    ForexGoldAnalyzer headless dengan fake MT5, output login disembunyikan.
+    Dipanggil dari folder sementara; endpoint metrics dan config watcher dimatikan.
+    """
+    import app
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer = app.ForexGoldAnalyzer(headless=True)
+    if analyzer.metrics_server is not None:
+        analyzer.metrics_server.shutdown()
+        analyzer.metrics_server.server_close()
+        analyzer.metrics_server = None
+    if analyzer.config_watcher is not None:
+        analyzer.config_watcher.stop()
+        analyzer.config_watcher = None
+    return analyzer
+
+
+def close_analyzer(analyzer):
+    """
+    Hentikan thread notifier & jurnal sebelum folder sementara dihapus
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.notifier.stop()
+        analyzer.journal.close()
+
+
+class MarketReplay:
+    """
+    Sumber rates untuk analyze_market: `count` bar terakhir dari window yang
+    bergeser satu bar setiap panggilan, seperti loop live yang mendapat satu
+    bar close baru. Window cukup panjang untuk membangun timeframe terbesar
+    dari timeframe terkecil (resample).
+    """
+
+    def __init__(self, timeframes, bars=ANALYSIS_BARS):
+        from resampler import source_bars
+        from scheduler import timeframe_seconds
+        base_timeframe = min(timeframes, key=timeframe_seconds)
+        self.window = source_bars(base_timeframe, timeframes, bars)
+        self.series = {
+            tf: synthetic_rates(self.window + EXTRA_BARS, timeframe_seconds(tf), seed=i)
+            for i, tf in enumerate(timeframes)
+        }
+        self.position = 0
+
+    def advance(self):
+        self.position = (self.position + 1) % EXTRA_BARS
+
+    def get_rates(self, symbol, timeframe, count=100):
+        end = self.window + self.position
+        return self.series[timeframe][end - min(count, self.window):end]
+
+
+def build_cases(analyzer, n):
+    """
+    Daftar (nama, fungsi) indikator & sinyal untuk ukuran series n bar
+    """
+    rates = synthetic_rates(n, 300)
+    close = rates['close'].copy()
+    frame = analyzer.calculate_indicators(rates)
+
+    return [
+        ('calculate_ema', lambda: analyzer.calculate_ema(close, 20)),
+        ('calculate_rsi', lambda: analyzer.calculate_rsi(close, 14)),
+        ('calculate_macd', lambda: analyzer.calculate_macd(close)),
+        ('calculate_bollinger_bands', lambda: analyzer.calculate_bollinger_bands(close)),
+        ('calculate_indicators', lambda: analyzer.calculate_indicators(rates)),
+        ('analyze_signals', lambda: analyzer.analyze_signals(frame)),
+    ]
+
+
+def build_market_cases(analyzer):
+    """
+    Daftar (nama, fungsi) analyze_market pada window analisa (ANALYSIS_BARS bar)
+    """
+    symbol = 'EURUSD'
+    timeframes = analyzer.analysis_settings['forex']['timeframes']
+    replay = MarketReplay(timeframes)
+    # Rates diambil dari replay, bukan dari terminal
+    analyzer.get_rates = replay.get_rates
+    analyzer.indicator_engine.reset(symbol)
+    analyzer.timeframe_scores.clear()
+
+    def analyze_market():
+        replay.advance()
+        return analyzer.analyze_market(symbol)
+
+    def analyze_market_cold():
+        analyzer.indicator_engine.reset(symbol)
+        return analyzer.analyze_market(symbol)
+
+    return [
+        ('analyze_market', analyze_market),
+        ('analyze_market_cold', analyze_market_cold),
+    ]
+
+
+def measure(func, repeat, min_time):
+    """
+    Waktu terbaik per panggilan (detik) dan alokasi puncak per panggilan (byte)
+    """
+    # Warm-up: cache, state inkremental, import lazy
+    func()
+
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak - base
+
+
+def format_time(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot path indikator & sinyal")
+    parser.add_argument('--bars', default='100,10000,1000000')
+    parser.add_argument('--only', default='', help="Nama fungsi dipisah koma")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help="Durasi minimal satu repeat (detik)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Regresi maksimal terhadap baseline (0.25 = 25%% lebih lambat)")
+    args = parser.parse_args()
+
+    only = {name for name in args.only.split(',') if name}
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    # Path relatif dari argumen sebelum pindah ke folder sementara
+    baseline_path = os.path.abspath(args.baseline)
+    cwd = os.getcwd()
+    results = {}
+    regressions = []
+
+    print(f"{'fungsi':<28}{'bars':>10}{'per call':>12}{'ns/bar':>10}{'alokasi':>12}{'vs baseline':>14}")
+    with tempfile.TemporaryDirectory(prefix='bench_hotpaths_') as workdir:
+        os.chdir(workdir)
+        analyzer = create_analyzer()
+        try:
+            runs = [(n, build_cases(analyzer, n)) for n in [int(x) for x in args.bars.split(',')]]
+            runs.append((ANALYSIS_BARS, build_market_cases(analyzer)))
+            for n, cases in runs:
+                for name, func in cases:
+                    if only and name not in only:
+                        continue
+                    seconds, allocated = measure(func, args.repeat, args.min_time)
+                    key = f"{name}@{n}"
+                    results[key] = {'seconds': seconds, 'ns_per_bar': seconds / n * 1e9, 'alloc_bytes': allocated}
+
+                    status = ''
+                    if key in baseline:
+                        ratio = seconds / baseline[key]['seconds']
+                        status = f"{ratio:.2f}x"
+                        if ratio > 1 + args.threshold:
+                            status += ' REGRESI'
+                            regressions.append((key, ratio))
+
+                    print(f"{name:<28}{n:>10}{format_time(seconds):>12}{seconds / n * 1e9:>10.1f}"
+                          f"{allocated / 1024:>9.1f} KiB{status:>14}")
+        finally:
+            close_analyzer(analyzer)
+            os.chdir(cwd)
+
+    if args.save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump({'threshold': args.threshold, 'results': results}, f, indent=2)
+        print(f"\nBaseline disimpan di {baseline_path}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} fungsi lebih lambat > {args.threshold * 100:.0f}% dari baseline:")
+        for key, ratio in regressions:
+            print(f"   {key}: {ratio:.2f}x")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
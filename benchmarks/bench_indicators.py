@@ -0,0 +1,100 @@
+"""
+Benchmark indikator: implementasi lama (loop Python / pandas) vs indicators.py
+
+Jalankan dengan:
+    python benchmarks/bench_indicators.py [--bars 100,1000,10000] [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import indicators  # noqa: E402
+
+
+# === Implementasi lama (disalin dari app.py sebelum memakai indicators.py) ===
+
+def legacy_ema(data, period):
+    multiplier = 2 / (period + 1)
+    ema = [data[0]]
+    for price in data[1:]:
+        ema.append((price * multiplier) + (ema[-1] * (1 - multiplier)))
+    return np.array(ema)
+
+
+def legacy_ma(close, period):
+    return np.convolve(close, np.ones(period), 'valid') / period
+
+
+def legacy_rsi(close, period=14):
+    delta = np.diff(close)
+    gain = np.where(delta > 0, delta, 0)
+    loss = np.where(delta < 0, -delta, 0)
+    avg_gain = np.convolve(gain, np.ones(period), 'valid') / period
+    avg_loss = np.convolve(loss, np.ones(period), 'valid') / period
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def legacy_bollinger_bands(close, period=20, std_dev=2):
+    ma = legacy_ma(close, period)
+    std = np.std(close[-period:])
+    return ma + (std_dev * std), ma, ma - (std_dev * std)
+
+
+def legacy_macd(close, fast=12, slow=26, signal=9):
+    macd_line = legacy_ema(close, fast) - legacy_ema(close, slow)
+    return macd_line, legacy_ema(macd_line, signal)
+
+
+def legacy_atr(high, low, close, period=14):
+    import pandas as pd
+    high, low, close = pd.Series(high), pd.Series(low), pd.Series(close)
+    ranges = pd.concat([high - low, abs(high - close.shift()), abs(low - close.shift())], axis=1)
+    return ranges.max(axis=1).rolling(window=period).mean()
+
+
+def synthetic_bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0005, n))
+    spread = np.abs(rng.normal(0, 0.0005, n))
+    return close + spread, close - spread, close
+
+
+def bench(func, repeat):
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indikator lama vs vectorized")
+    parser.add_argument('--bars', default='100,1000,10000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for n in [int(x) for x in args.bars.split(',')]:
+        high, low, close = synthetic_bars(n)
+        cases = [
+            ('ema', lambda: legacy_ema(close, 20), lambda: indicators.ema(close, 20)),
+            ('rsi', lambda: legacy_rsi(close), lambda: indicators.rsi(close)),
+            ('bollinger', lambda: legacy_bollinger_bands(close), lambda: indicators.bollinger_bands(close)),
+            ('macd', lambda: legacy_macd(close), lambda: indicators.macd(close)),
+            ('atr', lambda: legacy_atr(high, low, close), lambda: indicators.atr(high, low, close)),
+        ]
+
+        print(f"\n=== {n} bars ===")
+        print(f"{'indikator':<12}{'lama (us)':>14}{'baru (us)':>14}{'speedup':>10}")
+        for name, legacy, vectorized in cases:
+            old = bench(legacy, args.repeat) * 1e6
+            new = bench(vectorized, args.repeat) * 1e6
+            print(f"{name:<12}{old:>14.1f}{new:>14.1f}{old / new:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Pantau config.json dan siapkan pengaturan baru tanpa restart bot.
+
+Thread background mengecek mtime & ukuran file setiap `interval` detik. Jika
+berubah, file dibaca dan divalidasi (settings.load_settings); hasil yang valid
+disimpan sebagai `pending` dan baru dipasang pemakainya di antara pass loop
+trading (take()). File yang tidak valid hanya dilaporkan lewat on_error,
+pengaturan yang sedang berjalan tetap dipakai.
+"""
+import os
+import threading
+
+import settings
+
+
+class ConfigWatcher:
+    """
+    Watcher satu file config. on_change(config) dipanggil setiap ada pengaturan valid
+    baru, on_error(pesan) jika file tidak bisa dipakai (keduanya dari thread watcher).
+    """
+
+    def __init__(self, path, overrides=None, interval=1.0, on_change=None, on_error=None):
+        self.path = path
+        self.overrides = overrides
+        self.interval = interval
+        self.on_change = on_change
+        self.on_error = on_error
+        self.pending = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.signature = self._signature()
+        self.stats = {
+            'reloads': 0,
+            'errors': 0
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='config-watcher', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def take(self):
+        """
+        Pengaturan valid terbaru yang belum dipasang (None jika tidak ada)
+        """
+        with self.lock:
+            config, self.pending = self.pending, None
+            return config
+
+    def check(self):
+        """
+        Baca ulang file jika berubah sejak pengecekan terakhir. Return True jika ada pengaturan baru.
+        """
+        signature = self._signature()
+        if signature == self.signature:
+            return False
+        self.signature = signature
+        if signature is None:
+            self.stats['errors'] += 1
+            if self.on_error is not None:
+                self.on_error(f"❌ {self.path} tidak ditemukan, pengaturan sekarang tetap dipakai")
+            return False
+        try:
+            config = settings.load_settings(self.path, self.overrides)
+        except Exception as e:
+            # Apapun yang salah di file dilaporkan; file dibaca lagi saat berubah
+            self.stats['errors'] += 1
+            if self.on_error is not None:
+                self.on_error(f"❌ {self.path} tidak dipakai: {e}")
+            return False
+
+        with self.lock:
+            self.pending = config
+        self.stats['reloads'] += 1
+        if self.on_change is not None:
+            self.on_change(config)
+        return True
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"❌ Error memantau {self.path}: {e}")
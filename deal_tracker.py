@@ -0,0 +1,176 @@
+"""
+Ambil deal baru dari history_deals_get secara inkremental dan hitung
+statistik performa berjalan.
+
+Cursor menyimpan waktu deal terakhir dan tiket deal di detik itu, jadi setiap
+poll hanya meminta deal mulai dari detik terakhir dan membuang yang sudah
+diproses. Statistik (win rate, profit factor, equity curve, max drawdown,
+P/L realized harian) diperbarui O(1) per deal, tanpa membaca ulang history.
+
+Waktu deal MT5 adalah waktu server, jadi "hari" mengikuti pergantian hari
+di server broker.
+"""
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+DEAL_TYPE_BUY = 0
+DEAL_TYPE_SELL = 1
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+DEAL_ENTRY_INOUT = 2
+DEAL_ENTRY_OUT_BY = 3
+
+EXIT_ENTRIES = (DEAL_ENTRY_OUT, DEAL_ENTRY_INOUT, DEAL_ENTRY_OUT_BY)
+
+
+def net_profit(deal):
+    """
+    P/L bersih satu deal (profit + komisi + swap + fee)
+    """
+    return deal.profit + deal.commission + deal.swap + getattr(deal, 'fee', 0.0)
+
+
+class DealTracker:
+    """
+    Statistik deal akun yang diperbarui inkremental.
+
+    terminal: modul MT5 (atau fake_mt5); clock: objek dengan now() waktu server.
+    history_days: jumlah hari history yang dimuat saat poll pertama.
+    """
+
+    def __init__(self, terminal, clock, history_days=90, curve_length=10000, max_closed=10000):
+        self.terminal = terminal
+        self.clock = clock
+        self.history_days = history_days
+        self.cursor_time = None
+        self.cursor_tickets = set()
+        self.max_closed = max_closed
+        self.lock = threading.Lock()
+        # position_id -> ringkasan exit deal, diambil (pop) oleh pemakai seperti jurnal
+        self.closed = OrderedDict()
+        self.stats = {
+            'deals': 0,
+            'trades': 0,
+            'wins': 0,
+            'losses': 0,
+            'gross_profit': 0.0,
+            'gross_loss': 0.0,
+            'realized': 0.0,
+            'peak': 0.0,
+            'max_drawdown': 0.0,
+            'polls': 0
+        }
+        # Equity curve realized: (waktu deal, P/L kumulatif)
+        self.curve = deque(maxlen=curve_length)
+        self.daily = OrderedDict()
+
+    @property
+    def win_rate(self):
+        trades = self.stats['trades']
+        return self.stats['wins'] / trades * 100 if trades else 0.0
+
+    @property
+    def profit_factor(self):
+        if not self.stats['gross_loss']:
+            return None
+        return self.stats['gross_profit'] / abs(self.stats['gross_loss'])
+
+    def today(self):
+        """
+        Index hari server sekarang (epoch hari)
+        """
+        return int(self.clock.now()) // 86400
+
+    def daily_pnl(self, day=None):
+        """
+        P/L realized satu hari server (default hari ini)
+        """
+        return self.daily.get(self.today() if day is None else day, 0.0)
+
+    def daily_loss_breached(self, balance, max_daily_loss):
+        """
+        True jika rugi realized hari ini >= max_daily_loss % dari balance awal hari
+        """
+        pnl = self.daily_pnl()
+        start_balance = balance - pnl
+        return pnl < 0 and start_balance > 0 and -pnl >= start_balance * max_daily_loss / 100
+
+    def poll(self):
+        """
+        Ambil dan proses deal baru. Return list deal baru (urut waktu).
+        """
+        with self.lock:
+            return self._poll()
+
+    def _poll(self):
+        now = int(self.clock.now())
+        if self.cursor_time is None:
+            self.cursor_time = now - self.history_days * 86400
+
+        date_from = datetime.fromtimestamp(self.cursor_time, tz=timezone.utc)
+        # Batas atas dilebihkan sehari supaya deal yang baru masuk tidak terlewat
+        date_to = datetime.fromtimestamp(now + 86400, tz=timezone.utc)
+        deals = self.terminal.history_deals_get(date_from, date_to)
+        self.stats['polls'] += 1
+        if not deals:
+            return []
+
+        fresh = [deal for deal in deals
+                 if deal.time > self.cursor_time or (deal.time == self.cursor_time
+                                                     and deal.ticket not in self.cursor_tickets)]
+        fresh.sort(key=lambda deal: (deal.time_msc, deal.ticket))
+        for deal in fresh:
+            self._apply(deal)
+
+        if fresh:
+            last_time = fresh[-1].time
+            if last_time != self.cursor_time:
+                self.cursor_time = last_time
+                self.cursor_tickets = set()
+            self.cursor_tickets.update(deal.ticket for deal in fresh if deal.time == last_time)
+        return fresh
+
+    def pop_closed(self, position_id):
+        """
+        Ringkasan exit deal posisi (price, time, profit, comment), None jika belum ada
+        """
+        with self.lock:
+            return self.closed.pop(position_id, None)
+
+    def _apply(self, deal):
+        self.stats['deals'] += 1
+        # Deposit, withdrawal, kredit dll bukan hasil trading
+        if deal.type not in (DEAL_TYPE_BUY, DEAL_TYPE_SELL):
+            return
+
+        net = net_profit(deal)
+        stats = self.stats
+        stats['realized'] += net
+        day = deal.time // 86400
+        self.daily[day] = self.daily.get(day, 0.0) + net
+        while len(self.daily) > 400:
+            self.daily.popitem(last=False)
+
+        if deal.entry in EXIT_ENTRIES:
+            stats['trades'] += 1
+            if net > 0:
+                stats['wins'] += 1
+                stats['gross_profit'] += net
+            elif net < 0:
+                stats['losses'] += 1
+                stats['gross_loss'] += net
+
+            closed = self.closed.pop(deal.position_id, None)
+            self.closed[deal.position_id] = {
+                'price': deal.price,
+                'time': deal.time,
+                'profit': net + (closed['profit'] if closed else 0.0),
+                'comment': deal.comment
+            }
+            while len(self.closed) > self.max_closed:
+                self.closed.popitem(last=False)
+
+        stats['peak'] = max(stats['peak'], stats['realized'])
+        stats['max_drawdown'] = max(stats['max_drawdown'], stats['peak'] - stats['realized'])
+        self.curve.append((deal.time, stats['realized']))
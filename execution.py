@@ -0,0 +1,180 @@
+"""
+Pipeline eksekusi order ke terminal MT5.
+
+Setiap percobaan order market:
+1. ambil tick terbaru (bukan snapshot pass) dan pakai harganya sebagai harga request,
+   SL/TP digeser sejauh perubahan harga supaya jarak risk tetap;
+2. pakai filling mode yang didukung symbol (dari symbol_info.filling_mode, di-cache);
+3. kirim dan catat round-trip time, harga request vs harga fill (slippage) dan retcode.
+
+Requote / price changed / price off diulang selama masih dalam budget latency,
+filling mode yang ditolak broker diganti mode lain yang didukung.
+"""
+import time
+from collections import deque
+
+SYMBOL_FILLING_FOK = 1
+SYMBOL_FILLING_IOC = 2
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_PRICE_CHANGED = 10020
+TRADE_RETCODE_PRICE_OFF = 10021
+TRADE_RETCODE_INVALID_FILL = 10030
+
+RETRY_RETCODES = (TRADE_RETCODE_REQUOTE, TRADE_RETCODE_PRICE_CHANGED, TRADE_RETCODE_PRICE_OFF)
+
+
+class OrderExecutor:
+    """
+    Kirim order dengan tick segar, filling mode yang cocok dan retry requote.
+
+    terminal: modul MT5 (atau fake_mt5). budget: batas waktu total retry (detik).
+    on_attempt(attempt): dipanggil untuk setiap percobaan (dict, lihat send()).
+    """
+
+    def __init__(self, terminal, budget=0.5, max_attempts=5, on_attempt=None, history=1000):
+        self.terminal = terminal
+        self.budget = budget
+        self.max_attempts = max_attempts
+        self.on_attempt = on_attempt
+        # symbol -> (list filling mode yang didukung, urut preferensi; point)
+        self.symbols = {}
+        self.attempts = deque(maxlen=history)
+        self.stats = {
+            'orders': 0,
+            'attempts': 0,
+            'retries': 0,
+            'filled': 0,
+            'failed': 0,
+            'rtt_ms': 0.0,
+            'slippage': 0.0
+        }
+
+    def symbol_modes(self, symbol):
+        """
+        (filling mode yang didukung urut preferensi, point) dari symbol_info, di-cache per symbol
+        """
+        cached = self.symbols.get(symbol)
+        if cached is None:
+            info = self.terminal.symbol_info(symbol)
+            if info is None:
+                return [self.terminal.ORDER_FILLING_IOC], None
+            flags = info.filling_mode
+            modes = []
+            if flags & SYMBOL_FILLING_IOC:
+                modes.append(self.terminal.ORDER_FILLING_IOC)
+            if flags & SYMBOL_FILLING_FOK:
+                modes.append(self.terminal.ORDER_FILLING_FOK)
+            # Tanpa flag: eksekusi request/exchange, hanya RETURN
+            modes.append(self.terminal.ORDER_FILLING_RETURN)
+            cached = self.symbols[symbol] = (modes, info.point)
+        return cached
+
+    def invalidate(self, symbol=None):
+        if symbol is None:
+            self.symbols.clear()
+        else:
+            self.symbols.pop(symbol, None)
+
+    def send(self, request):
+        """
+        Kirim request, return hasil order_send terakhir (None jika terminal tidak merespon).
+
+        Untuk TRADE_ACTION_DEAL harga, SL/TP & type_filling di dict request diisi ulang
+        setiap percobaan (in place, jadi pemanggil melihat nilai terakhir yang dikirim);
+        request lain (SLTP dll) dikirim sekali dan tetap dicatat.
+        """
+        terminal = self.terminal
+        symbol = request['symbol']
+        market = request.get('action') == terminal.TRADE_ACTION_DEAL
+        modes, point = self.symbol_modes(symbol) if market else ([None], None)
+        mode_index = 0
+        deadline = time.perf_counter() + self.budget
+        self.stats['orders'] += 1
+
+        result = None
+        for attempt in range(1, self.max_attempts + 1):
+            if market:
+                request['type_filling'] = modes[mode_index]
+                tick = terminal.symbol_info_tick(symbol)
+                if tick is not None:
+                    price = tick.ask if request['type'] == terminal.ORDER_TYPE_BUY else tick.bid
+                    shift = price - request.get('price', price)
+                    # SL/TP order baru ikut digeser supaya jarak dari harga entry tetap
+                    if shift and not request.get('position'):
+                        for key in ('sl', 'tp'):
+                            if request.get(key):
+                                request[key] += shift
+                    request['price'] = price
+
+            started = time.perf_counter()
+            result = terminal.order_send(request)
+            self._record(request, result, attempt, (time.perf_counter() - started) * 1000, point)
+
+            if result is None or not market:
+                break
+            if result.retcode == TRADE_RETCODE_INVALID_FILL and mode_index + 1 < len(modes):
+                # Cache salah (broker mengubah setting symbol): coba mode berikutnya
+                mode_index += 1
+                self.invalidate(symbol)
+            elif result.retcode not in RETRY_RETCODES or time.perf_counter() >= deadline:
+                break
+            self.stats['retries'] += 1
+
+        if market and result is not None and result.retcode == TRADE_RETCODE_DONE and mode_index:
+            # Simpan mode yang berhasil di depan untuk order berikutnya
+            working = modes[mode_index]
+            self.symbols[symbol] = ([working] + [mode for mode in modes if mode != working], point)
+
+        done = result is not None and result.retcode == TRADE_RETCODE_DONE
+        self.stats['filled' if done else 'failed'] += 1
+        return result
+
+    def _record(self, request, result, attempt, rtt_ms, point):
+        requested = request.get('price')
+        done = result is not None and result.retcode == TRADE_RETCODE_DONE
+        filled = result.price or None if done and requested else None
+        slippage = None
+        if requested and filled and point:
+            # Positif = lebih buruk dari harga yang diminta
+            direction = 1 if request.get('type') == self.terminal.ORDER_TYPE_BUY else -1
+            slippage = round((filled - requested) * direction / point, 1) + 0.0
+            self.stats['slippage'] += slippage
+
+        record = {
+            'time': time.time(),
+            'symbol': request['symbol'],
+            'position': request.get('position') or (result.order if result is not None else 0),
+            'type': request.get('type'),
+            'attempt': attempt,
+            'requested': requested,
+            'filled': filled,
+            'slippage': slippage,
+            'rtt_ms': rtt_ms,
+            'retcode': result.retcode if result is not None else None,
+            'filling': request.get('type_filling')
+        }
+        self.attempts.append(record)
+        self.stats['attempts'] += 1
+        self.stats['rtt_ms'] += rtt_ms
+        if self.on_attempt is not None:
+            self.on_attempt(record)
+
+    def summary(self):
+        """
+        Ringkasan percobaan terakhir: jumlah, rata-rata & p95 RTT, rata-rata slippage, rasio requote
+        """
+        attempts = list(self.attempts)
+        if not attempts:
+            return None
+        rtts = sorted(record['rtt_ms'] for record in attempts)
+        slippages = [record['slippage'] for record in attempts if record['slippage'] is not None]
+        return {
+            'attempts': len(attempts),
+            'rtt_mean': sum(rtts) / len(rtts),
+            'rtt_p95': rtts[min(len(rtts) - 1, int(len(rtts) * 0.95))],
+            'rtt_max': rtts[-1],
+            'slippage_mean': sum(slippages) / len(slippages) if slippages else 0.0,
+            'requotes': sum(1 for record in attempts if record['retcode'] in RETRY_RETCODES)
+        }
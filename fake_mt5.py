@@ -0,0 +1,843 @@
+"""
+Pengganti modul MetaTrader5 untuk menjalankan bot di Linux tanpa terminal MT5.
+
+Dipakai app.py jika environment ROBOT_FAKE_MT5=1. API yang tersedia mengikuti
+modul MetaTrader5 (initialize, copy_rates_*, copy_ticks_*, symbol_info(_tick),
+positions_get, order_send, account_info, history_deals_get, ...) dan
+mengembalikan tipe yang sama: namedtuple dan structured array numpy.
+
+Harga berasal dari:
+- data rekaman (ROBOT_FAKE_MT5_DATA=<folder>, format sama dengan backtest.py),
+  diputar ulang mengikuti jam dinding, atau
+- data sintetis deterministik (ROBOT_FAKE_MT5_SEED), harga sebagai fungsi
+  waktu sehingga semua timeframe konsisten satu sama lain.
+
+Order dieksekusi oleh SimulatedBroker milik backtest.py. Latency setiap
+panggilan API diatur dengan ROBOT_FAKE_MT5_LATENCY (ms) dan
+ROBOT_FAKE_MT5_JITTER (ms). Order market ditolak dengan requote jika harga
+bergerak lebih dari `deviation`, atau acak dengan peluang
+ROBOT_FAKE_MT5_REQUOTE (0-1); filling mode yang tidak didukung symbol
+ditolak seperti broker asli (crypto hanya FOK).
+"""
+import os
+import threading
+import time
+import zlib
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy as np
+
+import backtest
+import settings
+from bar_cache import RATES_DTYPE
+from scheduler import timeframe_name, timeframe_seconds
+
+__version__ = '5.0.0-fake'
+
+# Timeframe
+TIMEFRAME_M1 = 1
+TIMEFRAME_M2 = 2
+TIMEFRAME_M3 = 3
+TIMEFRAME_M4 = 4
+TIMEFRAME_M5 = 5
+TIMEFRAME_M6 = 6
+TIMEFRAME_M10 = 10
+TIMEFRAME_M12 = 12
+TIMEFRAME_M15 = 15
+TIMEFRAME_M20 = 20
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 0x4000 | 1
+TIMEFRAME_H2 = 0x4000 | 2
+TIMEFRAME_H3 = 0x4000 | 3
+TIMEFRAME_H4 = 0x4000 | 4
+TIMEFRAME_H6 = 0x4000 | 6
+TIMEFRAME_H8 = 0x4000 | 8
+TIMEFRAME_H12 = 0x4000 | 12
+TIMEFRAME_D1 = 0x4000 | 24
+TIMEFRAME_W1 = 0x8000 | 1
+TIMEFRAME_MN1 = 0xC000 | 1
+
+# Tick
+COPY_TICKS_ALL = -1
+COPY_TICKS_INFO = 1
+COPY_TICKS_TRADE = 2
+TICK_FLAG_BID = 2
+TICK_FLAG_ASK = 4
+TICK_FLAG_LAST = 8
+TICK_FLAG_VOLUME = 16
+
+# Layout tick dari copy_ticks_* MT5
+TICK_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('last', '<f8'),
+    ('volume', '<u8'),
+    ('time_msc', '<i8'),
+    ('flags', '<u4'),
+    ('volume_real', '<f8')
+])
+
+# Order
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+SYMBOL_FILLING_FOK = 1
+SYMBOL_FILLING_IOC = 2
+ORDER_TIME_GTC = 0
+ORDER_TIME_DAY = 1
+
+TRADE_ACTION_DEAL = 1
+TRADE_ACTION_PENDING = 5
+TRADE_ACTION_SLTP = 6
+TRADE_ACTION_MODIFY = 7
+TRADE_ACTION_REMOVE = 8
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_ERROR = 10011
+TRADE_RETCODE_TIMEOUT = 10012
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_INVALID_PRICE = 10015
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_NO_MONEY = 10019
+TRADE_RETCODE_PRICE_CHANGED = 10020
+TRADE_RETCODE_PRICE_OFF = 10021
+TRADE_RETCODE_INVALID_FILL = 10030
+TRADE_RETCODE_POSITION_CLOSED = 10036
+
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+
+DEAL_TYPE_BUY = 0
+DEAL_TYPE_SELL = 1
+DEAL_TYPE_BALANCE = 2
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+DEAL_ENTRY_INOUT = 2
+DEAL_ENTRY_OUT_BY = 3
+
+RES_S_OK = 1
+RES_E_INVALID_PARAMS = -2
+RES_E_NOT_FOUND = -4
+RES_E_INTERNAL_FAIL_INIT = -10005
+RES_E_NO_IPC = -10004
+
+TerminalInfo = namedtuple('TerminalInfo', [
+    'connected', 'trade_allowed', 'ping_last', 'build', 'company', 'name', 'path'
+])
+AccountInfo = namedtuple('AccountInfo', [
+    'login', 'balance', 'equity', 'profit', 'margin', 'margin_free', 'margin_level',
+    'leverage', 'currency', 'server', 'company', 'name', 'trade_allowed'
+])
+SymbolInfo = namedtuple('SymbolInfo', [
+    'name', 'visible', 'select', 'digits', 'point', 'spread', 'bid', 'ask', 'time',
+    'trade_tick_value', 'trade_tick_size', 'trade_contract_size', 'volume_min',
+    'volume_max', 'volume_step', 'filling_mode'
+])
+Tick = namedtuple('Tick', ['time', 'bid', 'ask', 'last', 'volume', 'time_msc', 'flags', 'volume_real'])
+TradeDeal = namedtuple('TradeDeal', [
+    'ticket', 'order', 'time', 'time_msc', 'type', 'entry', 'magic', 'position_id',
+    'volume', 'price', 'commission', 'swap', 'profit', 'fee', 'symbol', 'comment'
+])
+OrderSendResult = namedtuple('OrderSendResult', [
+    'retcode', 'deal', 'order', 'volume', 'price', 'bid', 'ask', 'comment', 'request_id', 'request'
+])
+
+# Harga awal data sintetis
+BASE_PRICES = {
+    'EURUSD': 1.08, 'GBPUSD': 1.27, 'USDJPY': 150.0, 'AUDUSD': 0.66, 'USDCAD': 1.36,
+    'GOLD': 2000.0, 'GOLD.a': 2000.0, 'GLD': 185.0, 'XAUUSD': 2000.0,
+    'BTCUSD': 60000.0, 'ETHUSD': 3000.0, 'LTCUSD': 80.0, 'XRPUSD': 0.5
+}
+
+# Volatilitas harian, spread (fraksi harga) & rata-rata tick per detik data sintetis per instrument
+SYNTHETIC_PARAMS = {
+    'forex': {'daily_vol': 0.006, 'spread': 0.00008, 'tick_rate': 2.0},
+    'metals': {'daily_vol': 0.01, 'spread': 0.00015, 'tick_rate': 4.0},
+    'crypto': {'daily_vol': 0.03, 'spread': 0.0005, 'tick_rate': 4.0}
+}
+
+
+def _epoch(value):
+    """
+    Epoch detik dari datetime (naive dianggap UTC, sama seperti MT5) atau angka
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+
+def _instrument_type(symbol):
+    for type_, symbols in settings.TRADING_PAIRS.items():
+        if symbol in symbols:
+            return type_
+    return 'metals' if 'XAU' in symbol or 'GOLD' in symbol else 'forex'
+
+
+def _make_ticks(times_msc, bid, ask):
+    """
+    Structured array tick MT5; flags menandai bid/ask yang berubah dari tick sebelumnya
+    """
+    ticks = np.zeros(len(times_msc), dtype=TICK_DTYPE)
+    ticks['time'] = times_msc // 1000
+    ticks['time_msc'] = times_msc
+    ticks['bid'] = bid
+    ticks['ask'] = ask
+    if len(ticks):
+        changed_bid = np.concatenate(([True], bid[1:] != bid[:-1]))
+        changed_ask = np.concatenate(([True], ask[1:] != ask[:-1]))
+        ticks['flags'] = changed_bid * TICK_FLAG_BID + changed_ask * TICK_FLAG_ASK
+    return ticks
+
+
+class SyntheticFeed:
+    """
+    Harga sintetis deterministik: log harga = jumlah sinusoid berbagai periode
+    (amplitudo ~ sqrt(periode), mirip random walk) + noise per menit.
+    Karena harga fungsi waktu, bar setiap timeframe dihitung langsung tanpa state.
+    """
+
+    PERIODS = np.array([1800, 3600 * 3, 3600 * 8, 86400, 86400 * 3, 86400 * 10, 86400 * 30, 86400 * 90])
+
+    def __init__(self, seed=0, symbols=None):
+        self.seed = seed
+        self.symbols = list(symbols or BASE_PRICES)
+        self.params = {}
+
+    def has_symbol(self, symbol):
+        return symbol in self.symbols
+
+    def _symbol_params(self, symbol):
+        params = self.params.get(symbol)
+        if params is None:
+            rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+            type_ = _instrument_type(symbol)
+            daily_vol = SYNTHETIC_PARAMS[type_]['daily_vol']
+            amplitude = daily_vol * np.sqrt(self.PERIODS / 86400) * rng.uniform(0.5, 1.0, len(self.PERIODS))
+            params = {
+                'base': BASE_PRICES.get(symbol, 100.0),
+                'amplitude': amplitude,
+                'phase': rng.uniform(0, 2 * np.pi, len(self.PERIODS)),
+                'noise': daily_vol / np.sqrt(1440),
+                'key': np.uint64(zlib.crc32(symbol.encode()) ^ (self.seed << 32)),
+                'spread': SYNTHETIC_PARAMS[type_]['spread'],
+                'tick_rate': SYNTHETIC_PARAMS[type_]['tick_rate']
+            }
+            self.params[symbol] = params
+        return params
+
+    @staticmethod
+    def _hash(minutes, key):
+        """
+        Angka acak deterministik [0, 1) per menit (splitmix64)
+        """
+        with np.errstate(over='ignore'):
+            x = minutes.astype(np.uint64) + key
+            x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            x = x ^ (x >> np.uint64(31))
+        return (x >> np.uint64(11)).astype(float) / float(1 << 53)
+
+    def price(self, symbol, times):
+        """
+        Harga bid pada waktu-waktu tertentu (epoch detik server)
+        """
+        p = self._symbol_params(symbol)
+        times = np.asarray(times, dtype=np.int64)
+        angles = 2 * np.pi * times[..., None] / self.PERIODS + p['phase']
+        log_price = (np.sin(angles) * p['amplitude']).sum(axis=-1)
+        noise = self._hash(times // 60, p['key']) - 0.5
+        return p['base'] * np.exp(log_price + noise * p['noise'] * 2)
+
+    def spread_points(self, symbol, price, point):
+        return np.maximum(1, np.rint(price * self._symbol_params(symbol)['spread'] / point)).astype(int)
+
+    def bars(self, symbol, timeframe, first, last, now, point):
+        """
+        Bar dengan waktu buka first..last (sudah sejajar timeframe), dipotong di now.
+        Semua timeframe disampling per menit, jadi bar timeframe besar sama persis
+        dengan agregasi bar timeframe kecil.
+        """
+        seconds = timeframe_seconds(timeframe)
+        last = min(last, now // seconds * seconds)
+        if last < first:
+            return np.zeros(0, dtype=RATES_DTYPE)
+
+        starts = np.arange(first, last + 1, seconds, dtype=np.int64)
+        samples = seconds // 60
+        key = self._symbol_params(symbol)['key'] + np.uint64(1)
+        rates = np.zeros(len(starts), dtype=RATES_DTYPE)
+        rates['time'] = starts
+
+        # Diproses per blok supaya memori tetap kecil untuk history D1 yang panjang
+        block = max(1, 200_000 // samples)
+        for i in range(0, len(starts), block):
+            minutes = starts[i:i + block, None] + np.arange(samples, dtype=np.int64) * 60
+            started = minutes <= now
+            prices = self.price(symbol, np.minimum(minutes, now))
+            rates['open'][i:i + block] = prices[:, 0]
+            rates['high'][i:i + block] = prices.max(axis=1)
+            rates['low'][i:i + block] = prices.min(axis=1)
+            rates['close'][i:i + block] = prices[:, -1]
+            # Volume per menit 5-24 tick, dijumlah untuk menit yang sudah berjalan
+            volume = 5 + (self._hash(minutes // 60, key) * 20).astype(np.uint64)
+            rates['tick_volume'][i:i + block] = (volume * started).sum(axis=1)
+
+        rates['spread'] = self.spread_points(symbol, rates['close'], point)
+        return rates
+
+    def bars_before(self, symbol, timeframe, end, count, now, point):
+        seconds = timeframe_seconds(timeframe)
+        last = min(end, now) // seconds * seconds
+        return self.bars(symbol, timeframe, last - (count - 1) * seconds, last, now, point)
+
+    def bars_range(self, symbol, timeframe, start, end, now, point):
+        seconds = timeframe_seconds(timeframe)
+        first = -(-start // seconds) * seconds
+        return self.bars(symbol, timeframe, first, min(end, now) // seconds * seconds, now, point)
+
+    def tick(self, symbol, now, point):
+        bid = float(self.price(symbol, [now])[0])
+        return bid, int(self.spread_points(symbol, bid, point))
+
+    def ticks(self, symbol, start_msc, end_msc, point, digits):
+        """
+        Tick antara start_msc dan end_msc (epoch milidetik server). Tick muncul
+        acak di grid 100 ms dengan sedikit noise di atas harga per detik.
+        """
+        p = self._symbol_params(symbol)
+        grid = np.arange(-(-start_msc // 100) * 100, end_msc + 1, 100, dtype=np.int64)
+        times = grid[self._hash(grid, p['key'] + np.uint64(2)) < p['tick_rate'] / 10]
+        jitter = (self._hash(times, p['key'] + np.uint64(3)) - 0.5) * p['noise'] * 0.5
+        bid = np.round(self.price(symbol, times // 1000) * (1 + jitter), digits)
+        ask = np.round(bid + self.spread_points(symbol, bid, point) * point, digits)
+        return _make_ticks(times, bid, ask)
+
+    def path(self, symbol, start, end, point):
+        """
+        Harga terendah, tertinggi & terakhir antara start dan end (resolusi 1 menit)
+        """
+        times = np.arange(start, end, 60, dtype=np.int64)
+        times = np.append(times, end)
+        prices = self.price(symbol, times)
+        return float(prices[0]), float(prices.max()), float(prices.min()), float(prices[-1])
+
+
+class RecordedFeed:
+    """
+    Data bar rekaman yang diputar ulang mengikuti jam dinding.
+
+    Semua waktu digeser kelipatan satu minggu sehingga titik awal replay
+    (setelah `history` bar pertama) jatuh di waktu sekarang, dengan hari dan
+    jam yang tetap sama seperti rekamannya.
+    """
+
+    WEEK = 7 * 86400
+
+    def __init__(self, data_dir, now, history=1000):
+        self.data = {}
+        for key, path in backtest.scan_bars(data_dir).items():
+            self.data[key] = np.asarray(backtest.load_bars(path))
+
+        if not self.data:
+            raise ValueError(f"Tidak ada data bar di {data_dir}")
+
+        # Timeframe terkecil per symbol dipakai untuk tick & SL/TP
+        self.finest = {}
+        for symbol, timeframe in self.data:
+            current = self.finest.get(symbol)
+            if current is None or timeframe_seconds(timeframe) < timeframe_seconds(current):
+                self.finest[symbol] = timeframe
+
+        start = max(bars['time'][min(history, len(bars)) - 1] for bars in self.data.values())
+        self.shift = int((now - start) // self.WEEK * self.WEEK)
+        self.times = {key: bars['time'] + self.shift for key, bars in self.data.items()}
+
+    def has_symbol(self, symbol):
+        return symbol in self.finest
+
+    def _shifted(self, key, start, stop):
+        rates = self.data[key][start:stop].copy()
+        rates['time'] += self.shift
+        return rates
+
+    def bars_before(self, symbol, timeframe, end, count, now, point):
+        key = (symbol, timeframe)
+        if key not in self.data:
+            return None
+        stop = int(np.searchsorted(self.times[key], min(end, now), side='right'))
+        return self._shifted(key, max(0, stop - count), stop)
+
+    def bars_range(self, symbol, timeframe, start, end, now, point):
+        key = (symbol, timeframe)
+        if key not in self.data:
+            return None
+        times = self.times[key]
+        return self._shifted(key, int(np.searchsorted(times, start, side='left')),
+                             int(np.searchsorted(times, min(end, now), side='right')))
+
+    def _finest_bar(self, symbol, now):
+        key = (symbol, self.finest[symbol])
+        index = int(np.searchsorted(self.times[key], now, side='right')) - 1
+        return self.data[key][max(index, 0)]
+
+    def tick(self, symbol, now, point):
+        bar = self._finest_bar(symbol, now)
+        return float(bar['close']), int(bar['spread'])
+
+    def ticks(self, symbol, start_msc, end_msc, point, digits):
+        """
+        Satu tick per bar timeframe terkecil (harga close), rekaman tidak berisi tick
+        """
+        key = (symbol, self.finest[symbol])
+        times = self.times[key]
+        bars = self.data[key][int(np.searchsorted(times, -(-start_msc // 1000), side='left')):
+                              int(np.searchsorted(times, end_msc // 1000, side='right'))]
+        bid = bars['close']
+        return _make_ticks((bars['time'] + self.shift) * 1000, bid, np.round(bid + bars['spread'] * point, digits))
+
+    def path(self, symbol, start, end, point):
+        key = (symbol, self.finest[symbol])
+        times = self.times[key]
+        first = max(int(np.searchsorted(times, start, side='right')) - 1, 0)
+        stop = max(int(np.searchsorted(times, end, side='right')), first + 1)
+        bars = self.data[key][first:stop]
+        return (float(bars['open'][0]), float(bars['high'].max()), float(bars['low'].min()),
+                float(bars['close'][-1]))
+
+
+class FakeTerminal:
+    """
+    Terminal MT5 palsu: feed harga + SimulatedBroker + latency buatan
+    """
+
+    def __init__(self, data_dir=None, seed=0, balance=10000.0, latency_ms=0.0, jitter_ms=0.0,
+                 server_offset=0, history=1000, requote_rate=0.0):
+        self.server_offset = server_offset
+        if data_dir:
+            self.feed = RecordedFeed(data_dir, self.now(), history)
+        else:
+            self.feed = SyntheticFeed(seed)
+        self.broker = backtest.SimulatedBroker(balance)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.requote_rate = requote_rate
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.RLock()
+        self.connected = False
+        self.login = 0
+        self.server = 'FakeBroker-Demo'
+        self.error = (RES_S_OK, 'Success')
+        self.last_sync = {}
+        self.deals = []
+        self.deals_seen = 0
+        self.next_deal = 1
+        self.stats = {'calls': 0}
+
+    def now(self):
+        return int(time.time()) + self.server_offset
+
+    def delay(self):
+        """
+        Latency buatan satu panggilan API
+        """
+        self.stats['calls'] += 1
+        latency = self.latency
+        if self.jitter:
+            latency += self.rng.uniform(0, self.jitter)
+        if latency > 0:
+            time.sleep(latency)
+
+    def spec(self, symbol):
+        return backtest.symbol_spec(symbol, _instrument_type(symbol))
+
+    def filling_flags(self, symbol):
+        """
+        SYMBOL_FILLING_* yang didukung symbol (banyak broker crypto hanya FOK)
+        """
+        if _instrument_type(symbol) == 'crypto':
+            return SYMBOL_FILLING_FOK
+        return SYMBOL_FILLING_FOK | SYMBOL_FILLING_IOC
+
+    def feed_tick_rate(self, symbol):
+        """
+        Perkiraan tick per detik feed, untuk ukuran window copy_ticks_from
+        """
+        if isinstance(self.feed, SyntheticFeed):
+            return self.feed._symbol_params(symbol)['tick_rate']
+        return 1 / timeframe_seconds(self.feed.finest[symbol])
+
+    def quote(self, symbol):
+        spec = self.spec(symbol)
+        bid, spread = self.feed.tick(symbol, self.now(), spec['point'])
+        bid = round(bid, spec['digits'])
+        return bid, round(bid + spread * spec['point'], spec['digits']), spread
+
+    def sync(self, symbol):
+        """
+        Jalankan SL/TP & mark-to-market posisi symbol sampai waktu sekarang
+        """
+        now = self.now()
+        start = self.last_sync.get(symbol, now)
+        self.last_sync[symbol] = now
+        if self.broker.by_symbol.get(symbol):
+            spec = self.spec(symbol)
+            open_, high, low, close = (round(price, spec['digits']) for price in
+                                       self.feed.path(symbol, start, now, spec['point']))
+            _, _, spread = self.quote(symbol)
+            self.broker.process_bar(symbol, now, open_, high, low, close, spread)
+        self.collect_deals()
+
+    def sync_all(self):
+        for symbol in [s for s, positions in self.broker.by_symbol.items() if positions]:
+            self.sync(symbol)
+
+    def add_deal(self, position_id, type_, entry, volume, price, profit, symbol, magic, comment, time_):
+        self.deals.append(TradeDeal(
+            self.next_deal, self.next_deal, time_, time_ * 1000, type_, entry, magic, position_id,
+            volume, price, 0.0, 0.0, profit, 0.0, symbol, comment
+        ))
+        self.next_deal += 1
+
+    def collect_deals(self):
+        """
+        Catat deal keluar dari posisi yang ditutup broker (termasuk SL/TP)
+        """
+        for deal in self.broker.deals[self.deals_seen:]:
+            close_type = DEAL_TYPE_SELL if deal['type'] == ORDER_TYPE_BUY else DEAL_TYPE_BUY
+            comment = {'sl': '[sl]', 'tp': '[tp]'}.get(deal['reason'], 'close')
+            self.add_deal(deal['ticket'], close_type, DEAL_ENTRY_OUT, deal['volume'], deal['price_close'],
+                          deal['profit'], deal['symbol'], deal['magic'], comment, int(deal['time_close']))
+        self.deals_seen = len(self.broker.deals)
+
+    def order_send(self, request):
+        action = request.get('action')
+        symbol = request.get('symbol')
+        if not self.feed.has_symbol(symbol):
+            return self.result(TRADE_RETCODE_INVALID, request, comment='Unknown symbol')
+        self.sync(symbol)
+        spec = self.spec(symbol)
+        bid, ask, _ = self.quote(symbol)
+
+        if action == TRADE_ACTION_SLTP:
+            position = self.broker.positions.get(request.get('position'))
+            if position is None:
+                return self.result(TRADE_RETCODE_POSITION_CLOSED, request, bid=bid, ask=ask)
+            self.broker.modify_position(position.ticket, request.get('sl', 0.0), request.get('tp', 0.0))
+            return self.result(TRADE_RETCODE_DONE, request, bid=bid, ask=ask)
+
+        if action != TRADE_ACTION_DEAL:
+            return self.result(TRADE_RETCODE_INVALID, request, comment='Unsupported action')
+
+        volume = request.get('volume', 0.0)
+        if not 0.01 <= volume <= spec['volume_max']:
+            return self.result(TRADE_RETCODE_INVALID_VOLUME, request, bid=bid, ask=ask)
+
+        filling = {ORDER_FILLING_FOK: SYMBOL_FILLING_FOK, ORDER_FILLING_IOC: SYMBOL_FILLING_IOC}
+        if not filling.get(request.get('type_filling', ORDER_FILLING_FOK), 0) & self.filling_flags(symbol):
+            return self.result(TRADE_RETCODE_INVALID_FILL, request, bid=bid, ask=ask,
+                               comment='Unsupported filling mode')
+
+        # Harga request dibandingkan harga sekarang (+deviation) seperti eksekusi instant
+        market_price = ask if request.get('type') == ORDER_TYPE_BUY else bid
+        requested = request.get('price')
+        if (requested and abs(market_price - requested) > request.get('deviation', 0) * spec['point'] + 1e-9) \
+                or (self.requote_rate and self.rng.random() < self.requote_rate):
+            return self.result(TRADE_RETCODE_REQUOTE, request, bid=bid, ask=ask, comment='Requote')
+
+        now = self.now()
+        if request.get('position'):
+            # Close posisi (order berlawanan arah)
+            position = self.broker.positions.get(request['position'])
+            if position is None:
+                return self.result(TRADE_RETCODE_POSITION_CLOSED, request, bid=bid, ask=ask)
+            price = bid if position.type == ORDER_TYPE_BUY else ask
+            self.broker.close_position(position, price, now, 'close')
+            self.collect_deals()
+            deal = self.deals[-1].ticket
+            return self.result(TRADE_RETCODE_DONE, request, deal=deal, volume=volume, price=price,
+                               bid=bid, ask=ask)
+
+        order_type = request.get('type')
+        sl = request.get('sl', 0.0)
+        tp = request.get('tp', 0.0)
+        price = ask if order_type == ORDER_TYPE_BUY else bid
+        direction = 1 if order_type == ORDER_TYPE_BUY else -1
+        if (sl and (sl - price) * direction >= 0) or (tp and (tp - price) * direction <= 0):
+            return self.result(TRADE_RETCODE_INVALID_STOPS, request, bid=bid, ask=ask)
+
+        position = self.broker.open_position(
+            symbol, spec, order_type, volume, bid, ask, sl, tp, now,
+            magic=request.get('magic', 0), comment=request.get('comment', '')
+        )
+        self.add_deal(position.ticket, order_type, DEAL_ENTRY_IN, volume, position.price_open, 0.0,
+                      symbol, position.magic, position.comment, now)
+        return self.result(TRADE_RETCODE_DONE, request, deal=self.deals[-1].ticket, order=position.ticket,
+                           volume=volume, price=position.price_open, bid=bid, ask=ask)
+
+    def result(self, retcode, request, deal=0, order=0, volume=0.0, price=0.0, bid=0.0, ask=0.0,
+               comment=None):
+        if comment is None:
+            comment = 'Request executed' if retcode == TRADE_RETCODE_DONE else 'Request rejected'
+        return OrderSendResult(retcode, deal, order, volume, price, bid, ask, comment, 0, request)
+
+
+# Terminal aktif untuk API level modul
+_terminal = None
+_terminal_lock = threading.Lock()
+
+
+def configure(**kwargs):
+    """
+    Buat ulang terminal palsu dengan opsi tertentu (lihat FakeTerminal).
+    Tanpa configure, opsi diambil dari environment ROBOT_FAKE_MT5_*.
+    """
+    global _terminal
+    with _terminal_lock:
+        _terminal = FakeTerminal(**kwargs)
+    return _terminal
+
+
+def terminal():
+    """
+    Terminal palsu yang aktif (dibuat dari environment jika belum ada)
+    """
+    global _terminal
+    with _terminal_lock:
+        if _terminal is None:
+            _terminal = FakeTerminal(
+                data_dir=os.environ.get('ROBOT_FAKE_MT5_DATA'),
+                seed=int(os.environ.get('ROBOT_FAKE_MT5_SEED', 0)),
+                balance=float(os.environ.get('ROBOT_FAKE_MT5_BALANCE', 10000)),
+                latency_ms=float(os.environ.get('ROBOT_FAKE_MT5_LATENCY', 0)),
+                jitter_ms=float(os.environ.get('ROBOT_FAKE_MT5_JITTER', 0)),
+                server_offset=int(os.environ.get('ROBOT_FAKE_MT5_SERVER_OFFSET', 0)),
+                requote_rate=float(os.environ.get('ROBOT_FAKE_MT5_REQUOTE', 0))
+            )
+        return _terminal
+
+
+def _connected():
+    t = terminal()
+    t.delay()
+    if not t.connected:
+        t.error = (RES_E_NO_IPC, 'No IPC connection')
+        return None
+    t.error = (RES_S_OK, 'Success')
+    return t
+
+
+def initialize(path=None, login=None, password=None, server=None, timeout=None, portable=False):
+    t = terminal()
+    t.delay()
+    with t.lock:
+        t.connected = True
+        if login is not None:
+            t.login = login
+        if server:
+            t.server = server
+        t.error = (RES_S_OK, 'Success')
+    return True
+
+
+def login(login, password=None, server=None, timeout=None):
+    return initialize(login=login, password=password, server=server)
+
+
+def shutdown():
+    t = terminal()
+    with t.lock:
+        t.connected = False
+    return None
+
+
+def last_error():
+    return terminal().error
+
+
+def version():
+    return (500, 4000, '01 Jan 2024')
+
+
+def terminal_info():
+    t = _connected()
+    if t is None:
+        return None
+    return TerminalInfo(True, True, int(t.latency * 1e6), 4000, 'Fake Broker Ltd', 'MetaTrader 5 (fake)', '')
+
+
+def account_info():
+    t = _connected()
+    if t is None:
+        return None
+    with t.lock:
+        t.sync_all()
+        broker = t.broker
+        return AccountInfo(
+            t.login, broker.balance, broker.equity, broker.floating, broker.margin, broker.margin_free,
+            broker.equity / broker.margin * 100 if broker.margin else 0.0,
+            broker.leverage, 'USD', t.server, 'Fake Broker Ltd', 'Fake Account', True
+        )
+
+
+def symbols_get(group=None):
+    t = _connected()
+    if t is None:
+        return None
+    names = t.feed.finest if isinstance(t.feed, RecordedFeed) else t.feed.symbols
+    return tuple(symbol_info(name) for name in names)
+
+
+def symbol_select(symbol, enable=True):
+    t = _connected()
+    return t is not None and t.feed.has_symbol(symbol)
+
+
+def symbol_info(symbol):
+    t = _connected()
+    if t is None or not t.feed.has_symbol(symbol):
+        return None
+    with t.lock:
+        spec = t.spec(symbol)
+        bid, ask, spread = t.quote(symbol)
+        return SymbolInfo(
+            symbol, True, True, spec['digits'], spec['point'], spread, bid, ask, t.now(),
+            spec['trade_tick_value'], spec['point'], 100000.0, 0.01, spec['volume_max'], 0.01,
+            t.filling_flags(symbol)
+        )
+
+
+def symbol_info_tick(symbol):
+    t = _connected()
+    if t is None or not t.feed.has_symbol(symbol):
+        return None
+    with t.lock:
+        bid, ask, _ = t.quote(symbol)
+        now = t.now()
+        return Tick(now, bid, ask, 0.0, 0, now * 1000, 6, 0.0)
+
+
+def _rates(symbol, timeframe, fetch):
+    t = _connected()
+    if t is None or not t.feed.has_symbol(symbol):
+        return None
+    if timeframe_name(timeframe) in ('W1', 'MN1'):
+        t.error = (RES_E_INVALID_PARAMS, 'Timeframe not supported')
+        return None
+    with t.lock:
+        spec = t.spec(symbol)
+        rates = fetch(t, spec['point'])
+    if rates is None:
+        t.error = (RES_E_NOT_FOUND, 'Terminal: Not found')
+    return rates
+
+
+def copy_rates_from_pos(symbol, timeframe, start_pos, count):
+    def fetch(t, point):
+        rates = t.feed.bars_before(symbol, timeframe, t.now(), start_pos + count, t.now(), point)
+        return rates if rates is None else rates[:max(len(rates) - start_pos, 0)]
+    return _rates(symbol, timeframe, fetch)
+
+
+def copy_rates_from(symbol, timeframe, date_from, count):
+    return _rates(symbol, timeframe, lambda t, point: t.feed.bars_before(
+        symbol, timeframe, _epoch(date_from), count, t.now(), point
+    ))
+
+
+def copy_rates_range(symbol, timeframe, date_from, date_to):
+    return _rates(symbol, timeframe, lambda t, point: t.feed.bars_range(
+        symbol, timeframe, _epoch(date_from), _epoch(date_to), t.now(), point
+    ))
+
+
+def _ticks(symbol, flags, fetch):
+    t = _connected()
+    if t is None or not t.feed.has_symbol(symbol):
+        return None
+    if flags == COPY_TICKS_TRADE:
+        # Data palsu tidak punya tick transaksi (last/volume)
+        return np.zeros(0, dtype=TICK_DTYPE)
+    with t.lock:
+        spec = t.spec(symbol)
+        return fetch(t, spec['point'], spec['digits'])
+
+
+def copy_ticks_from(symbol, date_from, count, flags):
+    def fetch(t, point, digits):
+        start = _epoch(date_from) * 1000
+        now = t.now() * 1000
+        # Ambil per window sampai `count` tick terkumpul atau sampai waktu sekarang
+        window = max(60_000, int(count / t.feed_tick_rate(symbol) * 1000 * 1.2))
+        parts = []
+        total = 0
+        while total < count and start <= now:
+            end = min(start + window - 1, now)
+            ticks = t.feed.ticks(symbol, start, end, point, digits)
+            parts.append(ticks)
+            total += len(ticks)
+            start = end + 1
+        ticks = np.concatenate(parts) if parts else np.zeros(0, dtype=TICK_DTYPE)
+        return ticks[:count]
+    return _ticks(symbol, flags, fetch)
+
+
+def copy_ticks_range(symbol, date_from, date_to, flags):
+    return _ticks(symbol, flags, lambda t, point, digits: t.feed.ticks(
+        symbol, _epoch(date_from) * 1000, min(_epoch(date_to), t.now()) * 1000, point, digits
+    ))
+
+
+def positions_total():
+    positions = positions_get()
+    return len(positions) if positions is not None else 0
+
+
+def positions_get(symbol=None, group=None, ticket=None):
+    t = _connected()
+    if t is None:
+        return None
+    with t.lock:
+        if symbol:
+            t.sync(symbol)
+        else:
+            t.sync_all()
+        positions = t.broker.positions_get(symbol)
+        if ticket is not None:
+            positions = tuple(p for p in positions if p.ticket == ticket)
+        return positions
+
+
+def order_send(request):
+    t = _connected()
+    if t is None:
+        return None
+    with t.lock:
+        return t.order_send(request)
+
+
+def history_deals_total(date_from, date_to):
+    deals = history_deals_get(date_from, date_to)
+    return len(deals) if deals is not None else 0
+
+
+def history_deals_get(date_from=None, date_to=None, group=None, ticket=None, position=None):
+    t = _connected()
+    if t is None:
+        return None
+    with t.lock:
+        t.sync_all()
+        deals = t.deals
+        if ticket is not None:
+            return tuple(d for d in deals if d.ticket == ticket)
+        if position is not None:
+            return tuple(d for d in deals if d.position_id == position)
+        start, end = _epoch(date_from), _epoch(date_to)
+        return tuple(d for d in deals if start <= d.time <= end)
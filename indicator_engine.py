@@ -0,0 +1,308 @@
+import copy
+import math
+from collections import deque
+
+import numpy as np
+
+import indicators
+
+
+def indicator_params(settings):
+    """
+    Ambil parameter indikator dari analysis_settings satu instrument
+    """
+    return {
+        'ema_fast': settings['ma_periods']['fast'],
+        'ema_slow': settings['ma_periods']['slow'],
+        'rsi_period': settings['rsi_period'],
+        'bb_period': settings['bb_period'],
+        'bb_std': settings.get('bb_std', 2),
+        'macd_fast': settings['macd_settings']['fast'],
+        'macd_slow': settings['macd_settings']['slow'],
+        'macd_signal': settings['macd_settings']['signal'],
+        'atr_period': settings.get('atr_period', 14)
+    }
+
+
+class IndicatorState:
+    """
+    State indikator (EMA, RSI, MACD, BB, ATR) untuk satu symbol & timeframe.
+    Setiap bar baru di-update dalam O(1).
+    """
+
+    # Hitung ulang mean/variance BB dari window secara penuh setiap N update
+    # supaya error floating point dari update inkremental tidak menumpuk
+    BB_RESYNC_INTERVAL = 1000
+
+    def __init__(self, params):
+        self.params = params
+        self.count = 0
+        self.last_time = None
+        self.last_close = None
+
+        # EMA & MACD
+        self.ema_fast = None
+        self.ema_slow = None
+        self.macd_fast = None
+        self.macd_slow = None
+        self.macd_signal = None
+
+        # RSI (Wilder)
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.avg_gain = None
+        self.avg_loss = None
+
+        # ATR (Wilder)
+        self.tr_sum = 0.0
+        self.atr = None
+
+        # Bollinger Bands (rolling mean/variance)
+        self.window = deque(maxlen=params['bb_period'])
+        self.bb_mean = 0.0
+        self.bb_m2 = 0.0
+        self.bb_updates = 0
+
+        # Nilai indikator bar terakhir & sebelumnya yang sudah close
+        self.values = None
+        self.prev_values = None
+
+    @classmethod
+    def from_rates(cls, params, closed):
+        """
+        Bangun state dari sekumpulan bar close dengan perhitungan vectorized
+        """
+        state = cls(params)
+        warmup = max(params['rsi_period'], params['atr_period'], params['bb_period']) + 2
+        if len(closed) <= warmup:
+            # Data terlalu pendek, state warm-up diisi bar per bar
+            for bar in closed:
+                state.update(bar)
+            return state
+
+        # Semua bar kecuali yang terakhir dihitung vectorized, bar terakhir lewat
+        # update() supaya nilai bar sebelumnya (prev_values) juga tersedia
+        last_bar = closed[-1]
+        closed = closed[:-1]
+        close = np.asarray(closed['close'], dtype=float)
+        macd_fast = indicators.ema(close, params['macd_fast'])
+        macd_slow = indicators.ema(close, params['macd_slow'])
+        macd_line = macd_fast - macd_slow
+        avg_gain, avg_loss = indicators.wilder_averages(close, params['rsi_period'])
+        atr = indicators.atr(closed['high'], closed['low'], close, params['atr_period'])
+
+        state.count = len(close)
+        state.last_close = float(close[-1])
+        state.last_time = int(closed['time'][-1])
+        state.ema_fast = float(indicators.ema(close, params['ema_fast'])[-1])
+        state.ema_slow = float(indicators.ema(close, params['ema_slow'])[-1])
+        state.macd_fast = float(macd_fast[-1])
+        state.macd_slow = float(macd_slow[-1])
+        state.macd_signal = float(indicators.ema(macd_line, params['macd_signal'])[-1])
+        state.avg_gain = float(avg_gain[-1])
+        state.avg_loss = float(avg_loss[-1])
+        state.atr = float(atr[-1])
+
+        window = close[-params['bb_period']:]
+        state.window.extend(window.tolist())
+        state.bb_mean = float(window.mean())
+        state.bb_m2 = float(((window - state.bb_mean) ** 2).sum())
+
+        state.values = state._snapshot(closed[-1], state.last_close, float(macd_line[-1]))
+        state.update(last_bar)
+        return state
+
+    def copy(self):
+        """
+        Salin state (dipakai untuk menghitung bar yang masih berjalan)
+        """
+        clone = copy.copy(self)
+        clone.window = deque(self.window, maxlen=self.window.maxlen)
+        return clone
+
+    def update(self, bar):
+        """
+        Masukkan satu bar yang sudah close dan kembalikan nilai indikatornya
+        """
+        p = self.params
+        close = float(bar['close'])
+        high = float(bar['high'])
+        low = float(bar['low'])
+
+        # EMA
+        self.ema_fast = self._ema(self.ema_fast, close, p['ema_fast'])
+        self.ema_slow = self._ema(self.ema_slow, close, p['ema_slow'])
+
+        # MACD
+        self.macd_fast = self._ema(self.macd_fast, close, p['macd_fast'])
+        self.macd_slow = self._ema(self.macd_slow, close, p['macd_slow'])
+        macd = self.macd_fast - self.macd_slow
+        self.macd_signal = self._ema(self.macd_signal, macd, p['macd_signal'])
+
+        # RSI & ATR
+        if self.last_close is None:
+            true_range = high - low
+        else:
+            delta = close - self.last_close
+            self._update_rsi(max(delta, 0.0), max(-delta, 0.0))
+            true_range = max(high - low,
+                             abs(high - self.last_close),
+                             abs(low - self.last_close))
+        self._update_atr(true_range)
+
+        # Bollinger Bands
+        self._update_bb(close)
+
+        self.count += 1
+        self.last_close = close
+        self.last_time = int(bar['time'])
+        self.prev_values = self.values
+        self.values = self._snapshot(bar, close, macd)
+        return self.values
+
+    def peek(self, bar):
+        """
+        Hitung indikator untuk bar yang belum close tanpa mengubah state
+        """
+        return self.copy().update(bar)
+
+    def _ema(self, prev, value, period):
+        if prev is None:
+            return value
+        return prev + (2.0 / (period + 1)) * (value - prev)
+
+    def _update_rsi(self, gain, loss):
+        period = self.params['rsi_period']
+        # count = jumlah bar sebelumnya = jumlah delta setelah bar ini
+        if self.count <= period:
+            self.gain_sum += gain
+            self.loss_sum += loss
+            if self.count == period:
+                self.avg_gain = self.gain_sum / period
+                self.avg_loss = self.loss_sum / period
+        else:
+            self.avg_gain = (self.avg_gain * (period - 1) + gain) / period
+            self.avg_loss = (self.avg_loss * (period - 1) + loss) / period
+
+    def _update_atr(self, true_range):
+        period = self.params['atr_period']
+        if self.count < period:
+            self.tr_sum += true_range
+            if self.count == period - 1:
+                self.atr = self.tr_sum / period
+        else:
+            self.atr = (self.atr * (period - 1) + true_range) / period
+
+    def _update_bb(self, close):
+        window = self.window
+        if len(window) < window.maxlen:
+            window.append(close)
+            n = len(window)
+            delta = close - self.bb_mean
+            self.bb_mean += delta / n
+            self.bb_m2 += delta * (close - self.bb_mean)
+        else:
+            oldest = window[0]
+            window.append(close)
+            old_mean = self.bb_mean
+            self.bb_mean += (close - oldest) / len(window)
+            self.bb_m2 += (close - oldest) * (close - self.bb_mean + oldest - old_mean)
+
+        self.bb_updates += 1
+        if self.bb_updates % self.BB_RESYNC_INTERVAL == 0:
+            values = np.fromiter(window, dtype=float)
+            self.bb_mean = float(values.mean())
+            self.bb_m2 = float(((values - self.bb_mean) ** 2).sum())
+
+    def _rsi(self):
+        if self.avg_gain is None:
+            return math.nan
+        if self.avg_loss == 0:
+            return 100.0 if self.avg_gain > 0 else math.nan
+        rs = self.avg_gain / self.avg_loss
+        return 100 - (100 / (1 + rs))
+
+    def _snapshot(self, bar, close, macd):
+        if len(self.window) == self.window.maxlen:
+            std = math.sqrt(max(self.bb_m2, 0.0) / len(self.window))
+            bb_middle = self.bb_mean
+            bb_upper = bb_middle + self.params['bb_std'] * std
+            bb_lower = bb_middle - self.params['bb_std'] * std
+        else:
+            bb_upper = bb_middle = bb_lower = math.nan
+
+        return {
+            'time': int(bar['time']),
+            'close': close,
+            'tick_volume': float(bar['tick_volume']),
+            'ema_fast': self.ema_fast,
+            'ema_slow': self.ema_slow,
+            'rsi': self._rsi(),
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+            'macd': macd,
+            'macd_signal': self.macd_signal,
+            'atr': self.atr if self.atr is not None else math.nan
+        }
+
+
+class IndicatorEngine:
+    """
+    Kumpulan IndicatorState per (symbol, timeframe).
+    Perhitungan penuh hanya dilakukan saat cold start atau ada gap data.
+    """
+
+    def __init__(self):
+        self.states = {}
+        self.stats = {
+            'cold_starts': 0,
+            'gap_resets': 0,
+            'incremental_updates': 0
+        }
+
+    def update(self, symbol, timeframe, rates, params, forming=False):
+        """
+        Update state dengan rates terbaru (structured array MT5).
+        Bar terakhir dianggap masih berjalan dan tidak masuk ke state.
+        Return (current, previous): nilai indikator bar close terakhir dan
+        sebelumnya, atau bar berjalan dan bar close terakhir jika forming=True.
+        """
+        key = (symbol, timeframe)
+        closed = rates[:-1]
+        state = self.states.get(key)
+
+        if state is None or state.params != params or state.last_time is None:
+            state = self._rebuild(key, closed, params)
+            self.stats['cold_starts'] += 1
+        else:
+            times = closed['time']
+            idx = int(np.searchsorted(times, state.last_time))
+            if idx >= len(times) or times[idx] != state.last_time:
+                # Bar terakhir yang diproses tidak ada di data -> gap, hitung ulang
+                state = self._rebuild(key, closed, params)
+                self.stats['gap_resets'] += 1
+            else:
+                for bar in closed[idx + 1:]:
+                    state.update(bar)
+                    self.stats['incremental_updates'] += 1
+
+        if forming:
+            return state.peek(rates[-1]), state.values
+        return state.values, state.prev_values
+
+    def reset(self, symbol=None, timeframe=None):
+        """
+        Hapus state (semua, per symbol, atau per symbol & timeframe)
+        """
+        for key in list(self.states):
+            if symbol is not None and key[0] != symbol:
+                continue
+            if timeframe is not None and key[1] != timeframe:
+                continue
+            del self.states[key]
+
+    def _rebuild(self, key, closed, params):
+        state = IndicatorState.from_rates(params, closed)
+        self.states[key] = state
+        return state
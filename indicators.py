@@ -0,0 +1,189 @@
+"""
+Library indikator teknikal vectorized (numpy).
+
+Semua fungsi menerima array 1-D atau 2-D (satu baris per symbol) dan
+menghitung di sepanjang axis terakhir tanpa loop Python per elemen.
+Output selalu sepanjang input, nilai warm-up diisi NaN.
+
+Definisi indikator sama dengan IndicatorState (indicator_engine.py):
+- EMA: alpha = 2 / (period + 1), di-seed dengan nilai pertama
+- RSI & ATR: smoothing Wilder, di-seed dengan rata-rata `period` nilai pertama
+- Bollinger Bands: rolling mean & rolling std (ddof=0)
+"""
+import math
+
+import numpy as np
+
+
+# Cache bobot beta^k dan alpha * beta^-k per alpha (dipakai ulang setiap panggilan)
+_EWM_WEIGHTS = {}
+
+
+def _ewm_weights(alpha):
+    weights = _EWM_WEIGHTS.get(alpha)
+    if weights is None:
+        beta = 1.0 - alpha
+        # Batasi panjang blok supaya beta^-k tidak overflow
+        block = max(2, int(230.0 / -math.log(beta)))
+        powers = beta ** np.arange(block)
+        weights = (powers, alpha / powers)
+        if len(_EWM_WEIGHTS) > 64:
+            _EWM_WEIGHTS.clear()
+        _EWM_WEIGHTS[alpha] = weights
+    return weights
+
+
+def _ewm(values, alpha, start=0):
+    """
+    Rekursi y[t] = y[t-1] + alpha * (x[t] - y[t-1]) dengan y[start] = x[start].
+
+    Dihitung per blok dengan bentuk tertutup
+    y[k] = beta^k * (y[0] + alpha * sum(x[j] * beta^-j)).
+    """
+    x = np.asarray(values, dtype=float)
+    out = np.empty(x.shape)
+    out[..., :start] = np.nan
+    n = x.shape[-1]
+    if n <= start:
+        return out
+    if alpha >= 1:
+        out[..., start:] = x[..., start:]
+        return out
+
+    powers, scaled_inv = _ewm_weights(alpha)
+    block = len(powers)
+
+    seed = x[..., start]
+    pos = start
+    while True:
+        end = min(pos + block, n)
+        size = end - pos
+        out[..., pos] = seed
+        acc = np.cumsum(x[..., pos + 1:end] * scaled_inv[1:size], axis=-1)
+        acc += np.expand_dims(seed, -1)
+        np.multiply(acc, powers[1:size], out=out[..., pos + 1:end])
+        if end == n:
+            return out
+        # Bar pertama blok berikutnya dihitung dari nilai terakhir blok ini
+        last = out[..., end - 1]
+        seed = last + alpha * (x[..., end] - last)
+        pos = end
+
+
+def _rolling_sum(values, period):
+    """
+    Rolling sum berbasis cumsum, NaN untuk period-1 nilai pertama
+    """
+    x = np.asarray(values, dtype=float)
+    if x.shape[-1] < period:
+        return np.full(x.shape, np.nan)
+    csum = np.cumsum(x, axis=-1)
+    out = np.empty(x.shape)
+    out[..., :period - 1] = np.nan
+    out[..., period - 1] = csum[..., period - 1]
+    np.subtract(csum[..., period:], csum[..., :-period], out=out[..., period:])
+    return out
+
+
+def ema(values, period):
+    """
+    Exponential Moving Average
+    """
+    return _ewm(values, 2.0 / (period + 1))
+
+
+def sma(values, period):
+    """
+    Simple Moving Average
+    """
+    return _rolling_sum(values, period) / period
+
+
+def rolling_std(values, period):
+    """
+    Rolling standard deviation (ddof=0, sama seperti np.std)
+    """
+    x = np.asarray(values, dtype=float)
+    # Geser ke sekitar nol (relatif ke harga terakhir) supaya sum of squares
+    # tidak kehilangan presisi; mean & mean kuadrat dihitung dalam satu pass
+    centered = x - x[..., -1:]
+    sums = _rolling_sum(np.stack([centered, centered * centered]), period) / period
+    mean, mean_sq = sums[0], sums[1]
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def wilder_averages(close, period=14):
+    """
+    Rata-rata gain & loss dengan smoothing Wilder (dasar RSI)
+    """
+    x = np.asarray(close, dtype=float)
+    if x.shape[-1] <= period:
+        nan = np.full(x.shape, np.nan)
+        return nan, nan.copy()
+
+    # Gain & loss ditumpuk supaya smoothing keduanya dihitung dalam satu pass
+    delta = np.diff(x, axis=-1)
+    moves = np.zeros((2,) + x.shape)
+    np.maximum(delta, 0.0, out=moves[0, ..., 1:])
+    np.maximum(-delta, 0.0, out=moves[1, ..., 1:])
+
+    # Seed di index `period` = rata-rata gain/loss dari `period` delta pertama
+    moves[..., period] = moves[..., 1:period + 1].sum(axis=-1) / period
+    averages = _ewm(moves, 1.0 / period, start=period)
+    return averages[0], averages[1]
+
+
+def rsi(close, period=14):
+    """
+    Relative Strength Index (Wilder)
+    """
+    avg_gain, avg_loss = wilder_averages(close, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+def bollinger_bands(close, period=20, std_dev=2):
+    """
+    Bollinger Bands dengan rolling std, return (upper, middle, lower)
+    """
+    middle = sma(close, period)
+    std = rolling_std(close, period)
+    return middle + std_dev * std, middle, middle - std_dev * std
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    MACD, return (macd_line, signal_line)
+    """
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line
+
+
+def true_range(high, low, close):
+    """
+    True range, bar pertama memakai high - low
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    tr = high - low
+    prev_close = close[..., :-1]
+    tr[..., 1:] = np.maximum(
+        tr[..., 1:],
+        np.maximum(np.abs(high[..., 1:] - prev_close), np.abs(low[..., 1:] - prev_close))
+    )
+    return tr
+
+
+def atr(high, low, close, period=14):
+    """
+    Average True Range (Wilder)
+    """
+    tr = true_range(high, low, close)
+    if tr.shape[-1] < period:
+        return np.full(tr.shape, np.nan)
+    # Seed di index period-1 = rata-rata `period` true range pertama
+    tr[..., period - 1] = tr[..., :period].sum(axis=-1) / period
+    return _ewm(tr, 1.0 / period, start=period - 1)
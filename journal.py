@@ -0,0 +1,315 @@
+"""
+Jurnal trading di SQLite (mode WAL).
+
+Semua kejadian (sinyal, order, fill, perubahan SL, close) dicatat ke tabel
+`events`; tabel `trades` berisi satu baris per posisi yang diperbarui dari
+event tersebut. Setiap percobaan order_send (RTT, harga request vs fill,
+retcode) dicatat di tabel `executions`. Penulisan dilakukan thread writer secara batch sehingga loop
+trading hanya memasukkan event ke queue. Query /history dan /report memakai
+index (symbol, waktu, ticket) dan selalu dibatasi LIMIT atau range waktu.
+"""
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    kind TEXT NOT NULL,
+    symbol TEXT,
+    ticket INTEGER,
+    side TEXT,
+    volume REAL,
+    price REAL,
+    sl REAL,
+    tp REAL,
+    profit REAL,
+    retcode INTEGER,
+    comment TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_time ON events(time);
+CREATE INDEX IF NOT EXISTS idx_events_symbol_time ON events(symbol, time);
+CREATE INDEX IF NOT EXISTS idx_events_ticket ON events(ticket);
+
+CREATE TABLE IF NOT EXISTS trades (
+    ticket INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    volume REAL,
+    open_time REAL NOT NULL,
+    open_price REAL,
+    sl REAL,
+    tp REAL,
+    close_time REAL,
+    close_price REAL,
+    profit REAL,
+    close_reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_trades_open_time ON trades(open_time);
+-- (close_time, profit) supaya ringkasan /report cukup membaca index
+CREATE INDEX IF NOT EXISTS idx_trades_close_time ON trades(close_time, profit);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol_close ON trades(symbol, close_time);
+
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    ticket INTEGER,
+    side TEXT,
+    attempt INTEGER,
+    requested REAL,
+    filled REAL,
+    slippage REAL,
+    rtt_ms REAL,
+    retcode INTEGER,
+    filling INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_executions_time ON executions(time);
+CREATE INDEX IF NOT EXISTS idx_executions_symbol_time ON executions(symbol, time);
+"""
+
+EVENT_FIELDS = ('time', 'kind', 'symbol', 'ticket', 'side', 'volume', 'price', 'sl', 'tp',
+                'profit', 'retcode', 'comment')
+EXECUTION_FIELDS = ('time', 'symbol', 'ticket', 'side', 'attempt', 'requested', 'filled', 'slippage',
+                    'rtt_ms', 'retcode', 'filling')
+
+
+class TradeJournal:
+    """
+    Jurnal trading dengan writer background.
+
+    record() tidak pernah blocking. Event 'fill' membuat baris trades,
+    'modify' mengubah SL/TP, 'close' mengisi harga, waktu & profit close.
+    """
+
+    def __init__(self, path, batch_size=200, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.local = threading.local()
+        # Ticket yang event close-nya masih di queue, supaya tidak dianggap masih terbuka
+        self.closing = set()
+        self.lock = threading.Lock()
+        self.stats = {
+            'events': 0,
+            'batches': 0,
+            'failed': 0
+        }
+
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.commit()
+
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='journal', daemon=True)
+        self.thread.start()
+
+    def record(self, kind, symbol=None, ticket=None, side=None, volume=None, price=None, sl=None,
+               tp=None, profit=None, retcode=None, comment=None, time_=None):
+        """
+        Masukkan event ke queue writer
+        """
+        if kind == 'close' and ticket is not None:
+            with self.lock:
+                self.closing.add(ticket)
+        self.queue.put((time_ or time.time(), kind, symbol, ticket, side, volume, price, sl, tp,
+                        profit, retcode, comment))
+
+    def record_execution(self, symbol, ticket=None, side=None, attempt=1, requested=None, filled=None,
+                         slippage=None, rtt_ms=None, retcode=None, filling=None, time_=None):
+        """
+        Masukkan satu percobaan order_send ke queue writer
+        """
+        self.queue.put((time_ or time.time(), 'execution', symbol, ticket, side, attempt, requested, filled,
+                        slippage, rtt_ms, retcode, filling))
+
+    def flush(self):
+        """
+        Tunggu sampai semua event di queue tertulis
+        """
+        self.queue.join()
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+
+    def recent_trades(self, limit=10, symbol=None):
+        """
+        Trade terbaru (urut waktu buka menurun)
+        """
+        if symbol:
+            rows = self._query(
+                "SELECT * FROM trades WHERE symbol = ? ORDER BY open_time DESC LIMIT ?", (symbol, limit))
+        else:
+            rows = self._query("SELECT * FROM trades ORDER BY open_time DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    def open_trades(self):
+        """
+        Trade yang belum punya close di jurnal
+        """
+        rows = self._query("SELECT * FROM trades WHERE close_time IS NULL")
+        with self.lock:
+            closing = set(self.closing)
+        return [dict(row) for row in rows if row['ticket'] not in closing]
+
+    def summary(self, since=None, until=None, symbol=None):
+        """
+        Ringkasan trade yang close dalam [since, until): jumlah, win/loss, profit
+        """
+        where = ["close_time IS NOT NULL"]
+        params = []
+        if since is not None:
+            where.append("close_time >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("close_time < ?")
+            params.append(until)
+        if symbol:
+            where.append("symbol = ?")
+            params.append(symbol)
+
+        row = self._query(f"""
+            SELECT COUNT(*) AS total_trades,
+                   COALESCE(SUM(profit > 0), 0) AS winning_trades,
+                   COALESCE(SUM(profit < 0), 0) AS losing_trades,
+                   COALESCE(SUM(CASE WHEN profit > 0 THEN profit ELSE 0 END), 0) AS total_profit,
+                   COALESCE(SUM(CASE WHEN profit < 0 THEN profit ELSE 0 END), 0) AS total_loss
+            FROM trades WHERE {' AND '.join(where)}
+        """, params)[0]
+
+        summary = dict(row)
+        total = summary['total_trades']
+        summary['win_rate'] = summary['winning_trades'] / total * 100 if total else 0.0
+        summary['profit_factor'] = (summary['total_profit'] / abs(summary['total_loss'])
+                                    if summary['total_loss'] else None)
+        summary['net_profit'] = summary['total_profit'] + summary['total_loss']
+        return summary
+
+    def execution_summary(self, since=None, symbol=None):
+        """
+        Ringkasan eksekusi sejak `since`: percobaan, fill, requote, RTT & slippage rata-rata/maks
+        """
+        where, params = [], []
+        if since is not None:
+            where.append("time >= ?")
+            params.append(since)
+        if symbol:
+            where.append("symbol = ?")
+            params.append(symbol)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        row = self._query(f"""
+            SELECT COUNT(*) AS attempts,
+                   COALESCE(SUM(filled IS NOT NULL), 0) AS fills,
+                   COALESCE(SUM(retcode IN (10004, 10020, 10021)), 0) AS requotes,
+                   AVG(rtt_ms) AS rtt_mean,
+                   MAX(rtt_ms) AS rtt_max,
+                   AVG(slippage) AS slippage_mean,
+                   MAX(slippage) AS slippage_max
+            FROM executions {clause}
+        """, params)[0]
+        return dict(row)
+
+    def events(self, since=None, symbol=None, ticket=None, limit=100):
+        where, params = [], []
+        if since is not None:
+            where.append("time >= ?")
+            params.append(since)
+        if symbol:
+            where.append("symbol = ?")
+            params.append(symbol)
+        if ticket is not None:
+            where.append("ticket = ?")
+            params.append(ticket)
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+        rows = self._query(f"SELECT * FROM events {clause} ORDER BY time DESC LIMIT ?", params + [limit])
+        return [dict(row) for row in rows]
+
+    def _connect(self):
+        """
+        Koneksi SQLite milik thread ini (query bisa dipanggil dari thread mana saja)
+        """
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL: commit tidak fsync setiap transaksi, tetap konsisten setelah crash
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def _query(self, sql, params=()):
+        return self._connect().execute(sql, params).fetchall()
+
+    def _run(self):
+        connection = self._connect()
+        while self.running or not self.queue.empty():
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with connection:
+                    self._write(connection, batch)
+                self.stats['events'] += len(batch)
+                self.stats['batches'] += 1
+            except Exception as e:
+                self.stats['failed'] += len(batch)
+                print(f"❌ Error menulis jurnal: {e}")
+            finally:
+                with self.lock:
+                    for event in batch:
+                        if event[1] == 'close':
+                            self.closing.discard(event[3])
+                for _ in batch:
+                    self.queue.task_done()
+
+    @staticmethod
+    def _write(connection, batch):
+        executions = [event[:1] + event[2:] for event in batch if event[1] == 'execution']
+        if executions:
+            connection.executemany(
+                f"INSERT INTO executions ({', '.join(EXECUTION_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(EXECUTION_FIELDS))})",
+                executions
+            )
+            batch = [event for event in batch if event[1] != 'execution']
+        connection.executemany(
+            f"INSERT INTO events ({', '.join(EVENT_FIELDS)}) VALUES ({', '.join('?' * len(EVENT_FIELDS))})",
+            batch
+        )
+        for time_, kind, symbol, ticket, side, volume, price, sl, tp, profit, _, comment in batch:
+            if ticket is None:
+                continue
+            if kind == 'fill':
+                connection.execute(
+                    "INSERT OR IGNORE INTO trades (ticket, symbol, side, volume, open_time, open_price, sl, tp) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (ticket, symbol, side, volume, time_, price, sl, tp)
+                )
+            elif kind == 'modify':
+                connection.execute(
+                    "UPDATE trades SET sl = COALESCE(?, sl), tp = COALESCE(?, tp) WHERE ticket = ?",
+                    (sl, tp, ticket)
+                )
+            elif kind == 'close':
+                # Posisi yang dibuka sebelum jurnal ada tetap masuk laporan
+                connection.execute(
+                    "INSERT OR IGNORE INTO trades (ticket, symbol, side, volume, open_time) VALUES (?, ?, ?, ?, ?)",
+                    (ticket, symbol, side or '', volume, time_)
+                )
+                connection.execute(
+                    "UPDATE trades SET close_time = ?, close_price = ?, profit = ?, close_reason = ? "
+                    "WHERE ticket = ? AND close_time IS NULL",
+                    (time_, price, profit, comment, ticket)
+                )
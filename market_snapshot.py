@@ -0,0 +1,70 @@
+import threading
+import time
+
+
+class MarketSnapshot:
+    """
+    Snapshot symbol_info, symbol_info_tick dan account_info untuk satu pass loop.
+
+    Setiap data diambil dari terminal sekali lalu disajikan dari memori sampai
+    pass berikutnya (new_pass) atau sampai umurnya melewati `ttl` detik.
+    Hasil None (error terminal) tidak disimpan supaya dicoba lagi.
+    """
+
+    def __init__(self, terminal, ttl=1.0):
+        self.terminal = terminal
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'terminal_calls': 0
+        }
+
+    @property
+    def saved(self):
+        """
+        Jumlah panggilan terminal yang dihemat
+        """
+        return self.stats['requests'] - self.stats['terminal_calls']
+
+    def new_pass(self):
+        """
+        Mulai pass baru, semua data diambil ulang saat dibutuhkan
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def invalidate(self, symbol=None):
+        """
+        Buang account_info (dan data symbol jika diisi), dipakai setelah order
+        """
+        with self.lock:
+            self.entries.pop(('account_info', None), None)
+            if symbol is not None:
+                self.entries.pop(('symbol_info', symbol), None)
+                self.entries.pop(('symbol_info_tick', symbol), None)
+
+    def symbol_info(self, symbol):
+        return self._get('symbol_info', symbol, self.terminal.symbol_info, symbol)
+
+    def symbol_info_tick(self, symbol):
+        return self._get('symbol_info_tick', symbol, self.terminal.symbol_info_tick, symbol)
+
+    def account_info(self):
+        return self._get('account_info', None, self.terminal.account_info)
+
+    def _get(self, kind, key, fetch, *args):
+        now = time.monotonic()
+        with self.lock:
+            self.stats['requests'] += 1
+            entry = self.entries.get((kind, key))
+            if entry is not None and now - entry[0] < self.ttl:
+                return entry[1]
+
+        value = fetch(*args)
+        with self.lock:
+            self.stats['terminal_calls'] += 1
+            if value is not None:
+                self.entries[(kind, key)] = (now, value)
+        return value
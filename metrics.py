@@ -0,0 +1,314 @@
+"""
+Metrics loop trading: timer per tahap, histogram latency gaya HDR dan counter,
+diekspos dalam format Prometheus lewat HTTP lokal.
+
+Histogram menyimpan jumlah observasi per bucket log-linear (16 sub-bucket per
+pangkat dua, error relatif maksimal ~6%) dalam nanodetik, jadi record() O(1)
+tanpa alokasi. Percentile dihitung saat dibaca (/latency, scrape Prometheus).
+
+Contoh:
+    with METRICS.timer('monitor_positions'):
+        ...
+    METRICS.inc('robot_orders_total', {'symbol': 'EURUSD', 'result': 'done'})
+    mt5 = InstrumentedTerminal(mt5, METRICS)   # latency setiap panggilan terminal
+"""
+import threading
+import time
+
+SUB_BITS = 4
+SUB_BUCKETS = 1 << SUB_BITS
+# Sampai 2^40 ns (~18 menit), nilai lebih besar masuk bucket terakhir
+BUCKET_COUNT = SUB_BUCKETS * 40
+
+# Batas bucket Prometheus (detik)
+PROMETHEUS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                      0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    'robot_stage_seconds': ('histogram', "Durasi tahap loop trading"),
+    'robot_terminal_call_seconds': ('histogram', "Durasi panggilan API terminal MT5"),
+    'robot_signals_total': ('counter', "Jumlah sinyal trading"),
+    'robot_orders_total': ('counter', "Jumlah order yang dikirim per hasil"),
+    'robot_order_retcodes_total': ('counter', "Retcode order_send"),
+    'robot_order_rejects_total': ('counter', "Order yang ditahan sebelum dikirim"),
+    'robot_passes_total': ('counter', "Jumlah pass loop trading")
+}
+
+
+def _bucket_bounds(index):
+    """
+    (batas bawah, batas atas) bucket dalam nanodetik
+    """
+    if index < 2 * SUB_BUCKETS:
+        return index, index + 1
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index % SUB_BUCKETS + SUB_BUCKETS
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class Histogram:
+    """
+    Histogram latency (nanodetik) dengan bucket log-linear
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, nanos):
+        shift = nanos.bit_length() - (SUB_BITS + 1)
+        index = (shift << SUB_BITS) + (nanos >> shift) if shift > 0 else nanos
+        if index >= BUCKET_COUNT:
+            index = BUCKET_COUNT - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += nanos
+        if nanos > self.max:
+            self.max = nanos
+
+    def percentile(self, q):
+        """
+        Nilai (nanodetik) pada percentile q (0-100), titik tengah bucket
+        """
+        if self.count == 0:
+            return 0
+        target = max(1, int(round(self.count * q / 100)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                low, high = _bucket_bounds(index)
+                return min((low + high) // 2, self.max)
+        return self.max
+
+    def cumulative(self, bounds_nanos):
+        """
+        Jumlah observasi <= setiap batas (untuk bucket `le` Prometheus)
+        """
+        result = []
+        seen = 0
+        index = 0
+        for bound in bounds_nanos:
+            while index < BUCKET_COUNT and _bucket_bounds(index)[1] <= bound:
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+
+class _Timer:
+    __slots__ = ('record', 'started')
+
+    def __init__(self, record):
+        self.record = record
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.record(time.perf_counter_ns() - self.started)
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class Metrics:
+    """
+    Registry histogram & counter. Key: (nama metric, tuple label).
+
+    Lock hanya dipakai saat membuat metric baru dan membaca snapshot. Record ke
+    histogram tidak dikunci supaya murah; praktis setiap histogram hanya ditulis
+    satu thread, dan balapan antar thread paling buruk kehilangan satu hitungan.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        # stage -> Histogram.record, supaya timer() cukup satu lookup
+        self.stage_records = {}
+        self.lock = threading.Lock()
+        self.null_timer = _NullTimer()
+
+    def timer(self, stage):
+        """
+        Context manager pengukur durasi satu tahap loop trading
+        """
+        if not self.enabled:
+            return self.null_timer
+        return _Timer(self.stage_records.get(stage) or self._stage_record(stage))
+
+    def record(self, stage, nanos):
+        """
+        Catat durasi tahap yang diukur sendiri (perf_counter_ns)
+        """
+        if self.enabled:
+            (self.stage_records.get(stage) or self._stage_record(stage))(nanos)
+
+    def _stage_record(self, stage):
+        record = self.histogram('robot_stage_seconds', (('stage', stage),)).record
+        self.stage_records[stage] = record
+        return record
+
+    def histogram(self, name, labels):
+        """
+        Histogram untuk (nama, tuple label), dibuat jika belum ada
+        """
+        key = (name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            return histogram
+
+    def observe(self, name, labels, nanos):
+        histogram = self.histograms.get((name, labels)) or self.histogram(name, labels)
+        histogram.record(nanos)
+
+    def inc(self, name, labels=None, value=1):
+        if not self.enabled:
+            return
+        key = (name, tuple(labels.items()) if labels else ())
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def latency_summary(self, name='robot_stage_seconds'):
+        """
+        List (label, count, p50, p90, p99, max) dalam milidetik, urut total waktu terbesar
+        """
+        with self.lock:
+            items = [(labels, histogram) for (metric, labels), histogram in self.histograms.items()
+                     if metric == name]
+            rows = [(
+                ','.join(value for _, value in labels),
+                histogram.count,
+                histogram.percentile(50) / 1e6,
+                histogram.percentile(90) / 1e6,
+                histogram.percentile(99) / 1e6,
+                histogram.max / 1e6,
+                histogram.total / 1e6
+            ) for labels, histogram in items]
+        rows.sort(key=lambda row: -row[6])
+        return [row[:6] for row in rows]
+
+    def render(self):
+        """
+        Semua metric dalam text exposition format Prometheus
+        """
+        bounds = [int(b * 1e9) for b in PROMETHEUS_BUCKETS]
+        lines = []
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+            # Salin angka di dalam lock supaya konsisten
+            snapshot = [(key, h.cumulative(bounds), h.count, h.total) for key, h in histograms]
+
+        described = set()
+        for (name, labels), cumulative, count, total in snapshot:
+            if name not in described:
+                lines.extend(_describe(name))
+                described.add(name)
+            for bound, seen in zip(PROMETHEUS_BUCKETS, cumulative):
+                lines.append(f"{name}_bucket{_labels(labels + (('le', repr(bound)),))} {seen}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {total / 1e9:.9f}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        for (name, labels), value in counters:
+            if name not in described:
+                lines.extend(_describe(name))
+                described.add(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, host='127.0.0.1', port=9108):
+        """
+        Jalankan endpoint HTTP /metrics di thread background
+        """
+        # Import di sini: http.server hanya dimuat jika endpoint dijalankan
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
+
+
+def _describe(name):
+    kind, text = HELP.get(name, ('untyped', name))
+    return [f"# HELP {name} {text}", f"# TYPE {name} {kind}"]
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+class InstrumentedTerminal:
+    """
+    Pembungkus modul MT5: setiap fungsi dicatat di robot_terminal_call_seconds{call=...},
+    konstanta & atribut lain diteruskan apa adanya.
+    """
+
+    def __init__(self, terminal, metrics):
+        self._terminal = terminal
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        attr = getattr(self._terminal, name)
+        if callable(attr) and not isinstance(attr, type):
+            attr = self._wrap(name, attr)
+        # Disimpan di instance supaya akses berikutnya tidak lewat __getattr__ lagi
+        setattr(self, name, attr)
+        return attr
+
+    def _wrap(self, name, function):
+        metrics = self._metrics
+        record = metrics.histogram('robot_terminal_call_seconds', (('call', name),)).record
+        clock = time.perf_counter_ns
+
+        def call(*args, **kwargs):
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            started = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(clock() - started)
+
+        call.__name__ = name
+        return call
+
+
+# Registry default yang dipakai bot
+METRICS = Metrics()
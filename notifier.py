@@ -0,0 +1,274 @@
+"""
+Pengiriman notifikasi di background supaya loop trading tidak pernah menunggu
+Telegram / SMTP.
+
+Pesan masuk ke queue terbatas lalu dikirim thread dispatcher:
+- pesan yang datang beruntun (burst) digabung jadi satu pesan Telegram,
+  dikirim setelah burst selesai atau paling lambat `max_delay` detik;
+- pengiriman per chat dibatasi sesuai limit Telegram (1 pesan/detik,
+  20 pesan/menit per chat);
+- semua pesan juga dikumpulkan untuk email digest periodik (opsional).
+"""
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# Panjang maksimal satu pesan Telegram
+TELEGRAM_MAX_LENGTH = 4096
+
+SEPARATOR = "\n➖➖➖➖➖➖➖➖\n"
+
+
+class RateLimiter:
+    """
+    Batas kirim satu chat: jeda minimal antar pesan dan maksimal N pesan per window
+    """
+
+    def __init__(self, min_interval=1.0, max_per_window=20, window=60.0):
+        self.min_interval = min_interval
+        self.max_per_window = max_per_window
+        self.window = window
+        self.sent = deque()
+
+    def delay(self, now):
+        """
+        Detik yang harus ditunggu sebelum boleh kirim (0 = boleh sekarang)
+        """
+        while self.sent and now - self.sent[0] >= self.window:
+            self.sent.popleft()
+        wait = 0.0
+        if self.sent:
+            wait = self.sent[-1] + self.min_interval - now
+        if len(self.sent) >= self.max_per_window:
+            wait = max(wait, self.sent[0] + self.window - now)
+        return max(wait, 0.0)
+
+    def record(self, now):
+        self.sent.append(now)
+
+
+class EmailDigest:
+    """
+    Kumpulan pesan yang dikirim sebagai satu email setiap `interval` detik.
+    Pesan baru dihapus dari antrian setelah email terkirim; jika SMTP gagal,
+    dicoba lagi di interval berikutnya (maksimal `max_messages` pesan terbaru).
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.max_messages = config.get('max_messages', 1000)
+        self.messages = []
+        self.last_sent = time.monotonic()
+
+    def add(self, message):
+        """
+        Tambah pesan ke digest. Return False jika pesan tertua dibuang karena antrian penuh.
+        """
+        self.messages.append((datetime.now(), message))
+        if len(self.messages) > self.max_messages:
+            del self.messages[0]
+            return False
+        return True
+
+    def due(self, now):
+        return bool(self.messages) and now - self.last_sent >= self.config['interval']
+
+    def send(self, now):
+        # Import di sini: modul email hanya dimuat jika digest aktif
+        import smtplib
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+
+        # Percobaan berikutnya (jika gagal) setelah interval penuh
+        messages = list(self.messages)
+        self.last_sent = now
+
+        msg = MIMEMultipart()
+        msg['From'] = self.config['sender']
+        msg['To'] = ', '.join(self.config['recipients'])
+        msg['Subject'] = f"Trading Bot Digest - {len(messages)} notifikasi"
+        body = "\n\n".join(f"[{stamp:%Y-%m-%d %H:%M:%S}]\n{text.strip()}" for stamp, text in messages)
+        msg.attach(MIMEText(body, 'plain', 'utf-8'))
+
+        with smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'], timeout=30) as server:
+            if self.config.get('use_tls', True):
+                server.starttls()
+            if self.config.get('username'):
+                server.login(self.config['username'], self.config['password'])
+            server.send_message(msg)
+        del self.messages[:len(messages)]
+        return len(messages)
+
+
+class Notifier:
+    """
+    Dispatcher notifikasi background dengan queue terbatas, coalescing dan rate limit.
+
+    telegram_send(chat_id, text) dipanggil hanya dari thread dispatcher.
+    notify() tidak pernah blocking; jika queue penuh pesan dibuang (stats['dropped']).
+    """
+
+    def __init__(self, telegram_send=None, chat_id=None, email=None, max_queue=1000,
+                 coalesce_window=1.0, max_delay=5.0, max_length=TELEGRAM_MAX_LENGTH, max_retries=5):
+        self.telegram_send = telegram_send
+        self.chat_id = chat_id
+        self.digest = EmailDigest(email) if email and email.get('enabled') else None
+        self.queue = queue.Queue(maxsize=max_queue)
+        # Burst selesai jika tidak ada pesan baru selama coalesce_window detik
+        self.coalesce_window = coalesce_window
+        # Batas waktu pesan pertama sebuah batch menunggu dikirim
+        self.max_delay = max_delay
+        self.max_length = max_length
+        # Pesan yang gagal dikirim dicoba lagi (jeda berlipat dua), lalu dibuang
+        self.max_retries = max_retries
+        self.batches = {}
+        self.limiters = {}
+        self.running = False
+        self.thread = None
+        self.stats = {
+            'queued': 0,
+            'dropped': 0,
+            'sent': 0,
+            'coalesced': 0,
+            'failed': 0,
+            'emails': 0
+        }
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name='notifier', daemon=True)
+            self.thread.start()
+        return self
+
+    def notify(self, message, chat_id=None):
+        """
+        Masukkan pesan ke queue. Return False jika queue penuh.
+        """
+        try:
+            self.queue.put_nowait((chat_id or self.chat_id, message, time.monotonic()))
+            self.stats['queued'] += 1
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+
+    def stop(self, timeout=10.0):
+        """
+        Hentikan dispatcher setelah semua pesan yang tersisa dikirim (tetap mengikuti
+        rate limit). Return jumlah pesan yang belum terkirim saat timeout habis.
+        """
+        self.running = False
+        if self.thread is None:
+            return 0
+        self.thread.join(timeout)
+        unsent = self.pending() if self.thread.is_alive() else 0
+        if unsent:
+            print(f"⚠️ {unsent} notifikasi belum terkirim setelah {timeout:.0f}s, dibuang saat program keluar")
+        if self.digest and self.digest.messages and not self.thread.is_alive():
+            print(f"⚠️ {len(self.digest.messages)} pesan email digest tidak terkirim")
+        return unsent
+
+    def pending(self):
+        return self.queue.qsize() + sum(len(batch['messages']) for batch in self.batches.values())
+
+    def _run(self):
+        while self.running or not self.queue.empty() or self.batches:
+            try:
+                self._add(*self.queue.get(timeout=self._next_wakeup(time.monotonic())))
+                # Ambil semua pesan yang sudah antri sebelum mengirim
+                while True:
+                    self._add(*self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            flush_all = not self.running
+            for chat_id in list(self.batches):
+                self._flush(chat_id, now, force=flush_all)
+
+            # Saat berhenti digest dikirim sekali di putaran terakhir (Telegram sudah terkirim)
+            final = flush_all and self.queue.empty() and not self.batches
+            if self.digest and (self.digest.due(now) or (final and self.digest.messages)):
+                self._send_digest(now)
+
+    def _add(self, chat_id, message, queued_at):
+        if self.digest and not self.digest.add(message):
+            self.stats['dropped'] += 1
+        if self.telegram_send is None or chat_id is None:
+            return
+        batch = self.batches.setdefault(chat_id, {'messages': [], 'first': queued_at, 'last': queued_at, 'failures': 0})
+        batch['messages'].append(message.strip())
+        batch['last'] = queued_at
+
+    def _ready_at(self, chat_id, batch, now):
+        """
+        Waktu (monotonic) batch boleh dikirim
+        """
+        burst_done = min(batch['last'] + self.coalesce_window, batch['first'] + self.max_delay)
+        limiter = self.limiters.setdefault(chat_id, RateLimiter())
+        return max(burst_done, now + limiter.delay(now))
+
+    def _next_wakeup(self, now):
+        wakeups = [self._ready_at(chat_id, batch, now) for chat_id, batch in self.batches.items()]
+        if self.digest and self.digest.messages:
+            wakeups.append(self.digest.last_sent + self.digest.config['interval'])
+        if not wakeups:
+            return 0.5
+        return min(max(min(wakeups) - now, 0.01), 0.5)
+
+    def _flush(self, chat_id, now, force=False):
+        """
+        Kirim batch chat_id jika sudah waktunya. force melewati penggabungan burst,
+        tapi rate limit (dan retry_after dari Telegram) tetap ditunggu.
+        """
+        batch = self.batches[chat_id]
+        limiter = self.limiters.setdefault(chat_id, RateLimiter())
+        if limiter.delay(now) > 0:
+            return
+        if not force and self._ready_at(chat_id, batch, now) > now:
+            return
+
+        # Ambil pesan sebanyak muat dalam satu pesan Telegram, sisanya batch berikutnya
+        messages = batch['messages']
+        text = messages[0][:self.max_length]
+        count = 1
+        while count < len(messages) and len(text) + len(SEPARATOR) + len(messages[count]) <= self.max_length:
+            text += SEPARATOR + messages[count]
+            count += 1
+
+        limiter.record(now)
+        try:
+            self.telegram_send(chat_id, text)
+        except Exception as e:
+            # Pesan tetap di depan batch dan dikirim lagi setelah jeda
+            self.stats['failed'] += 1
+            batch['failures'] += 1
+            print(f"❌ Error sending Telegram message: {e}")
+            if batch['failures'] <= self.max_retries:
+                # Telegram meminta menunggu (HTTP 429), selain itu jeda berlipat dua
+                retry_after = getattr(e, 'result_json', None) or {}
+                retry_after = retry_after.get('parameters', {}).get('retry_after')
+                limiter.record(now + float(retry_after or 2 ** (batch['failures'] - 1)))
+                return
+            print(f"❌ {count} notifikasi dibuang setelah {batch['failures']} kali gagal dikirim")
+            self.stats['dropped'] += count
+        else:
+            self.stats['sent'] += 1
+            self.stats['coalesced'] += count - 1
+
+        batch['failures'] = 0
+        if count == len(messages):
+            del self.batches[chat_id]
+        else:
+            batch['messages'] = messages[count:]
+
+    def _send_digest(self, now):
+        try:
+            self.stats['emails'] += 1
+            self.digest.send(now)
+        except Exception as e:
+            self.stats['failed'] += 1
+            print(f"❌ Error sending email digest ({len(self.digest.messages)} pesan disimpan untuk dicoba lagi): {e}")
@@ -0,0 +1,303 @@
+"""
+Optimasi parameter strategi dengan grid / random search di atas backtest.py.
+
+Parameter yang dicari adalah isi analysis_settings dan risk_settings untuk
+satu tipe instrument. Kandidat dibagi ke process pool; data bar dimuat sekali
+sebagai file .npy yang di-mmap oleh setiap worker, sehingga yang dikirim per
+task hanya dict parameter kecil.
+
+Hasil diranking berdasarkan net P/L, lalu profit factor, lalu max drawdown.
+
+Jalankan dengan:
+    python optimizer.py --data data/ --type forex
+    python optimizer.py --data data/ --type crypto --random 2000 --workers 16 --output hasil.json
+    python optimizer.py --data data/ --type forex --space space.json
+
+Format space.json sama dengan DEFAULT_SPACE[type]: {"path.parameter": [nilai, ...]}.
+"""
+import argparse
+import copy
+import itertools
+import json
+import math
+import os
+import random
+import tempfile
+import time
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+import backtest
+import settings
+
+# Ruang parameter default. Key adalah path (dipisah titik) di analysis_settings[type],
+# kecuali RISK_KEYS yang ada di risk_settings[type].
+DEFAULT_SPACE = {
+    'forex': {
+        'ma_periods.fast': [10, 20, 30],
+        'ma_periods.slow': [50, 100],
+        'rsi_period': [9, 14, 21],
+        'bb_period': [20, 30],
+        'macd_settings': [{'fast': 12, 'slow': 26, 'signal': 9}, {'fast': 8, 'slow': 21, 'signal': 5}],
+        'timeframes': [['M5', 'M15', 'H1'], ['M15', 'H1', 'H4']],
+        'sl_pips': [20, 30, 50],
+        'tp_pips': [40, 60, 100]
+    },
+    'metals': {
+        'ma_periods.fast': [10, 20, 30],
+        'ma_periods.slow': [50, 100],
+        'rsi_period': [9, 14, 21],
+        'bb_period': [20, 30],
+        'macd_settings': [{'fast': 12, 'slow': 26, 'signal': 9}, {'fast': 8, 'slow': 21, 'signal': 5}],
+        'timeframes': [['M15', 'H1', 'H4'], ['H1', 'H4', 'D1']],
+        'sl_pips': [50, 100, 150],
+        'tp_pips': [100, 200, 300]
+    },
+    'crypto': {
+        'ma_periods.fast': [10, 20],
+        'ma_periods.slow': [30, 50, 100],
+        'rsi_period': [9, 14, 21],
+        'bb_period': [20, 30],
+        'macd_settings': [{'fast': 12, 'slow': 26, 'signal': 9}, {'fast': 8, 'slow': 21, 'signal': 5}],
+        'timeframes': [['H1', 'H4', 'D1'], ['M15', 'H1', 'H4']],
+        'sl_percent': [1.0, 2.0, 3.0],
+        'tp_percent': [2.0, 4.0, 6.0]
+    }
+}
+
+RISK_KEYS = {'sl_pips', 'tp_pips', 'sl_percent', 'tp_percent', 'risk_percent'}
+
+SUMMARY_KEYS = ('trades', 'win_rate', 'net_profit', 'profit_factor', 'max_drawdown',
+                'max_drawdown_pct', 'final_balance', 'stopped_out')
+
+
+def apply_params(config, instrument_type, params):
+    """
+    Salinan config dengan parameter kandidat untuk satu tipe instrument
+    """
+    config = copy.deepcopy(config)
+    for key, value in params.items():
+        if key in RISK_KEYS:
+            target = config['risk_settings'][instrument_type]
+        else:
+            target = config['analysis_settings'][instrument_type]
+        *path, name = key.split('.')
+        for part in path:
+            target = target[part]
+        target[name] = copy.deepcopy(value)
+    return config
+
+
+def is_valid(config, instrument_type):
+    """
+    Tolak kombinasi yang tidak masuk akal (EMA/MACD fast >= slow)
+    """
+    analysis = config['analysis_settings'][instrument_type]
+    macd = analysis['macd_settings']
+    return (analysis['ma_periods']['fast'] < analysis['ma_periods']['slow']
+            and macd['fast'] < macd['slow'])
+
+
+def grid_size(space):
+    return math.prod(len(values) for values in space.values())
+
+
+def candidate_at(space, index):
+    """
+    Kandidat ke-index dari grid (urutan sama dengan itertools.product)
+    """
+    params = {}
+    for key in reversed(list(space)):
+        values = space[key]
+        index, position = divmod(index, len(values))
+        params[key] = values[position]
+    return dict(reversed(list(params.items())))
+
+
+def grid_candidates(space):
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*space.values())]
+
+
+def random_candidates(space, count, seed=0):
+    """
+    `count` kandidat acak tanpa duplikat dari grid
+    """
+    size = grid_size(space)
+    rng = random.Random(seed)
+    indices = rng.sample(range(size), min(count, size))
+    return [candidate_at(space, index) for index in indices]
+
+
+def prepare_data(data_dir, symbols, cache_dir):
+    """
+    Path .npy untuk setiap (symbol, timeframe). CSV dikonversi sekali ke cache_dir
+    supaya worker bisa mmap tanpa parsing ulang.
+    """
+    paths = {}
+    for (symbol, timeframe), path in backtest.scan_bars(data_dir).items():
+        if symbol not in symbols:
+            continue
+        if not path.endswith('.npy'):
+            converted = os.path.join(cache_dir, os.path.basename(os.path.splitext(path)[0]) + '.npy')
+            np.save(converted, backtest.load_bars(path))
+            path = converted
+        paths[(symbol, timeframe)] = path
+    return paths
+
+
+# State per worker process, diisi sekali oleh _init_worker
+_worker = {}
+
+
+def _init_worker(paths, config, instrument_type, engine_options):
+    bars = {}
+    for (symbol, timeframe), path in paths.items():
+        bars.setdefault(symbol, {})[timeframe] = np.load(path, mmap_mode='r')
+    _worker.update({
+        'bars': bars,
+        'config': config,
+        'type': instrument_type,
+        'engine_options': engine_options
+    })
+
+
+def _evaluate(task):
+    index, params = task
+    config = apply_params(_worker['config'], _worker['type'], params)
+    engine = backtest.BacktestEngine(config, **_worker['engine_options'])
+    for symbol, bars in _worker['bars'].items():
+        engine.add_symbol(symbol, bars)
+    try:
+        report = engine.run()
+    except Exception as e:
+        return index, {'error': str(e)}
+    return index, {key: report[key] for key in SUMMARY_KEYS}
+
+
+def rank(results, min_trades=0):
+    """
+    Urutkan hasil: net P/L terbesar, profit factor terbesar, max drawdown terkecil.
+    Kandidat yang menghabiskan akun (stop out) tidak diranking.
+    """
+    valid = [r for r in results if 'error' not in r and r['trades'] >= min_trades and r['stopped_out'] is None]
+    return sorted(valid, key=lambda r: (-r['net_profit'], -r['profit_factor'], r['max_drawdown']))
+
+
+def optimize(data_dir, instrument_type, space=None, random_count=None, seed=0, workers=None,
+             config=None, progress=True, **engine_options):
+    """
+    Jalankan semua kandidat di process pool. Return list hasil (belum diranking),
+    masing-masing berisi 'params' dan ringkasan laporan backtest.
+    """
+    config = config or settings.default_settings()
+    space = space or DEFAULT_SPACE[instrument_type]
+    if random_count:
+        candidates = random_candidates(space, random_count, seed)
+    else:
+        candidates = grid_candidates(space)
+    candidates = [p for p in candidates if is_valid(apply_params(config, instrument_type, p), instrument_type)]
+
+    symbols = config['trading_pairs'][instrument_type]
+    results = [None] * len(candidates)
+    workers = workers or cpu_count()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        paths = prepare_data(data_dir, symbols, cache_dir)
+        if not paths:
+            raise ValueError(f"Tidak ada data bar {instrument_type} di {data_dir}")
+
+        started = time.perf_counter()
+        chunksize = max(1, len(candidates) // (workers * 16))
+        with Pool(workers, _init_worker, (paths, config, instrument_type, engine_options)) as pool:
+            tasks = enumerate(candidates)
+            for done, (index, summary) in enumerate(pool.imap_unordered(_evaluate, tasks, chunksize), 1):
+                results[index] = dict(summary, params=candidates[index])
+                if progress and (done % max(1, len(candidates) // 20) == 0 or done == len(candidates)):
+                    elapsed = time.perf_counter() - started
+                    eta = elapsed / done * (len(candidates) - done)
+                    print(f"⏳ {done}/{len(candidates)} kandidat, {elapsed:.0f}s, ETA {eta:.0f}s")
+
+    return results
+
+
+def format_params(params):
+    return ', '.join(
+        f"{key}={'/'.join(map(str, value.values())) if isinstance(value, dict) else value}"
+        for key, value in params.items()
+    )
+
+
+def finite_or_none(result):
+    """
+    Salinan hasil untuk JSON: nilai tak hingga (profit factor tanpa trade rugi) menjadi null
+    """
+    return {
+        key: None if isinstance(value, float) and not math.isfinite(value) else value
+        for key, value in result.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimasi parameter strategi (grid / random search)")
+    parser.add_argument('--data', required=True, help="Folder file <SYMBOL>_<TF>.csv/.npy")
+    parser.add_argument('--type', required=True, choices=sorted(DEFAULT_SPACE))
+    parser.add_argument('--space', help="File JSON ruang parameter (default DEFAULT_SPACE)")
+    parser.add_argument('--random', type=int, default=0, help="Jumlah kandidat random search (0 = grid penuh)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=cpu_count())
+    parser.add_argument('--balance', type=float, default=10000.0)
+    parser.add_argument('--slippage', type=float, default=0, help="Slippage dalam points")
+    parser.add_argument('--spread', type=float, default=None, help="Spread tetap (points)")
+    parser.add_argument('--leverage', type=float, default=100, help="Leverage akun untuk margin")
+    parser.add_argument('--stop-out', type=float, default=50.0, help="Margin level stop out (persen)")
+    parser.add_argument('--min-trades', type=int, default=30, help="Minimal trade supaya masuk ranking")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--output', help="Simpan semua hasil terurut ke file JSON")
+    parser.add_argument('--config', default='config.json',
+                        help="File pengaturan bot, sama dengan bot live (default jika tidak ada)")
+    args = parser.parse_args()
+
+    try:
+        config = settings.load_settings(args.config)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    space = None
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+
+    started = time.perf_counter()
+    results = optimize(
+        args.data, args.type, space=space, random_count=args.random, seed=args.seed,
+        workers=args.workers, config=config, balance=args.balance, slippage_points=args.slippage,
+        spread_points=args.spread, leverage=args.leverage, stop_out_level=args.stop_out
+    )
+    ranked = rank(results, args.min_trades)
+    elapsed = time.perf_counter() - started
+
+    errors = sum(1 for r in results if 'error' in r)
+    stopped = sum(1 for r in results if r.get('stopped_out') is not None)
+    print(f"\n✅ {len(results)} kandidat dalam {elapsed:.1f}s "
+          f"({len(results) / elapsed:.1f}/s), {len(ranked)} lolos minimal {args.min_trades} trade"
+          + (f", {stopped} stop out" if stopped else "")
+          + (f", {errors} error" if errors else ""))
+
+    print(f"\n{'#':>3} {'net P/L':>12} {'PF':>6} {'max DD':>10} {'trades':>7} {'win%':>6}  parameter")
+    for i, r in enumerate(ranked[:args.top], 1):
+        profit_factor = 'N/A' if math.isinf(r['profit_factor']) else f"{r['profit_factor']:.2f}"
+        print(f"{i:>3} {r['net_profit']:>12.2f} {profit_factor:>6} {r['max_drawdown']:>10.2f} "
+              f"{r['trades']:>7} {r['win_rate']:>6.1f}  {format_params(r['params'])}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'type': args.type, 'results': [finite_or_none(r) for r in ranked]}, f,
+                      indent=2, allow_nan=False)
+        print(f"\nHasil disimpan di {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Monitor posisi vectorized.
+
+Semua posisi dimuat sekali ke array kolom, lalu kandidat trailing stop dan
+posisi yang melewati batas drawdown dihitung dalam satu pass numpy dengan
+aturan yang sama seperti strategy.py. Hanya aksi yang dihasilkan yang perlu
+dikirim ke terminal.
+"""
+import numpy as np
+
+import strategy
+
+POSITION_DTYPE = np.dtype([
+    ('ticket', '<i8'),
+    ('symbol', '<i4'),
+    ('type', '<i4'),
+    ('volume', '<f8'),
+    ('price_open', '<f8'),
+    ('price_current', '<f8'),
+    ('sl', '<f8'),
+    ('tp', '<f8'),
+    ('profit', '<f8')
+])
+
+ORDER_TYPE_BUY = 0
+
+
+def load_positions(positions):
+    """
+    Posisi MT5 -> (array kolom POSITION_DTYPE, list nama symbol).
+    Kolom `symbol` berisi index ke list symbol.
+    """
+    symbols = sorted({position.symbol for position in positions})
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    columns = np.array([
+        (p.ticket, index[p.symbol], p.type, p.volume, p.price_open, p.price_current, p.sl, p.tp, p.profit)
+        for p in positions
+    ], dtype=POSITION_DTYPE)
+    return columns, symbols
+
+
+def plan_actions(columns, point, tick_value, balance, trailing_params, max_drawdown):
+    """
+    Hitung aksi semua posisi sekaligus.
+
+    point & tick_value: array per symbol (index sesuai kolom `symbol`).
+    Return dict berisi array per posisi:
+    - close: posisi yang harus ditutup karena drawdown >= max_drawdown
+    - drawdown: drawdown posisi (% balance)
+    - new_sl: SL trailing baru, NaN jika tidak perlu digeser
+    """
+    point = np.asarray(point, dtype=float)[columns['symbol']]
+    tick_value = np.asarray(tick_value, dtype=float)[columns['symbol']]
+
+    drawdown, close = strategy.drawdown_breach(columns['profit'], balance, max_drawdown)
+
+    new_sl = np.full(len(columns), np.nan)
+    if trailing_params['enabled']:
+        profit_pips = columns['profit'] / (tick_value * columns['volume'])
+        new_sl = strategy.trailing_stop_levels(
+            columns['type'] == ORDER_TYPE_BUY,
+            columns['price_current'],
+            columns['sl'],
+            profit_pips,
+            point,
+            trailing_params
+        )
+        # Posisi yang ditutup tidak perlu trailing
+        new_sl = np.where(close, np.nan, new_sl)
+
+    return {
+        'close': close,
+        'drawdown': drawdown,
+        'new_sl': new_sl
+    }
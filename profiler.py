@@ -0,0 +1,134 @@
+"""
+Sampling profiler untuk satu thread (loop trading) yang bisa dinyalakan saat bot berjalan.
+
+Thread sampler mengambil stack thread target dari sys._current_frames() setiap
+`interval` detik dan menghitung stack yang sama (tuple code object) di dict.
+Thread yang diprofile tidak diinstrumentasi sama sekali, jadi biayanya hanya
+GIL yang sesekali dipakai sampler, dan nol saat tidak ada profile aktif.
+
+Hasil: fungsi teratas menurut waktu kumulatif dan file collapsed stack
+(`a;b;c 12` per baris) untuk flamegraph.pl / speedscope.
+
+Contoh:
+    profiler = SamplingProfiler(threading.get_ident()).start()
+    ...                      # pass yang diprofile
+    profiler.pause()         # waktu tunggu bar close tidak ikut dihitung
+    ...
+    profiler.resume()
+    ...
+    profiler.stop()
+    print(profiler.report())
+    profiler.write_collapsed('profiles/loop.folded')
+"""
+import os
+import sys
+import threading
+import time
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Sampler stack satu thread. interval: jeda antar sample (detik).
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        # tuple code object (dari frame terdalam) -> jumlah sample
+        self.stacks = {}
+        self.samples = 0
+        self.active = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.started = None
+        self.elapsed = 0.0
+
+    def start(self):
+        self.active.set()
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self.thread.start()
+        return self
+
+    def pause(self):
+        if self.active.is_set():
+            self.active.clear()
+            self.elapsed += time.perf_counter() - self.started
+
+    def resume(self):
+        if not self.active.is_set():
+            self.started = time.perf_counter()
+            self.active.set()
+
+    def stop(self):
+        self.pause()
+        self.stopped.set()
+        # Bangunkan sampler yang sedang menunggu resume
+        self.active.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            self.active.wait()
+            if self.stopped.is_set():
+                break
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            key = tuple(codes)
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+            # Lepas referensi frame supaya objek thread target tidak tertahan
+            del frame, codes
+            time.sleep(self.interval)
+
+    def top(self, limit=20):
+        """
+        List (fungsi, sample kumulatif, sample self) urut kumulatif terbesar
+        """
+        cumulative = {}
+        own = {}
+        for stack, count in self.stacks.items():
+            own[stack[0]] = own.get(stack[0], 0) + count
+            # Fungsi rekursif dihitung sekali per sample
+            for code in set(stack):
+                cumulative[code] = cumulative.get(code, 0) + count
+        ranked = sorted(cumulative.items(), key=lambda item: -item[1])[:limit]
+        return [(frame_label(code), count, own.get(code, 0)) for code, count in ranked]
+
+    def collapsed(self):
+        """
+        Stack dalam format collapsed (root;...;leaf jumlah), satu per baris
+        """
+        lines = [
+            ';'.join(frame_label(code) for code in reversed(stack)) + f" {count}"
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_collapsed(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(self.collapsed())
+        return path
+
+    def report(self, limit=15):
+        """
+        Ringkasan teks: fungsi teratas menurut persentase sample kumulatif & self
+        """
+        if not self.samples:
+            return "Tidak ada sample"
+        lines = [f"{self.samples} sample dalam {self.elapsed:.1f}s (interval {self.interval * 1000:.0f}ms)",
+                 "kum% self% fungsi"]
+        for label, cumulative, own in self.top(limit):
+            lines.append(f"{cumulative / self.samples * 100:5.1f} {own / self.samples * 100:5.1f} {label}")
+        return "\n".join(lines)
@@ -0,0 +1,159 @@
+"""
+Bangun bar timeframe besar dari bar timeframe terkecil secara lokal.
+
+Bucket bar mengikuti waktu server broker (waktu bar MT5 sudah dalam waktu
+server), jadi H4 mulai di jam 0/4/8/... dan D1 di tengah malam server,
+sama seperti bar dari terminal.
+
+Verifikasi bar per bar terhadap bar terminal:
+    python resampler.py
+    python resampler.py --symbols EURUSD,XAUUSD --count 1000
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from scheduler import timeframe_name, timeframe_seconds
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+
+def resample(rates, timeframe, drop_partial=True):
+    """
+    Agregasi rates (structured array MT5) ke timeframe yang lebih besar.
+    Bucket pertama dibuang jika tidak lengkap (data mulai di tengah bucket);
+    bucket terakhir ikut dikembalikan sebagai bar berjalan.
+    """
+    seconds = timeframe_seconds(timeframe)
+    if len(rates) == 0:
+        return rates[:0].copy()
+
+    times = rates['time']
+    buckets = times - times % seconds
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    if drop_partial and times[0] != buckets[0]:
+        starts = starts[1:]
+    if len(starts) == 0:
+        return rates[:0].copy()
+
+    rates = rates[starts[0]:]
+    first = starts - starts[0]
+    last = np.append(first[1:] - 1, len(rates) - 1)
+
+    bars = np.zeros(len(first), dtype=rates.dtype)
+    bars['time'] = buckets[starts]
+    bars['open'] = rates['open'][first]
+    bars['high'] = np.maximum.reduceat(rates['high'], first)
+    bars['low'] = np.minimum.reduceat(rates['low'], first)
+    bars['close'] = rates['close'][last]
+    bars['tick_volume'] = np.add.reduceat(rates['tick_volume'], first)
+    bars['spread'] = np.minimum.reduceat(rates['spread'], first)
+    bars['real_volume'] = np.add.reduceat(rates['real_volume'], first)
+    return bars
+
+
+def source_bars(base_timeframe, timeframes, count):
+    """
+    Jumlah bar base_timeframe yang dibutuhkan supaya setiap timeframe dapat `count` bar lengkap
+    """
+    ratio = max(timeframe_seconds(tf) // timeframe_seconds(base_timeframe) for tf in timeframes)
+    return (count + 1) * ratio
+
+
+def verify(terminal, symbol, base_timeframe, timeframe, count=500):
+    """
+    Bandingkan bar hasil resample dengan bar dari terminal, bar per bar.
+    Bar berjalan (terakhir) tidak dibandingkan karena bisa berubah di antara dua request.
+    """
+    base = terminal.copy_rates_from_pos(symbol, base_timeframe, 0, source_bars(base_timeframe, [timeframe], count))
+    remote = terminal.copy_rates_from_pos(symbol, timeframe, 0, count)
+    if base is None or remote is None or len(base) == 0 or len(remote) == 0:
+        return None
+
+    local = resample(base, timeframe)
+    times = np.intersect1d(local['time'][:-1], remote['time'][:-1])
+    local = local[np.searchsorted(local['time'], times)]
+    remote_common = remote[np.searchsorted(remote['time'], times)]
+
+    # Bar terminal di dalam range data lokal yang tidak bisa dibangun (data base bolong)
+    in_range = remote['time'][:-1]
+    in_range = in_range[(in_range >= times[0]) & (in_range <= times[-1])] if len(times) else in_range[:0]
+    missing = np.setdiff1d(in_range, times)
+
+    price_mismatch = np.zeros(len(times), dtype=bool)
+    max_diff = 0.0
+    for field in PRICE_FIELDS:
+        diff = np.abs(local[field] - remote_common[field])
+        price_mismatch |= ~np.isclose(local[field], remote_common[field], rtol=1e-9, atol=0)
+        if len(diff):
+            max_diff = max(max_diff, float(diff.max()))
+
+    return {
+        'symbol': symbol,
+        'base': timeframe_name(base_timeframe),
+        'timeframe': timeframe_name(timeframe),
+        'compared': len(times),
+        'price_mismatches': int(price_mismatch.sum()),
+        'first_mismatch': int(times[price_mismatch][0]) if price_mismatch.any() else None,
+        'max_price_diff': max_diff,
+        'volume_mismatches': int((local['tick_volume'] != remote_common['tick_volume']).sum()),
+        'missing': len(missing)
+    }
+
+
+def main():
+    import settings
+
+    parser = argparse.ArgumentParser(description="Verifikasi bar hasil resample vs bar terminal")
+    parser.add_argument('--symbols', default='', help="Daftar symbol dipisah koma (default semua)")
+    parser.add_argument('--count', type=int, default=500)
+    parser.add_argument('--config', default='config.json',
+                        help="File pengaturan bot, sama dengan bot live (default jika tidak ada)")
+    args = parser.parse_args()
+
+    try:
+        config = settings.load_settings(args.config)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    # ROBOT_FAKE_MT5=1 memakai terminal palsu, sama seperti app.py
+    if os.environ.get('ROBOT_FAKE_MT5'):
+        import fake_mt5 as mt5
+    else:
+        import MetaTrader5 as mt5
+
+    if not mt5.initialize():
+        print(f"❌ MT5 initialize failed: {mt5.last_error()}")
+        sys.exit(1)
+
+    only = {s for s in args.symbols.split(',') if s}
+    analysis = settings.resolve_timeframes(config['analysis_settings'], lambda name: getattr(mt5, f"TIMEFRAME_{name}"))
+    failed = False
+
+    print(f"{'symbol':<10}{'base':>6}{'tf':>6}{'bars':>7}{'harga beda':>12}{'volume beda':>13}{'hilang':>8}")
+    for instrument_type, symbols in config['trading_pairs'].items():
+        timeframes = analysis[instrument_type]['timeframes']
+        base_tf = min(timeframes, key=timeframe_seconds)
+        for symbol in symbols:
+            if only and symbol not in only:
+                continue
+            for tf in timeframes:
+                if tf == base_tf:
+                    continue
+                result = verify(mt5, symbol, base_tf, tf, args.count)
+                if result is None:
+                    print(f"{symbol:<10}{timeframe_name(base_tf):>6}{timeframe_name(tf):>6}   tidak ada data")
+                    continue
+                failed |= result['price_mismatches'] > 0
+                print(f"{symbol:<10}{result['base']:>6}{result['timeframe']:>6}{result['compared']:>7}"
+                      f"{result['price_mismatches']:>12}{result['volume_mismatches']:>13}{result['missing']:>8}")
+
+    mt5.shutdown()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+import time
+from collections import deque
+
+
+def timeframe_seconds(timeframe):
+    """
+    Durasi satu bar (detik) dari konstanta TIMEFRAME_* MT5.
+    M1-M30 bernilai menit, H1-D1 bernilai 0x4000 | jam. W1/MN1 tidak didukung.
+    """
+    if timeframe < 0x4000:
+        return timeframe * 60
+    if timeframe & 0x8000:
+        raise ValueError(f"Timeframe {timeframe} tidak punya durasi tetap")
+    return (timeframe & 0x3FFF) * 3600
+
+
+# Timeframe tanpa durasi tetap
+_CALENDAR_TIMEFRAMES = {'W1': 0x8000 | 1, 'MN1': 0xC000 | 1}
+
+
+def timeframe_name(timeframe):
+    """
+    Nama timeframe MT5 (M5, H1, D1, ...) dari konstantanya
+    """
+    for name, value in _CALENDAR_TIMEFRAMES.items():
+        if timeframe == value:
+            return name
+    if timeframe < 0x4000:
+        return f"M{timeframe}"
+    hours = timeframe & 0x3FFF
+    return 'D1' if hours == 24 else f"H{hours}"
+
+
+def timeframe_from_name(name):
+    """
+    Konstanta TIMEFRAME_* MT5 dari namanya (kebalikan timeframe_name)
+    """
+    name = name.upper()
+    if name in _CALENDAR_TIMEFRAMES:
+        return _CALENDAR_TIMEFRAMES[name]
+    if name == 'D1':
+        return 0x4000 | 24
+    if name[0] == 'M':
+        return int(name[1:])
+    if name[0] == 'H':
+        return 0x4000 | int(name[1:])
+    raise ValueError(f"Timeframe tidak dikenal: {name}")
+
+
+class ServerClock:
+    """
+    Jam server broker, diestimasi dari waktu tick terakhir.
+
+    Waktu tick selalu <= waktu server, jadi offset diambil dari nilai maksimum
+    beberapa sampel terakhir lalu dibulatkan (zona waktu broker kelipatan 15 menit).
+    """
+
+    def __init__(self, terminal, symbols, refresh_interval=60, granularity=900):
+        self.terminal = terminal
+        self.symbols = list(symbols)
+        self.refresh_interval = refresh_interval
+        self.granularity = granularity
+        self.samples = deque(maxlen=50)
+        self.offset = 0
+        self.last_refresh = None
+
+    def refresh(self):
+        """
+        Ambil sampel offset baru dari tick terakhir semua symbol
+        """
+        local_now = time.time()
+        best = None
+        for symbol in self.symbols:
+            tick = self.terminal.symbol_info_tick(symbol)
+            if tick is None:
+                continue
+            sample = tick.time_msc / 1000.0 - local_now
+            best = sample if best is None else max(best, sample)
+
+        self.last_refresh = local_now
+        if best is not None:
+            self.samples.append(best)
+            self.offset = round(max(self.samples) / self.granularity) * self.granularity
+        return self.offset
+
+    def now(self):
+        """
+        Waktu server saat ini (epoch detik dalam zona waktu server)
+        """
+        if self.last_refresh is None or time.time() - self.last_refresh >= self.refresh_interval:
+            self.refresh()
+        return time.time() + self.offset
+
+
+class BarCloseScheduler:
+    """
+    Tidur sampai bar timeframe berikutnya close (menurut jam server),
+    lalu kembalikan timeframe yang bar-nya close sejak wait() sebelumnya.
+    """
+
+    def __init__(self, clock, grace=1.0, history=1000):
+        self.clock = clock
+        # Jeda setelah close supaya bar baru sudah tersedia di terminal
+        self.grace = grace
+        # Waktu server (dikurangi grace) sampai mana close sudah dikembalikan wait()
+        self.last_close = None
+        # Detik antara close bar dan bangun, di luar grace
+        self.lateness = deque(maxlen=history)
+        self.stats = {
+            'wakeups': 0,
+            'max_lateness': 0.0,
+            'missed': 0
+        }
+
+    def next_close(self, timeframes, now=None):
+        """
+        Waktu server close bar berikutnya dari semua timeframe
+        """
+        if now is None:
+            now = self.clock.now()
+        closes = []
+        for tf in timeframes:
+            seconds = timeframe_seconds(tf)
+            closes.append((int(now) // seconds + 1) * seconds)
+        return min(closes)
+
+    def closed_since(self, timeframes, since, until):
+        """
+        Timeframe yang punya bar close di (since, until] dan waktu close tertuanya
+        """
+        due = []
+        oldest = None
+        for tf in timeframes:
+            seconds = timeframe_seconds(tf)
+            first = (int(since) // seconds + 1) * seconds
+            if first <= until:
+                due.append(tf)
+                oldest = first if oldest is None else min(oldest, first)
+        return due, oldest
+
+    def wait(self, timeframes, keep_running=None, poll=1.0):
+        """
+        Tunggu close bar berikutnya. Return list timeframe yang bar-nya close sejak
+        wait() sebelumnya, termasuk close yang terlewat selama pass yang lama (langsung
+        return tanpa tidur), atau list kosong jika keep_running() menjadi False.
+        """
+        now = self.clock.now()
+        if self.last_close is None:
+            self.last_close = now - self.grace
+
+        due, oldest = self.closed_since(timeframes, self.last_close, now - self.grace)
+        if not due:
+            wake_time = self.next_close(timeframes, now) + self.grace
+            while True:
+                remaining = wake_time - self.clock.now()
+                if remaining <= 0:
+                    break
+                if keep_running is not None and not keep_running():
+                    return []
+                time.sleep(min(remaining, poll))
+            now = self.clock.now()
+            due, oldest = self.closed_since(timeframes, self.last_close, now - self.grace)
+        else:
+            self.stats['missed'] += 1
+        self.last_close = now - self.grace
+
+        lateness = now - self.grace - oldest
+        self.lateness.append(lateness)
+        self.stats['wakeups'] += 1
+        self.stats['max_lateness'] = max(self.stats['max_lateness'], lateness)
+        return due
+
+    def lateness_summary(self):
+        """
+        Ringkasan keterlambatan bangun (detik setelah bar close + grace)
+        """
+        if not self.lateness:
+            return None
+        values = sorted(self.lateness)
+        return {
+            'count': len(values),
+            'mean': sum(values) / len(values),
+            'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+            'max': values[-1]
+        }
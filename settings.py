@@ -0,0 +1,344 @@
+"""
+Pengaturan default bot trading, dipakai oleh bot live maupun backtest.
+
+Timeframe ditulis dengan nama MT5 ('M5', 'H1', 'D1', ...) dan dikonversi
+ke konstanta TIMEFRAME_* saat dipakai (lihat resolve_timeframes).
+
+Bot live membaca config.json (load_settings): setiap bagian di file menimpa
+default di sini (dict digabung per key, list diganti utuh), lalu hasilnya
+divalidasi sebelum dipakai. trading_pairs dan daftar symbol per tipe di
+max_spreads diganti utuh supaya instrument/symbol bisa dihapus dari file.
+"""
+import copy
+import json
+import os
+from datetime import datetime
+
+# Risk parameters
+RISK_PARAMS = {
+    'risk_percent': 1.0,
+    'max_daily_loss': 5.0,
+    'max_trades': 5,
+    'max_drawdown': 2.0  # dalam persen
+}
+
+# Spread maksimum (points) per symbol
+MAX_SPREADS = {
+    'forex': {
+        'EURUSD': {'max_spread': 20},
+        'GBPUSD': {'max_spread': 20},
+        'USDJPY': {'max_spread': 20},
+        'AUDUSD': {'max_spread': 25},
+        'USDCAD': {'max_spread': 25}
+    },
+    'metals': {
+        'GOLD': {'max_spread': 100},
+        'GOLD.a': {'max_spread': 100},
+        'GLD': {'max_spread': 100},
+        'XAUUSD': {'max_spread': 100}
+    },
+    'crypto': {
+        'BTCUSD': {'max_spread': 8200},
+        'ETHUSD': {'max_spread': 5000},
+        'LTCUSD': {'max_spread': 5000},
+        'XRPUSD': {'max_spread': 5000}
+    }
+}
+
+# Risk settings per instrument type
+RISK_SETTINGS = {
+    'forex': {
+        'sl_pips': 30,
+        'tp_pips': 60,
+        'risk_percent': 1.0
+    },
+    'metals': {
+        'sl_pips': 100,
+        'tp_pips': 200,
+        'risk_percent': 1.0
+    },
+    'crypto': {
+        'sl_percent': 2.0,
+        'tp_percent': 4.0,
+        'risk_percent': 1.0
+    }
+}
+
+# Konfigurasi pairs yang akan dianalisa
+TRADING_PAIRS = {
+    'forex': ['EURUSD', 'GBPUSD', 'USDJPY'],
+    'metals': ['GOLD', 'GOLD.a', 'GLD', 'XAUUSD'],  # Variasi simbol Gold untuk berbagai broker
+    'crypto': ['BTCUSD', 'ETHUSD', 'LTCUSD', 'XRPUSD']
+}
+
+# Pengaturan analisa per instrument
+ANALYSIS_SETTINGS = {
+    'forex': {
+        'timeframes': ['M5', 'M15', 'H1'],
+        'ma_periods': {'fast': 20, 'slow': 50},
+        'rsi_period': 14,
+        'bb_period': 20,
+        'macd_settings': {'fast': 12, 'slow': 26, 'signal': 9}
+    },
+    'metals': {
+        'timeframes': ['M15', 'H1', 'H4'],
+        'ma_periods': {'fast': 20, 'slow': 50},
+        'rsi_period': 14,
+        'bb_period': 20,
+        'macd_settings': {'fast': 12, 'slow': 26, 'signal': 9}
+    },
+    'crypto': {
+        'timeframes': ['H1', 'H4', 'D1'],
+        'ma_periods': {'fast': 10, 'slow': 30},
+        'rsi_period': 14,
+        'bb_period': 20,
+        'macd_settings': {'fast': 12, 'slow': 26, 'signal': 9}
+    }
+}
+
+# Trailing parameters
+TRAILING_PARAMS = {
+    'enabled': True,
+    'start_pips': 20,
+    'step_pips': 10,
+    'min_step': 5
+}
+
+
+# Filter kondisi pasar (jam trading lokal HH:MM, spread maksimum dalam pips)
+MARKET_FILTERS = {
+    'trading_hours': {'start': '09:00', 'end': '17:00'},
+    'max_spread': 3.0
+}
+
+# Timeframe yang didukung (durasi bar tetap)
+TIMEFRAME_NAMES = ('M1', 'M2', 'M3', 'M4', 'M5', 'M6', 'M10', 'M12', 'M15', 'M20', 'M30',
+                   'H1', 'H2', 'H3', 'H4', 'H6', 'H8', 'H12', 'D1')
+
+
+def default_settings():
+    """
+    Salinan semua pengaturan default (aman untuk diubah)
+    """
+    return copy.deepcopy({
+        'risk_params': RISK_PARAMS,
+        'max_spreads': MAX_SPREADS,
+        'risk_settings': RISK_SETTINGS,
+        'trading_pairs': TRADING_PAIRS,
+        'analysis_settings': ANALYSIS_SETTINGS,
+        'market_filters': MARKET_FILTERS,
+        'trailing_params': TRAILING_PARAMS
+    })
+
+
+# Bagian yang diganti utuh dari config.json (bukan digabung per key) supaya file
+# bisa menghapus instrument/symbol; '*' berarti semua key di level tersebut
+REPLACED_PATHS = (
+    ('trading_pairs',),
+    ('max_spreads', '*')
+)
+
+
+def _is_replaced(path):
+    return any(
+        len(pattern) == len(path) and all(part in ('*', key) for part, key in zip(pattern, path))
+        for pattern in REPLACED_PATHS
+    )
+
+
+def merge_settings(base, overrides, path=()):
+    """
+    Gabungkan overrides ke salinan base: dict digabung rekursif kecuali path di
+    REPLACED_PATHS, nilai lain diganti
+    """
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        key_path = path + (key,)
+        if isinstance(value, dict) and isinstance(merged.get(key), dict) and not _is_replaced(key_path):
+            merged[key] = merge_settings(merged[key], value, key_path)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def load_settings(path, overrides=None):
+    """
+    Default + isi config.json (jika ada) + overrides, sudah divalidasi.
+    ValueError jika file rusak atau ada pengaturan yang tidak valid.
+    """
+    config = default_settings()
+    if path and os.path.exists(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                loaded = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: JSON tidak valid ({e})")
+        if not isinstance(loaded, dict):
+            raise ValueError(f"{path}: isi harus object JSON")
+        unknown = sorted(set(loaded) - set(config))
+        if unknown:
+            raise ValueError(f"{path}: bagian tidak dikenal: {', '.join(unknown)}")
+        config = merge_settings(config, loaded)
+    if overrides:
+        config = merge_settings(config, overrides)
+
+    errors = validate_settings(config)
+    if errors:
+        raise ValueError("; ".join(errors))
+    return config
+
+
+def _is_number(value, minimum=0.0, strict=True):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    return value > minimum if strict else value >= minimum
+
+
+def _is_period(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 2
+
+
+def _parse_hour(value):
+    return datetime.strptime(value, '%H:%M').time()
+
+
+def _section(config, key, errors):
+    """
+    config[key] jika berupa dict, selain itu catat error dan return None
+    """
+    value = config.get(key)
+    if isinstance(value, dict):
+        return value
+    errors.append(f"{key} harus object")
+    return None
+
+
+def validate_settings(config):
+    """
+    List pesan error (kosong jika valid). Tipe setiap bagian dicek dulu sehingga
+    config.json yang salah bentuk dilaporkan sebagai error, bukan exception.
+    """
+    errors = []
+    if not isinstance(config, dict):
+        return ["config harus object"]
+
+    risk = _section(config, 'risk_params', errors)
+    if risk is not None:
+        for key in ('risk_percent', 'max_daily_loss', 'max_drawdown'):
+            if not _is_number(risk.get(key)):
+                errors.append(f"risk_params.{key} harus angka > 0")
+        if not (_is_number(risk.get('max_trades')) and isinstance(risk['max_trades'], int)):
+            errors.append("risk_params.max_trades harus bilangan bulat >= 1")
+
+    pairs = _section(config, 'trading_pairs', errors)
+    spreads = _section(config, 'max_spreads', errors)
+    risk_settings = _section(config, 'risk_settings', errors)
+    analysis_settings = _section(config, 'analysis_settings', errors)
+
+    seen = {}
+    for instrument_type, symbols in (pairs or {}).items():
+        if not isinstance(symbols, list) or not all(isinstance(symbol, str) and symbol for symbol in symbols):
+            errors.append(f"trading_pairs.{instrument_type} harus list nama symbol")
+            continue
+        for section, values in (('analysis_settings', analysis_settings), ('risk_settings', risk_settings),
+                                ('max_spreads', spreads)):
+            if values is not None and instrument_type not in values:
+                errors.append(f"{section}.{instrument_type} tidak ada untuk trading_pairs.{instrument_type}")
+        for symbol in symbols:
+            if symbol in seen:
+                errors.append(f"{symbol} ada di trading_pairs.{seen[symbol]} dan trading_pairs.{instrument_type}")
+            seen[symbol] = instrument_type
+
+    for instrument_type, symbols in (spreads or {}).items():
+        prefix = f"max_spreads.{instrument_type}"
+        if not isinstance(symbols, dict):
+            errors.append(f"{prefix} harus object")
+            continue
+        for symbol, spread in symbols.items():
+            if not (isinstance(spread, dict) and _is_number(spread.get('max_spread'))):
+                errors.append(f"{prefix}.{symbol} harus object dengan max_spread angka > 0")
+        traded = (pairs or {}).get(instrument_type)
+        if isinstance(traded, list):
+            for symbol in traded:
+                if symbol not in symbols:
+                    errors.append(f"{prefix}.{symbol} tidak ada untuk trading_pairs.{instrument_type}")
+
+    for instrument_type, risk in (risk_settings or {}).items():
+        if not isinstance(risk, dict):
+            errors.append(f"risk_settings.{instrument_type} harus object")
+            continue
+        # Crypto memakai persen harga, instrument lain pips (strategy.order_levels)
+        keys = ('sl_percent', 'tp_percent') if instrument_type == 'crypto' else ('sl_pips', 'tp_pips')
+        for key in keys + ('risk_percent',):
+            if not _is_number(risk.get(key)):
+                errors.append(f"risk_settings.{instrument_type}.{key} harus angka > 0")
+
+    for instrument_type, analysis in (analysis_settings or {}).items():
+        prefix = f"analysis_settings.{instrument_type}"
+        if not isinstance(analysis, dict):
+            errors.append(f"{prefix} harus object")
+            continue
+        timeframes = analysis.get('timeframes')
+        if not isinstance(timeframes, list) or not timeframes:
+            errors.append(f"{prefix}.timeframes harus list yang tidak kosong")
+        else:
+            invalid = [tf for tf in timeframes if not isinstance(tf, str) or tf not in TIMEFRAME_NAMES]
+            if invalid:
+                errors.append(f"{prefix}.timeframes tidak dikenal: {', '.join(map(str, invalid))}")
+            if len(set(map(str, timeframes))) != len(timeframes):
+                errors.append(f"{prefix}.timeframes berisi duplikat")
+        for key in ('rsi_period', 'bb_period'):
+            if not _is_period(analysis.get(key)):
+                errors.append(f"{prefix}.{key} harus bilangan bulat >= 2")
+        ma = analysis.get('ma_periods')
+        if not (isinstance(ma, dict) and _is_period(ma.get('fast')) and _is_period(ma.get('slow'))
+                and ma['fast'] < ma['slow']):
+            errors.append(f"{prefix}.ma_periods: fast & slow bilangan bulat >= 2, fast < slow")
+        macd = analysis.get('macd_settings')
+        if not (isinstance(macd, dict) and _is_period(macd.get('fast')) and _is_period(macd.get('slow'))
+                and macd['fast'] < macd['slow'] and _is_period(macd.get('signal'))):
+            errors.append(f"{prefix}.macd_settings: fast, slow & signal bilangan bulat >= 2, fast < slow")
+
+    filters = _section(config, 'market_filters', errors)
+    if filters is not None:
+        hours = filters.get('trading_hours')
+        try:
+            if _parse_hour(hours['start']) >= _parse_hour(hours['end']):
+                errors.append("market_filters.trading_hours.start harus sebelum end")
+        except (KeyError, TypeError, ValueError):
+            errors.append("market_filters.trading_hours.start/end harus jam HH:MM")
+        if not _is_number(filters.get('max_spread')):
+            errors.append("market_filters.max_spread harus angka > 0")
+
+    trailing = _section(config, 'trailing_params', errors)
+    if trailing is not None:
+        if not isinstance(trailing.get('enabled'), bool):
+            errors.append("trailing_params.enabled harus true/false")
+        for key in ('start_pips', 'step_pips', 'min_step'):
+            if not _is_number(trailing.get(key), strict=False):
+                errors.append(f"trailing_params.{key} harus angka >= 0")
+
+    return errors
+
+
+def resolve_timeframes(analysis_settings, to_timeframe):
+    """
+    Ganti nama timeframe di analysis_settings dengan konstanta dari to_timeframe(name)
+    """
+    resolved = copy.deepcopy(analysis_settings)
+    for settings in resolved.values():
+        settings['timeframes'] = [
+            to_timeframe(tf) if isinstance(tf, str) else tf for tf in settings['timeframes']
+        ]
+    return resolved
+
+
+def resolve_market_filters(market_filters):
+    """
+    Salinan market_filters dengan jam trading sebagai datetime.time
+    """
+    resolved = copy.deepcopy(market_filters)
+    hours = resolved['trading_hours']
+    hours['start'] = _parse_hour(hours['start'])
+    hours['end'] = _parse_hour(hours['end'])
+    return resolved
@@ -0,0 +1,315 @@
+"""
+Buffer bar di shared memory supaya process lain (worker analisa, dashboard)
+bisa membaca bar live tanpa pickle/copy.
+
+Setiap (symbol, timeframe) adalah satu blok multiprocessing.shared_memory
+bernama <prefix>_<SYMBOL>_<TF> dengan layout tetap:
+- header (64 byte): seq, slot, size, depth, closed
+- 2 * depth bar RATES_DTYPE, ditulis dua kali seperti BarBuffer sehingga
+  `count` bar terakhir selalu satu view numpy yang contiguous
+
+Satu writer (BarCache process utama) per blok. Writer menaikkan `seq` jadi
+ganjil sebelum menulis dan genap lagi sesudahnya (seqlock). Reader mencatat
+`seq` sebelum memakai view dan mengecek lagi sesudahnya; jika berubah, data
+yang dibaca mungkin sobek dan pembacaan diulang.
+
+Writer mengisi `closed` sebelum blok di-unlink (depth berubah atau bot
+berhenti). Reader yang melihatnya melepas mapping lama dan attach ulang ke
+blok terbaru dengan nama yang sama.
+
+Contoh di process lain:
+    bars = SharedBars('robot')
+    scores = bars.consume('EURUSD', mt5.TIMEFRAME_M5, 100,
+                          lambda rates: strategy.batch_scores([rates], params))
+
+    python shared_bars.py watch --prefix robot --symbol EURUSD --timeframe M5
+"""
+import argparse
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from bar_cache import RATES_DTYPE, BarBuffer
+from scheduler import timeframe_from_name, timeframe_name
+
+HEADER_DTYPE = np.dtype([
+    ('seq', '<u8'),
+    ('slot', '<i8'),
+    ('size', '<i8'),
+    ('depth', '<i8'),
+    ('closed', '<i8')
+])
+# Data bar mulai di cache line berikutnya
+HEADER_SIZE = 64
+
+
+class TornRead(Exception):
+    """
+    Pembacaan terus bertabrakan dengan writer sampai batas percobaan habis
+    """
+
+
+def block_name(prefix, symbol, timeframe):
+    return f"{prefix}_{symbol}_{timeframe_name(timeframe)}"
+
+
+def _attach(name):
+    """
+    Buka blok yang sudah ada tanpa mendaftarkannya ke resource tracker. Di Python
+    < 3.13 tracker meng-unlink blok milik writer saat reader keluar, dan process
+    spawn memakai tracker yang sama dengan parent-nya sehingga unregister juga salah.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None if rtype == 'shared_memory' else register(name, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedBarBuffer(BarBuffer):
+    """
+    BarBuffer di shared memory. Writer: create=True; reader: create=False (depth dari header).
+    """
+
+    def __init__(self, name, depth=None, create=False):
+        if create:
+            size = HEADER_SIZE + 2 * depth * RATES_DTYPE.itemsize
+            try:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # Sisa process writer sebelumnya yang mati tanpa unlink
+                stale = _attach(name)
+                stale.close()
+                stale.unlink()
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self.shm = _attach(name)
+
+        self.name = name
+        self.owner = create
+        self.header = np.ndarray(1, dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        if create:
+            self.header['seq'] = 0
+            self.header['slot'] = -1
+            self.header['size'] = 0
+            self.header['depth'] = depth
+            self.header['closed'] = 0
+        self.depth = int(self.header['depth'][0])
+        self.data = np.ndarray(2 * self.depth, dtype=RATES_DTYPE, buffer=self.shm.buf, offset=HEADER_SIZE)
+
+    @property
+    def slot(self):
+        return int(self.header['slot'][0])
+
+    @slot.setter
+    def slot(self, value):
+        self.header['slot'] = value
+
+    @property
+    def size(self):
+        return int(self.header['size'][0])
+
+    @size.setter
+    def size(self, value):
+        self.header['size'] = value
+
+    @property
+    def seq(self):
+        return int(self.header['seq'][0])
+
+    @property
+    def closed(self):
+        """
+        True jika writer sudah melepas blok ini (reader harus attach ulang)
+        """
+        return self.header is None or bool(self.header['closed'][0])
+
+    def append(self, bars):
+        self.header['seq'] += 1
+        try:
+            super().append(bars)
+        finally:
+            self.header['seq'] += 1
+
+    def replace_last(self, bar):
+        self.header['seq'] += 1
+        try:
+            super().replace_last(bar)
+        finally:
+            self.header['seq'] += 1
+
+    def reset(self):
+        """
+        Kosongkan buffer (load ulang setelah gap), reader melihat size 0
+        """
+        self.header['seq'] += 1
+        self.header['slot'] = -1
+        self.header['size'] = 0
+        self.header['seq'] += 1
+
+    def consume(self, count, function, retries=100):
+        """
+        Panggil function(view `count` bar terakhir) tanpa copy, ulangi jika writer
+        menulis selama function berjalan. Return hasil function dari data yang konsisten,
+        None jika buffer kosong (mis. baru di-reset writer sebelum append).
+        """
+        for _ in range(retries):
+            seq = self.seq
+            if seq & 1:
+                # Writer sedang menulis
+                time.sleep(0)
+                continue
+            if self.size == 0:
+                if self.seq == seq:
+                    return None
+                continue
+            try:
+                result = function(self.view(count))
+            except Exception:
+                # Error dari data sobek diulang; error dengan data konsisten milik pemanggil
+                if self.seq == seq:
+                    raise
+                continue
+            if self.seq == seq:
+                return result
+        raise TornRead(f"{self.name}: gagal membaca bar konsisten setelah {retries} percobaan")
+
+    def read(self, count):
+        """
+        Copy `count` bar terakhir yang konsisten (aman disimpan), None jika buffer kosong
+        """
+        return self.consume(count, np.copy)
+
+    def close(self):
+        if self.owner and self.header is not None:
+            # Tanda untuk reader sebelum blok di-unlink/diganti
+            self.header['seq'] += 1
+            self.header['closed'] = 1
+            self.header['seq'] += 1
+        # View numpy ke buffer harus dilepas sebelum shared memory ditutup
+        self.header = None
+        self.data = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # Masih ada view bar yang dipegang pemanggil; mapping dilepas saat process keluar
+            pass
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
+
+
+class SharedBars:
+    """
+    Kumpulan buffer bar di shared memory dengan prefix nama yang sama.
+    Process writer memakai buffer() (lewat BarCache), reader memakai attach()/consume().
+    """
+
+    def __init__(self, prefix='robot'):
+        self.prefix = prefix
+        self.buffers = {}
+
+    def buffer(self, symbol, timeframe, depth):
+        """
+        Buffer writer untuk (symbol, timeframe), dikosongkan jika sudah ada
+        """
+        key = (symbol, timeframe)
+        buffer = self.buffers.get(key)
+        if buffer is not None and buffer.owner and buffer.depth == depth:
+            buffer.reset()
+            return buffer
+        if buffer is not None:
+            buffer.close()
+            buffer.unlink()
+        buffer = self.buffers[key] = SharedBarBuffer(block_name(self.prefix, symbol, timeframe), depth, create=True)
+        return buffer
+
+    def attach(self, symbol, timeframe):
+        """
+        Buffer reader untuk (symbol, timeframe), None jika writer belum membuatnya
+        """
+        key = (symbol, timeframe)
+        buffer = self.buffers.get(key)
+        if buffer is not None and not buffer.owner and buffer.closed:
+            # Writer membuat ulang blok (depth berubah) atau berhenti: lepas mapping lama
+            buffer.close()
+            del self.buffers[key]
+            buffer = None
+        if buffer is None:
+            try:
+                buffer = SharedBarBuffer(block_name(self.prefix, symbol, timeframe))
+            except FileNotFoundError:
+                return None
+            self.buffers[key] = buffer
+        return buffer
+
+    def consume(self, symbol, timeframe, count, function):
+        """
+        function(view bar) pada data live yang konsisten, None jika seri belum ada/kosong
+        """
+        buffer = self.attach(symbol, timeframe)
+        if buffer is None or buffer.closed:
+            return None
+        result = buffer.consume(count, function)
+        # Blok dilepas writer selama dibaca: hasilnya data lama, attach ulang di panggilan berikutnya
+        return None if buffer.closed else result
+
+    def read(self, symbol, timeframe, count):
+        return self.consume(symbol, timeframe, count, np.copy)
+
+    def close(self):
+        """
+        Tutup semua buffer; blok milik writer sekalian di-unlink
+        """
+        for buffer in self.buffers.values():
+            buffer.close()
+            buffer.unlink()
+        self.buffers = {}
+
+
+def main():
+    import indicator_engine
+    import settings
+    import strategy
+
+    parser = argparse.ArgumentParser(description="Baca bar live dari shared memory bot")
+    parser.add_argument('command', choices=('watch',))
+    parser.add_argument('--prefix', default='robot', help="Prefix shared memory (performance_settings)")
+    parser.add_argument('--symbol', required=True)
+    parser.add_argument('--timeframe', default='M5')
+    parser.add_argument('--instrument', default='forex', help="Tipe instrument untuk parameter indikator")
+    parser.add_argument('--interval', type=float, default=1.0)
+    args = parser.parse_args()
+
+    timeframe = timeframe_from_name(args.timeframe)
+    params = indicator_engine.indicator_params(settings.default_settings()['analysis_settings'][args.instrument])
+    bars = SharedBars(args.prefix)
+
+    def score(rates):
+        return len(rates), int(rates['time'][-1]), float(rates['close'][-1]), int(strategy.batch_scores([rates], params)[0])
+
+    try:
+        while True:
+            result = bars.consume(args.symbol, timeframe, 100, score)
+            if result is None:
+                print(f"⏳ {block_name(args.prefix, args.symbol, timeframe)} belum ada")
+            else:
+                count, last_time, close, momentum = result
+                print(f"{np.datetime64(last_time, 's')}  {args.symbol} {args.timeframe}  "
+                      f"close {close}  skor {momentum:+d}  ({count} bar)")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bars.close()
+
+
+if __name__ == '__main__':
+    main()
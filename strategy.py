@@ -0,0 +1,182 @@
+"""
+Aturan strategi yang dipakai bersama oleh analisa live, batch dan backtest.
+
+Semua fungsi bekerja untuk nilai scalar (satu symbol) maupun array numpy
+(banyak symbol sekaligus / seluruh history).
+"""
+import numpy as np
+
+import indicators
+
+# Skor momentum minimal per timeframe untuk dianggap BUY / SELL
+SIGNAL_THRESHOLD = 2
+
+# Minimal porsi timeframe yang harus setuju
+MIN_CONFIDENCE = 0.5
+
+BUY = 1
+SELL = -1
+NEUTRAL = 0
+
+LABELS = {BUY: 'BUY', SELL: 'SELL'}
+
+
+def compute_indicators(close, high, low, tick_volume, params):
+    """
+    Hitung semua indikator yang dipakai momentum_score secara vectorized.
+    Input 1-D (satu series) atau 2-D (satu baris per symbol/timeframe).
+    """
+    close = np.asarray(close, dtype=float)
+    bb_upper, bb_middle, bb_lower = indicators.bollinger_bands(
+        close, params['bb_period'], params['bb_std']
+    )
+    macd_line, signal_line = indicators.macd(
+        close, params['macd_fast'], params['macd_slow'], params['macd_signal']
+    )
+    return {
+        'close': close,
+        'tick_volume': np.asarray(tick_volume, dtype=float),
+        'ema_fast': indicators.ema(close, params['ema_fast']),
+        'ema_slow': indicators.ema(close, params['ema_slow']),
+        'rsi': indicators.rsi(close, params['rsi_period']),
+        'bb_upper': bb_upper,
+        'bb_middle': bb_middle,
+        'bb_lower': bb_lower,
+        'macd': macd_line,
+        'macd_signal': signal_line,
+        'atr': indicators.atr(high, low, close, params['atr_period'])
+    }
+
+
+def at_bar(frame, index):
+    """
+    Ambil nilai semua indikator pada satu index bar (axis terakhir)
+    """
+    return {name: values[..., index] for name, values in frame.items()}
+
+
+def momentum_score(current, previous):
+    """
+    Skor momentum satu timeframe dari nilai indikator bar sekarang & sebelumnya
+    """
+    c, p = current, previous
+
+    # 1. Trend Direction (EMA)
+    score = np.greater(c['ema_fast'], c['ema_slow']).astype(int)
+    score = score - np.less(c['ema_fast'], c['ema_slow'])
+
+    # 2. RSI, hanya dihitung di range normal 30-70
+    rsi = c['rsi']
+    rsi_normal = np.greater_equal(rsi, 30) & np.less_equal(rsi, 70)
+    score = score + np.where(rsi_normal, np.where(np.greater(rsi, 50), 1, -1), 0)
+
+    # 3. Bollinger Bands
+    score = score - np.greater(c['close'], c['bb_upper'])
+    score = score + np.less(c['close'], c['bb_lower'])
+
+    # 4. MACD crossover
+    cross_up = np.greater(c['macd'], c['macd_signal']) & np.less_equal(p['macd'], p['macd_signal'])
+    cross_down = np.less(c['macd'], c['macd_signal']) & np.greater_equal(p['macd'], p['macd_signal'])
+    score = score + 2 * cross_up - 2 * cross_down
+
+    # 5. Volume
+    score = score + np.greater(c['tick_volume'], p['tick_volume'])
+    return score
+
+
+def signal_direction(score):
+    """
+    Arah sinyal timeframe dari skor momentum: BUY (1), SELL (-1) atau NEUTRAL (0)
+    """
+    return np.where(np.greater_equal(score, SIGNAL_THRESHOLD), BUY,
+                    np.where(np.less_equal(score, -SIGNAL_THRESHOLD), SELL, NEUTRAL))
+
+
+def combine_directions(directions, timeframe_count=None):
+    """
+    Gabungkan arah sinyal semua timeframe (axis terakhir).
+    Return (action, confidence); action NEUTRAL jika confidence < MIN_CONFIDENCE.
+    """
+    directions = np.asarray(directions)
+    if timeframe_count is None:
+        timeframe_count = directions.shape[-1]
+    buy_signals = np.count_nonzero(directions == BUY, axis=-1)
+    sell_signals = np.count_nonzero(directions == SELL, axis=-1)
+    confidence = np.maximum(buy_signals, sell_signals) / timeframe_count
+    action = np.where(buy_signals > sell_signals, BUY, SELL)
+    action = np.where(confidence >= MIN_CONFIDENCE, action, NEUTRAL)
+    return action, confidence
+
+
+def batch_scores(rates_list, params, forming=False):
+    """
+    Skor momentum untuk banyak series rates sekaligus.
+    Semua series dipotong ke panjang yang sama lalu ditumpuk jadi matrix 2-D.
+    Bar terakhir dianggap bar berjalan; yang dinilai bar close terakhir
+    (atau bar berjalan jika forming=True), sama seperti analyze_market.
+    """
+    length = min(len(rates) for rates in rates_list)
+    stacked = np.stack([rates[-length:] for rates in rates_list])
+    frame = compute_indicators(
+        stacked['close'], stacked['high'], stacked['low'], stacked['tick_volume'], params
+    )
+    index = -1 if forming else -2
+    return momentum_score(at_bar(frame, index), at_bar(frame, index - 1))
+
+
+def series_scores(frame):
+    """
+    Skor momentum setiap bar dalam history (bar pertama selalu 0)
+    """
+    current = {name: values[..., 1:] for name, values in frame.items()}
+    previous = {name: values[..., :-1] for name, values in frame.items()}
+    scores = np.zeros(frame['close'].shape, dtype=int)
+    scores[..., 1:] = momentum_score(current, previous)
+    return scores
+
+
+def order_levels(action, price, point, instrument_type, risk):
+    """
+    Hitung SL & TP order. Crypto memakai persen harga, instrument lain pips.
+    Return (sl, tp, sl_distance).
+    """
+    if instrument_type == 'crypto':
+        sl_distance = price * (risk['sl_percent'] / 100)
+        tp_distance = price * (risk['tp_percent'] / 100)
+    else:
+        sl_distance = risk['sl_pips'] * point
+        tp_distance = risk['tp_pips'] * point
+
+    if action == 'BUY':
+        return price - sl_distance, price + tp_distance, sl_distance
+    return price + sl_distance, price - tp_distance, sl_distance
+
+
+def position_size(balance, risk_percent, stop_loss_pips, tick_value, digits, volume_max):
+    """
+    Ukuran lot supaya kerugian saat SL kena = risk_percent dari balance
+    """
+    risk_amount = balance * risk_percent / 100
+    pip_value = tick_value * (10 if digits == 3 else 1)
+    lot_size = round(risk_amount / (stop_loss_pips * pip_value), 2)
+    return max(0.01, min(lot_size, volume_max))
+
+
+def trailing_stop_levels(is_buy, price_current, sl, profit_pips, point, trailing_params):
+    """
+    SL baru untuk trailing stop, NaN jika SL tidak perlu digeser
+    """
+    step = trailing_params['step_pips'] * point
+    min_step = trailing_params['min_step'] * point
+    potential = np.where(is_buy, price_current - step, price_current + step)
+    improves = np.where(is_buy, potential > sl + min_step, potential < sl - min_step)
+    active = np.greater_equal(profit_pips, trailing_params['start_pips']) & improves
+    return np.where(active, potential, np.nan)
+
+
+def drawdown_breach(profit, balance, max_drawdown):
+    """
+    Drawdown posisi (% balance) dan apakah sudah melewati batas max_drawdown
+    """
+    drawdown = np.where(np.less(profit, 0), np.abs(profit) / balance * 100, 0.0)
+    return drawdown, drawdown >= max_drawdown
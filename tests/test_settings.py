@@ -0,0 +1,52 @@
+import json
+
+import settings
+
+
+def write_config(tmp_path, content):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps(content), encoding='utf-8')
+    return str(path)
+
+
+def test_config_bisa_menghapus_instrument_type(tmp_path):
+    path = write_config(tmp_path, {
+        'trading_pairs': {'forex': ['EURUSD'], 'metals': ['XAUUSD']}
+    })
+    config = settings.load_settings(path)
+    assert config['trading_pairs'] == {'forex': ['EURUSD'], 'metals': ['XAUUSD']}
+
+
+def test_config_bisa_menghapus_symbol_di_max_spreads(tmp_path):
+    path = write_config(tmp_path, {
+        'trading_pairs': {'forex': ['EURUSD']},
+        'max_spreads': {'forex': {'EURUSD': {'max_spread': 15}}}
+    })
+    config = settings.load_settings(path)
+    assert config['max_spreads']['forex'] == {'EURUSD': {'max_spread': 15}}
+    # Tipe yang tidak disebut tetap memakai default
+    assert config['max_spreads']['metals'] == settings.MAX_SPREADS['metals']
+
+
+def test_bagian_nested_tetap_digabung(tmp_path):
+    path = write_config(tmp_path, {
+        'risk_settings': {'forex': {'sl_pips': 40}},
+        'market_filters': {'trading_hours': {'start': '08:00'}}
+    })
+    config = settings.load_settings(path)
+    assert config['risk_settings']['forex'] == {'sl_pips': 40, 'tp_pips': 60, 'risk_percent': 1.0}
+    assert config['market_filters']['trading_hours'] == {'start': '08:00', 'end': '17:00'}
+
+
+def test_tipe_salah_dilaporkan_sebagai_error():
+    config = settings.merge_settings(settings.default_settings(), {
+        'risk_params': 5,
+        'max_spreads': {'forex': {'EURUSD': 3}},
+        'analysis_settings': {'forex': {'ma_periods': [20, 50]}},
+        'trailing_params': None
+    })
+    errors = settings.validate_settings(config)
+    assert "risk_params harus object" in errors
+    assert "trailing_params harus object" in errors
+    assert any(error.startswith("max_spreads.forex.EURUSD") for error in errors)
+    assert any(error.startswith("analysis_settings.forex.ma_periods") for error in errors)
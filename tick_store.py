@@ -0,0 +1,542 @@
+"""
+Rekam dan putar ulang tick dalam format biner delta-compressed.
+
+Tick disimpan per symbol per hari (waktu server):
+    <root>/<SYMBOL>/<YYYYMMDD>.tick   chunk tick terkompresi, append-only
+    <root>/<SYMBOL>/<YYYYMMDD>.idx    index per chunk: offset, ukuran, jumlah tick,
+                                      time_msc pertama & terakhir
+
+Di dalam chunk setiap kolom di-encode sebagai nilai pertama + delta antar tick.
+Harga diubah ke integer (harga * 10^digits) dulu; lebar delta per kolom (0, 1, 2,
+4 atau 8 byte) dipilih sekecil mungkin, lalu seluruh chunk dikompres zlib.
+Decode cukup cumsum numpy per kolom. Seperti bar_store, data ditulis dulu baru
+record index-nya, jadi reader hanya melihat chunk yang lengkap.
+
+Contoh:
+    python tick_store.py record --store ticks/
+    python tick_store.py record --store ticks/ --symbols XAUUSD,BTCUSD --since 24
+    python tick_store.py info --store ticks/
+    python tick_store.py replay --store ticks/ --symbols XAUUSD,BTCUSD --speed 0
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+MAGIC = b'RTCK'
+VERSION = 1
+
+# Layout tick dari copy_ticks_* MT5
+TICK_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('last', '<f8'),
+    ('volume', '<u8'),
+    ('time_msc', '<i8'),
+    ('flags', '<u4'),
+    ('volume_real', '<f8')
+])
+
+INDEX_DTYPE = np.dtype([
+    ('offset', '<u8'),
+    ('size', '<u4'),
+    ('count', '<u4'),
+    ('first_msc', '<i8'),
+    ('last_msc', '<i8')
+])
+
+# Kolom yang di-encode delta; harga diskalakan dengan 10^digits
+DELTA_COLUMNS = ('time_msc', 'bid', 'ask', 'last', 'volume', 'flags')
+PRICE_COLUMNS = ('bid', 'ask', 'last')
+
+# Header chunk: magic, versi, jumlah tick, digits, lalu per kolom nilai pertama & lebar delta.
+# Lebar RAW_FLOAT berarti kolom harga tidak pas di grid digits dan disimpan apa adanya.
+RAW_FLOAT = 255
+CHUNK_DTYPE = np.dtype([
+    ('magic', 'S4'),
+    ('version', '<u2'),
+    ('digits', '<u2'),
+    ('count', '<u4'),
+    ('widths', 'u1', (len(DELTA_COLUMNS),)),
+    ('firsts', '<i8', (len(DELTA_COLUMNS),))
+])
+
+DAY_MSC = 86_400_000
+
+
+def _width(deltas):
+    """
+    Lebar integer terkecil (byte) yang muat semua delta, 0 jika semua delta 0
+    """
+    if len(deltas) == 0 or not deltas.any():
+        return 0
+    low, high = int(deltas.min()), int(deltas.max())
+    for width in (1, 2, 4):
+        limit = 1 << (8 * width - 1)
+        if -limit <= low and high < limit:
+            return width
+    return 8
+
+
+def encode_chunk(ticks, digits, level=1):
+    """
+    Structured array tick MT5 -> bytes satu chunk
+    """
+    count = len(ticks)
+    scale = 10.0 ** digits
+    header = np.zeros(1, dtype=CHUNK_DTYPE)
+    header['magic'] = MAGIC
+    header['version'] = VERSION
+    header['digits'] = digits
+    header['count'] = count
+
+    parts = []
+    for i, name in enumerate(DELTA_COLUMNS):
+        values = ticks[name]
+        if name in PRICE_COLUMNS:
+            scaled = np.rint(values * scale)
+            # Harga yang tidak kembali persis setelah dibagi 10^digits disimpan mentah
+            if not np.array_equal(scaled / scale, values):
+                header['widths'][0, i] = RAW_FLOAT
+                parts.append(np.ascontiguousarray(values, dtype='<f8').tobytes())
+                continue
+            values = scaled
+        values = values.astype(np.int64)
+        header['firsts'][0, i] = values[0] if count else 0
+        deltas = np.diff(values)
+        width = _width(deltas)
+        header['widths'][0, i] = width
+        if width:
+            parts.append(deltas.astype(f'<i{width}').tobytes())
+
+    parts.append(np.ascontiguousarray(ticks['volume_real'], dtype='<f8').tobytes())
+    return zlib.compress(header.tobytes() + b''.join(parts), level)
+
+
+def decode_chunk(data):
+    """
+    Bytes satu chunk -> structured array tick MT5
+    """
+    raw = zlib.decompress(data)
+    header = np.frombuffer(raw, dtype=CHUNK_DTYPE, count=1)[0]
+    if header['magic'] != MAGIC or header['version'] != VERSION:
+        raise ValueError("Format chunk tick tidak dikenal")
+
+    count = int(header['count'])
+    scale = 10.0 ** int(header['digits'])
+    ticks = np.zeros(count, dtype=TICK_DTYPE)
+    offset = CHUNK_DTYPE.itemsize
+    for i, name in enumerate(DELTA_COLUMNS):
+        width = int(header['widths'][i])
+        if width == RAW_FLOAT:
+            ticks[name] = np.frombuffer(raw, dtype='<f8', count=count, offset=offset)
+            offset += 8 * count
+            continue
+
+        values = np.full(count, header['firsts'][i], dtype=np.int64)
+        if width and count > 1:
+            deltas = np.frombuffer(raw, dtype=f'<i{width}', count=count - 1, offset=offset)
+            offset += width * (count - 1)
+            np.cumsum(deltas, dtype=np.int64, out=values[1:])
+            values[1:] += header['firsts'][i]
+        ticks[name] = values / scale if name in PRICE_COLUMNS else values
+
+    ticks['volume_real'] = np.frombuffer(raw, dtype='<f8', count=count, offset=offset)
+    ticks['time'] = ticks['time_msc'] // 1000
+    return ticks
+
+
+def day_name(day):
+    return datetime.fromtimestamp(day * 86400, tz=timezone.utc).strftime('%Y%m%d')
+
+
+class TickWriter:
+    """
+    Penulis tick append-only. Tick ditampung per symbol lalu ditulis sebagai
+    satu chunk setiap `chunk_ticks` tick, atau saat flush().
+    """
+
+    def __init__(self, root, chunk_ticks=65536, level=1):
+        self.root = root
+        self.chunk_ticks = chunk_ticks
+        self.level = level
+        self.pending = {}
+        self.digits = {}
+        self.lock = threading.Lock()
+        self.stats = {
+            'ticks': 0,
+            'chunks': 0,
+            'bytes': 0
+        }
+        os.makedirs(root, exist_ok=True)
+
+    def append(self, symbol, ticks, digits):
+        """
+        Tambahkan tick (urut waktu) untuk symbol
+        """
+        if ticks is None or len(ticks) == 0:
+            return
+        with self.lock:
+            self.digits[symbol] = digits
+            self.pending.setdefault(symbol, []).append(np.asarray(ticks, dtype=TICK_DTYPE))
+            if sum(len(part) for part in self.pending[symbol]) >= self.chunk_ticks:
+                self._flush(symbol)
+
+    def flush(self):
+        with self.lock:
+            for symbol in list(self.pending):
+                self._flush(symbol)
+
+    def _flush(self, symbol):
+        parts = self.pending.pop(symbol, None)
+        if not parts:
+            return
+        ticks = np.concatenate(parts)
+        # Pisah per hari server supaya satu file = satu hari
+        days = ticks['time_msc'] // DAY_MSC
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        for part in np.split(ticks, bounds):
+            for start in range(0, len(part), self.chunk_ticks):
+                self._write_chunk(symbol, part[start:start + self.chunk_ticks])
+
+    def _write_chunk(self, symbol, ticks):
+        folder = os.path.join(self.root, symbol)
+        os.makedirs(folder, exist_ok=True)
+        base = os.path.join(folder, day_name(int(ticks['time_msc'][0] // DAY_MSC)))
+        data = encode_chunk(ticks, self.digits[symbol], self.level)
+
+        index_path = base + '.idx'
+        committed = os.path.getsize(index_path) // INDEX_DTYPE.itemsize if os.path.exists(index_path) else 0
+        with open(base + '.tick', 'ab+') as f:
+            # Potong sisa tulisan yang tidak punya record index (process mati di tengah tulis)
+            end = 0
+            if committed:
+                last = np.fromfile(index_path, dtype=INDEX_DTYPE, count=committed)[-1]
+                end = int(last['offset']) + int(last['size'])
+            f.truncate(end)
+            f.seek(end)
+            f.write(data)
+            f.flush()
+
+        record = np.zeros(1, dtype=INDEX_DTYPE)
+        record['offset'] = end
+        record['size'] = len(data)
+        record['count'] = len(ticks)
+        record['first_msc'] = ticks['time_msc'][0]
+        record['last_msc'] = ticks['time_msc'][-1]
+        with open(index_path, 'r+b' if committed else 'wb') as f:
+            f.seek(committed * INDEX_DTYPE.itemsize)
+            f.write(record.tobytes())
+
+        self.stats['ticks'] += len(ticks)
+        self.stats['chunks'] += 1
+        self.stats['bytes'] += len(data)
+
+
+class TickReader:
+    """
+    Pembaca tick; chunk yang dibaca dipilih lewat index waktu per chunk
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def symbols(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def days(self, symbol):
+        """
+        Nama file hari (YYYYMMDD) yang ada untuk symbol, urut
+        """
+        folder = os.path.join(self.root, symbol)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(name[:-4] for name in os.listdir(folder) if name.endswith('.idx'))
+
+    def index(self, symbol, day):
+        path = os.path.join(self.root, symbol, f"{day}.idx")
+        # Record terakhir yang belum lengkap diabaikan
+        count = os.path.getsize(path) // INDEX_DTYPE.itemsize
+        return np.fromfile(path, dtype=INDEX_DTYPE, count=count)
+
+    def chunks(self, symbol, start_msc=None, end_msc=None):
+        """
+        Generator array tick per chunk yang overlap dengan [start_msc, end_msc]
+        """
+        for day in self.days(symbol):
+            index = self.index(symbol, day)
+            if start_msc is not None:
+                index = index[index['last_msc'] >= start_msc]
+            if end_msc is not None:
+                index = index[index['first_msc'] <= end_msc]
+            if len(index) == 0:
+                continue
+            with open(os.path.join(self.root, symbol, f"{day}.tick"), 'rb') as f:
+                for record in index:
+                    f.seek(int(record['offset']))
+                    ticks = decode_chunk(f.read(int(record['size'])))
+                    if start_msc is not None or end_msc is not None:
+                        times = ticks['time_msc']
+                        lo = 0 if start_msc is None else int(np.searchsorted(times, start_msc, 'left'))
+                        hi = len(times) if end_msc is None else int(np.searchsorted(times, end_msc, 'right'))
+                        ticks = ticks[lo:hi]
+                    yield ticks
+
+    def read(self, symbol, start_msc=None, end_msc=None):
+        parts = list(self.chunks(symbol, start_msc, end_msc))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=TICK_DTYPE)
+
+    def last_tick(self, symbol):
+        """
+        (time_msc terakhir, jumlah tick di milidetik itu), atau (None, 0)
+        """
+        days = self.days(symbol)
+        if not days:
+            return None, 0
+        index = self.index(symbol, days[-1])
+        if len(index) == 0:
+            return None, 0
+        ticks = next(self.chunks(symbol, int(index['last_msc'][-1]), None))
+        last = int(ticks['time_msc'][-1])
+        return last, int((ticks['time_msc'] == last).sum())
+
+
+class TickRecorder:
+    """
+    Ambil tick semua symbol dari terminal via copy_ticks_from dan tulis ke TickWriter.
+    Melanjutkan dari tick terakhir yang sudah tersimpan tanpa duplikat.
+    """
+
+    def __init__(self, terminal, symbols, writer, since=None, max_ticks=100000):
+        self.terminal = terminal
+        self.symbols = list(symbols)
+        self.writer = writer
+        self.max_ticks = max_ticks
+        self.digits = {}
+        # Per symbol: (time_msc terakhir, jumlah tick di milidetik itu yang sudah ditulis)
+        self.position = {}
+        reader = TickReader(writer.root)
+        for symbol in self.symbols:
+            last, seen = reader.last_tick(symbol)
+            if last is None:
+                last, seen = (since if since is not None else int(time.time())) * 1000, 0
+            self.position[symbol] = (last, seen)
+
+    def poll(self):
+        """
+        Satu putaran ambil tick baru semua symbol. Return jumlah tick baru.
+        """
+        total = 0
+        for symbol in self.symbols:
+            digits = self.digits.get(symbol)
+            if digits is None:
+                info = self.terminal.symbol_info(symbol)
+                if info is None:
+                    continue
+                digits = self.digits[symbol] = info.digits
+
+            # Ulangi selama terminal masih mengembalikan batch penuh (mengejar ketinggalan)
+            while True:
+                last, seen = self.position[symbol]
+                ticks = self.terminal.copy_ticks_from(symbol, last // 1000, self.max_ticks,
+                                                      self.terminal.COPY_TICKS_ALL)
+                if ticks is None or len(ticks) == 0:
+                    break
+                fresh = self._fresh(ticks, last, seen)
+                if len(fresh):
+                    self.writer.append(symbol, fresh, digits)
+                    total += len(fresh)
+                    new_last = int(fresh['time_msc'][-1])
+                    at_last = int((fresh['time_msc'] == new_last).sum())
+                    self.position[symbol] = (new_last, at_last + (seen if new_last == last else 0))
+                if len(ticks) < self.max_ticks or len(fresh) == 0:
+                    break
+        return total
+
+    @staticmethod
+    def _fresh(ticks, last, seen):
+        """
+        Buang tick yang sudah tersimpan: sebelum `last`, dan `seen` tick pertama di `last`
+        """
+        times = ticks['time_msc']
+        lo = int(np.searchsorted(times, last, 'left'))
+        hi = int(np.searchsorted(times, last, 'right'))
+        return ticks[min(lo + seen, hi) if hi > lo else lo:]
+
+    def run(self, interval=1.0, flush_interval=60.0, keep_running=None):
+        keep_running = keep_running or (lambda: True)
+        last_flush = time.monotonic()
+        try:
+            while keep_running():
+                started = time.monotonic()
+                self.poll()
+                if started - last_flush >= flush_interval:
+                    self.writer.flush()
+                    last_flush = started
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        finally:
+            self.writer.flush()
+
+
+class TickReplayer:
+    """
+    Putar ulang tick beberapa symbol berurutan waktu.
+
+    Tick dikirim per window `batch_ms` sebagai {symbol: array tick}, supaya
+    replay tetap jutaan tick per detik. speed=1 mengikuti waktu asli, speed=60
+    satu jam rekaman dalam satu menit, speed=0 secepat mungkin.
+    """
+
+    def __init__(self, reader, symbols, start_msc=None, end_msc=None, speed=1.0, batch_ms=1000):
+        self.reader = reader
+        self.symbols = list(symbols)
+        self.start_msc = start_msc
+        self.end_msc = end_msc
+        self.speed = speed
+        self.batch_ms = batch_ms
+
+    def __iter__(self):
+        streams = {symbol: self.reader.chunks(symbol, self.start_msc, self.end_msc) for symbol in self.symbols}
+        # Per symbol: tick yang sudah dibaca, kolom time_msc contiguous & posisi tick berikutnya
+        buffers = {symbol: [np.zeros(0, dtype=TICK_DTYPE), np.zeros(0, dtype=np.int64), 0]
+                   for symbol in self.symbols}
+
+        def fill(symbol, until):
+            # Pastikan buffer berisi semua tick sebelum `until` (atau stream habis)
+            buffer = buffers[symbol]
+            while streams[symbol] is not None and (buffer[2] == len(buffer[1]) or buffer[1][-1] < until):
+                chunk = next(streams[symbol], None)
+                if chunk is None:
+                    streams[symbol] = None
+                    break
+                ticks = np.concatenate((buffer[0][buffer[2]:], chunk))
+                buffer[:] = [ticks, np.ascontiguousarray(ticks['time_msc']), 0]
+
+        def pending():
+            return [buffers[s][1][buffers[s][2]] for s in self.symbols if buffers[s][2] < len(buffers[s][1])]
+
+        for symbol in self.symbols:
+            fill(symbol, -1)
+        firsts = pending()
+        if not firsts:
+            return
+        window = int(min(firsts)) if self.start_msc is None else self.start_msc
+        origin, wall_origin = window, time.monotonic()
+
+        while True:
+            until = window + self.batch_ms
+            batch = {}
+            for symbol in self.symbols:
+                fill(symbol, until)
+                ticks, times, position = buffers[symbol]
+                cut = int(np.searchsorted(times, until, 'left'))
+                if cut > position:
+                    batch[symbol] = ticks[position:cut]
+                    buffers[symbol][2] = cut
+
+            if batch:
+                if self.speed:
+                    # Tunggu sampai waktu replay window ini
+                    delay = wall_origin + (window - origin) / 1000 / self.speed - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                yield window, batch
+                window = until
+            else:
+                # Lompati jeda tanpa tick (misalnya akhir pekan)
+                firsts = pending()
+                if not firsts:
+                    break
+                window = max(until, int(min(firsts)) // self.batch_ms * self.batch_ms)
+
+    def run(self, callback):
+        """
+        Panggil callback(symbol, ticks) untuk setiap batch. Return jumlah tick.
+        """
+        total = 0
+        for _, batch in self:
+            for symbol, ticks in batch.items():
+                callback(symbol, ticks)
+                total += len(ticks)
+        return total
+
+
+def main():
+    import settings
+
+    parser = argparse.ArgumentParser(description="Rekam / putar ulang tick")
+    parser.add_argument('command', choices=('record', 'info', 'replay'))
+    parser.add_argument('--store', default='ticks', help="Folder tick store")
+    parser.add_argument('--symbols', default='', help="Daftar symbol dipisah koma (default semua)")
+    parser.add_argument('--since', type=float, default=0, help="record: mulai N jam lalu jika belum ada rekaman")
+    parser.add_argument('--interval', type=float, default=1.0, help="record: jeda polling (detik)")
+    parser.add_argument('--speed', type=float, default=0, help="replay: 1 = waktu asli, 0 = secepat mungkin")
+    parser.add_argument('--batch-ms', type=int, default=0,
+                        help="replay: lebar window per batch (ms), default 1000 atau 60000 jika --speed 0")
+    parser.add_argument('--config', default='config.json',
+                        help="record: file pengaturan bot untuk daftar symbol (default jika tidak ada)")
+    args = parser.parse_args()
+
+    only = [s for s in args.symbols.split(',') if s]
+
+    if args.command == 'record':
+        try:
+            trading_pairs = settings.load_settings(args.config)['trading_pairs']
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+        # ROBOT_FAKE_MT5=1 memakai terminal palsu, sama seperti app.py
+        if os.environ.get('ROBOT_FAKE_MT5'):
+            import fake_mt5 as mt5
+        else:
+            import MetaTrader5 as mt5
+
+        if not mt5.initialize():
+            print(f"❌ MT5 initialize failed: {mt5.last_error()}")
+            return
+        symbols = only or [s for group in trading_pairs.values() for s in group]
+        symbols = [s for s in symbols if mt5.symbol_select(s, True)]
+        since = int(time.time() - args.since * 3600) if args.since else None
+        writer = TickWriter(args.store)
+        recorder = TickRecorder(mt5, symbols, writer, since=since)
+        print(f"⏺ Merekam tick {', '.join(symbols)} ke {args.store} (Ctrl+C untuk berhenti)")
+        try:
+            recorder.run(args.interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            mt5.shutdown()
+        print(f"✅ {writer.stats['ticks']} tick, {writer.stats['chunks']} chunk, "
+              f"{writer.stats['bytes'] / 1e6:.1f} MB")
+
+    elif args.command == 'info':
+        reader = TickReader(args.store)
+        print(f"{'symbol':<10}{'hari':<10}{'tick':>10}{'chunk':>7}{'MB':>8}{'byte/tick':>11}")
+        for symbol in only or reader.symbols():
+            for day in reader.days(symbol):
+                index = reader.index(symbol, day)
+                ticks, size = int(index['count'].sum()), int(index['size'].sum())
+                print(f"{symbol:<10}{day:<10}{ticks:>10}{len(index):>7}{size / 1e6:>8.2f}"
+                      f"{size / max(ticks, 1):>11.2f}")
+
+    else:
+        reader = TickReader(args.store)
+        replayer = TickReplayer(reader, only or reader.symbols(), speed=args.speed,
+                                batch_ms=args.batch_ms or (1000 if args.speed else 60000))
+        started = time.perf_counter()
+        total = replayer.run(lambda symbol, ticks: None)
+        elapsed = time.perf_counter() - started
+        print(f"✅ {total} tick dalam {elapsed:.2f}s ({total / max(elapsed, 1e-9) / 1e6:.2f} juta tick/s)")
+
+
+if __name__ == '__main__':
+    main()